@@ -51,6 +51,8 @@ def load_unity_env(cfg_env, cfg_agents, env_dict):
             external_websocket_server=external_websocket_server,
             websocket_url=communicator_url,
             simulation_id=simulation_id,
+            queue_config=cfg_env.get("message_queues", None),
+            **cfg_env.get("codec", {}),
         )
     except BaseException as e:
         logger.error(f"[SYSTEM] Error loading Unity environment: {e}")
@@ -6,7 +6,19 @@ import traceback
 
 from omegaconf import DictConfig
 
-from lyfe_agent import create_agents, EncoderManager, EncoderCollection, OpenAIEncoder
+from lyfe_agent import (
+    create_agents,
+    EncoderManager,
+    EncoderCollection,
+    OpenAIEncoder,
+    Cassette,
+    use_cassette,
+    wrap_encoder,
+    create_clock,
+    use_clock,
+    configure_http_pool,
+    close_clients,
+)
 from environments import get_environment
 
 import utils.thread_pool as thread_pool
@@ -36,6 +48,9 @@ def run_agents(cfg: DictConfig, env_dict: dict[str, str]):
     checkpoint = cfg.general.checkpoint
     collect_data = cfg.general.collect_data
     save_dir = os.getcwd()
+    cassette = _create_cassette(cfg.general.get("cassette", None))
+    _set_clock(cfg.general.get("clock", None))
+    configure_http_pool(**(cfg.general.get("http_pool", None) or {}))
     # Get a list of all agents
     encoder = _create_encoder(executor, env_dict)
     agents_dict = create_agents(
@@ -68,10 +83,15 @@ def run_agents(cfg: DictConfig, env_dict: dict[str, str]):
     )
 
     max_steps = cfg.general.max_iter
+    # environments with message queues let the loop throttle when they are congested
+    wait_until_uncongested = getattr(env, "wait_until_uncongested", None)
+    throttle_timeout = cfg_env.get("throttle_timeout", 5.0)
     done = False
     i = 0
     try:
         while i < max_steps and not done:
+            if wait_until_uncongested is not None:
+                wait_until_uncongested(timeout=throttle_timeout)
             for agent_index in range(len(agents)):
                 # Get current agent
                 agent = agents[agent_index]
@@ -113,6 +133,9 @@ def run_agents(cfg: DictConfig, env_dict: dict[str, str]):
         env.close()
         store_agent_memory(agents, path=save_dir, is_last=True)
         close_agents(agents)
+        if cassette is not None:
+            cassette.close()
+        close_clients()
 
     logger.info("[SYSTEM] Exiting run_agents function...\n\n")
 
@@ -124,8 +147,14 @@ def _create_encoder(executor: Executor, env_dict: dict[str, str]):
     """
     logger.info("[SYSTEM] Creating new encoder...")
     openai_encoder_manager = EncoderManager(
-        encoder_func=OpenAIEncoder(model_name="text-embedding-3-small"),
-        batch_size=50,
+        encoder_func=wrap_encoder(
+            OpenAIEncoder(
+                model_name="text-embedding-3-small",
+                base_url=env_dict.get("OPENAI_BASE_URL", None),
+            )
+        ),
+        # large enough for the initial memories of all agents to go in a few requests
+        batch_size=256,
         max_wait_time=0.5,
         env_dict=env_dict,
         executor=executor,
@@ -138,3 +167,27 @@ def _create_encoder(executor: Executor, env_dict: dict[str, str]):
         validation_config=["recentmem", "longmem", "obsbuffer"],
     )
     return encoder_collection
+
+
+def _set_clock(clock_cfg):
+    """
+    Set the clock used by agents and python environments.
+    Must be called before agents and the environment are created.
+    """
+    if not clock_cfg or clock_cfg.get("mode", "real") == "real":
+        return
+    logger.info(f"[SYSTEM] Using {clock_cfg.mode} clock")
+    use_clock(create_clock(**clock_cfg))
+
+
+def _create_cassette(cassette_cfg):
+    """
+    Create the record/replay cassette for LLM and encoder I/O, if configured.
+    Must be called before agents and encoders are created.
+    """
+    if not cassette_cfg or cassette_cfg.get("mode", "off") == "off":
+        return None
+    logger.info(f"[SYSTEM] Using {cassette_cfg.mode} cassette at {cassette_cfg.path}")
+    cassette = Cassette(**cassette_cfg)
+    use_cassette(cassette)
+    return cassette
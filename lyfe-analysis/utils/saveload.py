@@ -18,6 +18,15 @@ def close_agents(agents):
     Close all threads and processes associated with the agents.
     """
     for agent in agents:
+        prompt_metrics = getattr(agent.memory, "prompt_metrics", None)
+        if prompt_metrics is not None:
+            logger.info(f"[SYSTEM] Prompt memory sizes for {agent.name}: {prompt_metrics.report()}")
+        activation = getattr(agent, "activation", None)
+        if activation is not None:
+            logger.info(f"[SYSTEM] Steps of {agent.name}: {activation.info}")
+        lod = getattr(agent, "lod", None)
+        if lod is not None:
+            logger.info(f"[SYSTEM] Level of detail of {agent.name}: {lod.info}")
         for mem_key in agent.memory.memory_keys:
             mem_module = getattr(agent.memory, mem_key)
             if getattr(mem_module, "encoder", None):
@@ -141,8 +150,7 @@ def load_agent_data(cwdir: str, agents_data: List[Agent]) -> Dict[str, Any]:
             if memory_component in data:
                 memory = getattr(agent.memory, memory_component)
                 memory.clear()
-                for i in data[memory_component]:
-                    memory.add(i)
+                memory.add_many(data[memory_component])
             else:
                 print(f"Warning: {agent.name} does not have memory {memory}")
 
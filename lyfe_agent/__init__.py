@@ -1,40 +1,84 @@
-from lyfe_agent.agent import Agent
-from lyfe_agent.agent_utils import create_agents, create_agent
-from lyfe_agent.inception import inception
-from lyfe_agent.settings import get_env_vars
+"""Lyfe Agent.
 
-# The following variables are used by Hydra, need to revisit and see if we want to expose all of them.
-
-from lyfe_agent.utils.encoder_utils import EncoderCollection, EncoderManager, OpenAIEncoder
+Names are imported lazily on first access (PEP 562), so that `import lyfe_agent`
+does not pull in langchain, hydra, sklearn and the OpenAI clients. Hydra targets
+such as `lyfe_agent.Talk` resolve through the same mechanism.
+"""
+import importlib
 
-# Chains
-from lyfe_agent.chains.simple_chain import ParserChain
+# The following variables are used by Hydra, need to revisit and see if we want to expose all of them.
+_LAZY_IMPORTS = {
+    "Agent": "lyfe_agent.agent",
+    "create_agents": "lyfe_agent.agent_utils",
+    "create_agent": "lyfe_agent.agent_utils",
+    "inception": "lyfe_agent.inception",
+    "get_env_vars": "lyfe_agent.settings",
+    # Utils
+    "EncoderCollection": "lyfe_agent.utils.encoder_utils",
+    "EncoderManager": "lyfe_agent.utils.encoder_utils",
+    "OpenAIEncoder": "lyfe_agent.utils.encoder_utils",
+    "Cassette": "lyfe_agent.utils.cassette",
+    "use_cassette": "lyfe_agent.utils.cassette",
+    "wrap_encoder": "lyfe_agent.utils.cassette",
+    "Clock": "lyfe_agent.utils.clock",
+    "VirtualClock": "lyfe_agent.utils.clock",
+    "create_clock": "lyfe_agent.utils.clock",
+    "get_clock": "lyfe_agent.utils.clock",
+    "use_clock": "lyfe_agent.utils.clock",
+    "close_clients": "lyfe_agent.utils.llm_clients",
+    "configure_http_pool": "lyfe_agent.utils.llm_clients",
+    "get_chat_model": "lyfe_agent.utils.llm_clients",
+    # Chains
+    "ParserChain": "lyfe_agent.chains.simple_chain",
+    # Memory
+    "ThreeStageMemoryManager": "lyfe_agent.memory.memory_manager.default_manager",
+    "Memory": "lyfe_agent.memory.memory_manager.obsolete_manager",
+    "MemoryStore": "lyfe_agent.memory.memory_module.default_modules",
+    "EmbeddingMemory": "lyfe_agent.memory.memory_module.default_modules",
+    "ObsBuffer": "lyfe_agent.memory.memory_module.obsbuffer_modules",
+    # Interactions
+    "LLMCall": "lyfe_agent.interactions.llm_call",
+    "EncodeTalk": "lyfe_agent.interactions.sense.encode_sense",
+    "SenseInteraction": "lyfe_agent.interactions.sense.simple_sense",
+    "ActionSelection": "lyfe_agent.interactions.action_selection",
+    "CognitiveControl": "lyfe_agent.interactions.option_executor",
+    "Talk": "lyfe_agent.interactions.option_executor",
+    "ChooseDestination": "lyfe_agent.interactions.option_executor",
+    "Message": "lyfe_agent.interactions.option_executor",
+    "Reflect": "lyfe_agent.interactions.option_executor",
+    "FindPerson": "lyfe_agent.interactions.option_executor",
+    "Plan": "lyfe_agent.interactions.option_executor",
+    "Interview": "lyfe_agent.interactions.option_executor",
+    # States
+    "Options": "lyfe_agent.states.options",
+    "NewEventDetector": "lyfe_agent.states.simple_states",
+    "SimpleState": "lyfe_agent.states.simple_states",
+    "CurrentOption": "lyfe_agent.states.simple_states",
+    "Location": "lyfe_agent.states.simple_states",
+    "EventTracker": "lyfe_agent.states.event_tracker",
+    "OptionStatus": "lyfe_agent.states.timed_variables",
+    "ContactManager": "lyfe_agent.states.contact_manager",
+    "OptionHistory": "lyfe_agent.states.option_history",
+    "RepetitionDetector": "lyfe_agent.states.repetition_detector",
+    "ExpireTimeDetector": "lyfe_agent.states.time_detector",
+    "SummaryState": "lyfe_agent.states.summary_state",
+    "TalkStream": "lyfe_agent.states.talk_stream",
+    "AgentState": "lyfe_agent.states.agent_state",
+    # Environments
+    "ExternalEnvWrapper": "lyfe_agent.environments.unity",
+}
 
-# Memory
-from lyfe_agent.memory.memory_manager.default_manager import ThreeStageMemoryManager
-from lyfe_agent.memory.memory_manager.obsolete_manager import Memory
-from lyfe_agent.memory.memory_module.default_modules import MemoryStore, EmbeddingMemory
-from lyfe_agent.memory.memory_module.obsbuffer_modules import ObsBuffer
+__all__ = list(_LAZY_IMPORTS)
 
-# Interactions
-from lyfe_agent.interactions.llm_call import LLMCall
-from lyfe_agent.interactions.sense.encode_sense import EncodeTalk
-from lyfe_agent.interactions.sense.simple_sense import SenseInteraction
-from lyfe_agent.interactions.action_selection import ActionSelection
-from lyfe_agent.interactions.option_executor import CognitiveControl, Talk, ChooseDestination, Message, Reflect, FindPerson, Plan, Interview
 
-# States
-from lyfe_agent.states.options import Options
-from lyfe_agent.states.simple_states import NewEventDetector, SimpleState, CurrentOption, Location
-from lyfe_agent.states.event_tracker import EventTracker
-from lyfe_agent.states.timed_variables import OptionStatus
-from lyfe_agent.states.contact_manager import ContactManager
-from lyfe_agent.states.option_history import OptionHistory
-from lyfe_agent.states.repetition_detector import RepetitionDetector
-from lyfe_agent.states.time_detector import ExpireTimeDetector
-from lyfe_agent.states.summary_state import SummaryState
-from lyfe_agent.states.agent_state import AgentState
+def __getattr__(name):
+    module_name = _LAZY_IMPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name), name)
+    globals()[name] = value  # later lookups skip __getattr__
+    return value
 
 
-# Environments
-from lyfe_agent.environments.unity import ExternalEnvWrapper
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,112 @@
+"""Event-driven activation of agents.
+
+Stepping an agent runs sense processing, state updates, memory updates and the
+checks of every interaction, even when nothing happened since the last step.
+Activation lets the agent skip those steps while it is idle: it is stepped only
+when it receives new observations, when one of its slow functions completes
+(see `wake`), when its own state asks for it (a pending event, an active timed
+variable, an expiring option, a schedule goal whose time is reached or passed)
+or after `max_idle_time` without a step.
+"""
+import random
+import threading
+from typing import Dict, Optional
+
+from lyfe_agent.utils.clock import get_clock
+
+# Observations describing the surroundings, which are sent again on every tick.
+# Any other observation (talk, messages, items, arrivals, ...) is an event.
+STATE_KEYS = frozenset(
+    {
+        "visible_creatures",
+        "visible_creature",
+        "nearby_creature",
+        "locations",
+        "contacts",
+        "observable_entities",
+    }
+)
+# Observations that change on every tick without being news to the agent
+IGNORED_KEYS = frozenset({"time", "env_time"})
+
+
+class Activation:
+    """Decides whether an agent needs a full step.
+
+    Args:
+        enabled: if False, the agent is stepped on every call
+        max_idle_time: maximum time (in seconds of the simulation clock) between
+            two steps, so that timeouts and time-based updates are still handled
+        prob_boredom: per skipped step, the probability that the agent gets bored
+            of being idle, as AgentState does on every step
+    """
+
+    def __init__(
+        self, enabled: bool = True, max_idle_time: float = 5.0, prob_boredom: float = 0.0
+    ):
+        self.enabled = enabled
+        self.max_idle_time = max_idle_time
+        self.prob_boredom = prob_boredom
+
+        self._wake = threading.Event()
+        self._wake.set()  # always step on the first call
+        self._last_state: Optional[Dict] = None
+        self._last_step_time = get_clock().time()
+        self.reason: Optional[str] = None
+
+        self.steps = 0
+        self.skipped = 0
+
+    def wake(self, *args):
+        """Request a step on the next call. Thread-safe, usable as a future callback."""
+        self._wake.set()
+
+    @staticmethod
+    def _state_of(observations: Dict) -> Dict:
+        return {key: observations.get(key) for key in STATE_KEYS}
+
+    def has_news(self, observations: Dict) -> bool:
+        """Whether observations contain an event or a change of the surroundings."""
+        for key, value in observations.items():
+            if key not in STATE_KEYS and key not in IGNORED_KEYS and value:
+                return True
+        return self._state_of(observations) != self._last_state
+
+    def should_step(self, observations: Dict, busy: bool = False) -> bool:
+        """Whether to step the agent, called on every tick before stepping it.
+
+        Args:
+            observations: the observations of this tick
+            busy: whether the state of the agent requires a step regardless of
+                observations
+
+        The cause of the decision is kept in `reason` ("boredom" asks the agent to
+        pick something new to do, since a skipped step does not roll boredom).
+        """
+        now = get_clock().time()
+        if not self.enabled:
+            self.reason = "disabled"
+        elif busy:
+            self.reason = "busy"
+        elif self._wake.is_set():
+            self.reason = "wake"
+        elif self.has_news(observations):
+            self.reason = "news"
+        elif now - self._last_step_time >= self.max_idle_time:
+            self.reason = "idle timeout"
+        elif random.random() < self.prob_boredom:
+            self.reason = "boredom"
+        else:
+            self.reason = None
+            self.skipped += 1
+            return False
+
+        self._wake.clear()
+        self._last_state = self._state_of(observations)
+        self._last_step_time = now
+        self.steps += 1
+        return True
+
+    @property
+    def info(self) -> Dict[str, int]:
+        return {"steps": self.steps, "skipped": self.skipped}
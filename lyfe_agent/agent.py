@@ -1,12 +1,15 @@
 """Main Agent Class."""
 import logging
+from collections import defaultdict
 
 from threading import Lock
 from concurrent.futures import Executor, ThreadPoolExecutor
 from typing import Dict
 from hydra.utils import instantiate  # to get llm
-from omegaconf import DictConfig
+from omegaconf import DictConfig, OmegaConf
 
+from lyfe_agent.activation import Activation
+from lyfe_agent.lod import LODChatModel, LODPolicy
 from lyfe_agent.brain_configs import brain_configs
 from lyfe_agent.brain_utils import (
     create_interaction,
@@ -19,8 +22,10 @@ from lyfe_agent.memory.memory_manager.skill_manager import SkillManager
 from lyfe_agent.states.options import Options
 from lyfe_agent.interactions.action_selection import ActionSelection
 from lyfe_agent.interactions.cognitive_controller import CognitiveController
-from lyfe_agent.interactions.option_executor import CodeOptionExecutor
+from lyfe_agent.interactions.option_executor import CodeOptionExecutor, create_code_chain
 from lyfe_agent.interactions.llm_call import LLMCall
+from lyfe_agent.utils.cassette import wrap_llm
+from lyfe_agent.utils.llm_clients import get_chat_model
 
 logger = logging.getLogger(__name__)
 
@@ -134,7 +139,19 @@ class Agent:
         # TODO (Robert) Fix these instantiate calls.
         # Assuming LangChain style _target_
         self.llm_type = brain_cfg.langmodel._target_.split(".")[-1]
-        self.llm = instantiate(brain_cfg.langmodel)()
+        # chat models are shared by all agents with the same langmodel config
+        self.llm = wrap_llm(get_chat_model(brain_cfg.langmodel), default_stream=self.name)
+        lod_cfg = brain_cfg.get("lod", None) or {}
+        if lod_cfg.get("enabled", False):
+            # counts calls for the LOD budgets, and switches background agents to a cheaper model
+            low_langmodel = (lod_cfg.get("background", None) or {}).get("langmodel", None)
+            low_llm = None
+            if low_langmodel:
+                low_llm = wrap_llm(
+                    get_chat_model(OmegaConf.merge(brain_cfg.langmodel, low_langmodel)),
+                    default_stream=self.name,
+                )
+            self.llm = LODChatModel(llm=self.llm, low_llm=low_llm)
 
         # memory
         self.memory = instantiate(brain_cfg.memory)(
@@ -156,7 +173,9 @@ class Agent:
         memory_cfg["workmem"].append(
             agent_cfg.get("initial_goal", "I don't know my current goal yet.")
         )
-        self.memory.fill_memories(memory_cfg)  # This line may be slow
+        self.memory.fill_memories(memory_cfg)
+        # completes when the initial memories are indexed, see create_agents
+        self.ready = self.memory.ready
 
         # set aliases
         for key in self.memory.memory_keys:
@@ -234,6 +253,7 @@ class Agent:
         
         # TODO: Temporary, until we integrate skill manager into options
         # TODO: Also should have only one option executor for skill, not one for each skill
+        code_chain = create_code_chain(self.llm)  # shared by the skills of this agent
         for skill in self.skill_manager.skills:
             self.option_executor[skill["key"]] = CodeOptionExecutor(
                 name=skill["key"],
@@ -241,6 +261,7 @@ class Agent:
                 code=skill["code"],
                 docstring=skill["docstring"],
                 llm=self.llm,
+                chain=code_chain,
                 sources={
                     # "current_option": self.current_option,
                     "agent_state": self.agent_state,
@@ -266,8 +287,58 @@ class Agent:
             option_executor = self.option_executor,
         )
 
+        # skip steps while idle, wake up when a slow function completes
+        self.activation = Activation(
+            prob_boredom=self.agent_state.prob_boredom,
+            **(brain_cfg.get("activation", None) or {}),
+        )
+        slow_modules = [
+            self.action_selection.slow_fast_sys,
+            self.cognitive_controller.slow_fast_module,
+        ]
+        if hasattr(self, "summary_interaction"):
+            slow_modules.append(self.summary_interaction.slow_thread_module)
+        for module in slow_modules:
+            module.on_complete = self.activation.wake
+
+        # lower cognitive cadence of agents that are alone and idle
+        self.lod = LODPolicy(self, **lod_cfg)
+        if isinstance(self.llm, LODChatModel):
+            self.llm.policy = self.lod
+        for module in slow_modules:
+            module.submit_gate = self.lod.allows_slow_func
+
+    @property
+    def _world_model_enabled(self) -> bool:
+        summary_interaction = getattr(self, "summary_interaction", None)
+        return summary_interaction is not None and summary_interaction.enabled
+
+    def needs_step(self, observations) -> bool:
+        """Whether the agent's own state requires a step, regardless of what is new in observations."""
+        agent_state = self.agent_state
+        talk_stream = getattr(self, "talk_stream", None)
+        return bool(
+            agent_state.new_event_detector.data
+            or agent_state.get_current_option() == "cognitive_controller"
+            or agent_state.exit_current_option()
+            or agent_state.expiretime_detector.is_due
+            # timed variables count down on every step
+            or agent_state.options.get_active_variables_list()
+            or (self._world_model_enabled and self.event_tracker.signal)
+            or (talk_stream is not None and talk_stream.pending)
+            # the next goal of the schedule is due
+            or agent_state.schedule.is_goal_due(observations.get("time"))
+        )
+
     def __call__(self, observations, **kwargs):
         """Main call function of the agent."""
+        self.lod.update(observations)
+        if not self.activation.should_step(observations, busy=self.needs_step(observations)):
+            # idle: nothing to process, nothing new to express
+            return defaultdict(lambda: None) | self.agent_state.expressions
+        if self.activation.reason == "boredom":
+            self.agent_state.set_new_event(True, "bored while idle")
+
         try:
             # Process observations to obtain inputs to state
             sense_natural_language = self.sense_interaction.execute(observations)
@@ -298,6 +369,18 @@ class Agent:
             # post process to include observables
             action_to_env |= self.agent_state.expressions
 
+            # send the talk generated so far, until the full reply is ready
+            talk_stream = getattr(self, "talk_stream", None)
+            if talk_stream is not None:
+                if action_to_env.get("talk", None) is None:
+                    partial = talk_stream.pop()
+                    if partial is not None:
+                        action_to_env["talk_partial"] = partial
+                # streams that ended without a reply
+                retracted = talk_stream.pop_retracted()
+                if retracted:
+                    action_to_env["talk_retract"] = retracted
+
         except Exception as e:
             import traceback
 
@@ -1,9 +1,9 @@
 """Utilities for agents."""
-from concurrent.futures import Executor
+from concurrent.futures import Executor, ThreadPoolExecutor, TimeoutError
 import logging
 from lyfe_agent.agent import Agent
 import time
-from lyfe_agent.utils.encoder_utils import EncoderCollection
+from lyfe_agent.utils.encoder_utils import EncoderCollection, gather
 
 logger = logging.getLogger(__name__)
 
@@ -14,33 +14,51 @@ def create_agents(
     executor: Executor,
     env_dict: dict[str, str],
     wait_until_ready: bool = False,
+    max_workers: int = 16,
+    timeout: float = 60.0,
 ) -> dict[str, Agent]:
     """
     Create a list of agents from the config file.
     :agent_config_dict: Hydra config file
     :executor: Executor for the encoder manager of this agent.
+    :max_workers: Number of agents constructed concurrently.
+    :timeout: Seconds to wait for the memory embeddings if wait_until_ready.
+
+    Agents are constructed concurrently, so that their initial memories are queued
+    together and embedded in a few large batches. Each agent's `ready` future
+    completes when its memories are indexed.
     """
     logger.info(f"[SYSTEM] Number of agents from config: {len(agent_config_dict)}")
+    start = time.time()
 
-    agents = dict()
-    for agent_id, agent_config in agent_config_dict.items():
-        agent = create_agent(
-            agent_config,
-            agent_id,
-            encoder=encoder,
-            executor=executor,
-            env_dict=env_dict,
-            wait_until_ready=False,
-        )
-        agents[agent_id] = agent
+    # a separate pool, as the encoder runs on `executor`
+    with ThreadPoolExecutor(
+        max_workers=max(1, min(max_workers, len(agent_config_dict))),
+        thread_name_prefix="create_agent",
+    ) as pool:
+        futures = {
+            agent_id: pool.submit(
+                create_agent,
+                agent_config,
+                agent_id,
+                encoder=encoder,
+                executor=executor,
+                env_dict=env_dict,
+                wait_until_ready=False,
+            )
+            for agent_id, agent_config in agent_config_dict.items()
+        }
+        agents = {agent_id: future.result() for agent_id, future in futures.items()}
+    logger.info(
+        f"[SYSTEM] Created {len(agents)} agents in {time.time() - start:.1f} seconds"
+    )
 
     if wait_until_ready:
-        # TODO: Figure out why memory embedding takes so long
         logger.info(
             f"[SYSTEM] Waiting for memory embedding for {len(agents)} agents..."
         )
-        for agent in agents:
-            _wait_for_memory_embedding_by_config(agent_config_dict[agent.id], agent)
+        ready = gather(agent.ready for agent in agents.values())
+        _wait_for_ready(ready, f"{len(agents)} agents", timeout)
 
     return agents
 
@@ -88,27 +106,25 @@ def create_agent(
         raise e
 
     if wait_until_ready:
-        _wait_for_memory_embedding_by_config(agent_cfg, agent)
+        _wait_for_ready(agent.ready, agent.name)
 
     logger.info(f"[SYSTEM] Initialized agent ID {agent.id}, Name {agent.name}")
     return agent
 
 
-def _wait_for_memory_embedding_by_config(agent_cfg, agent) -> None:
-    """Wait for the specific agent's memory to be embedded."""
-    agent_memory_length = len(agent_cfg["memory"]["longmem"])
-    logger.info(
-        f"[SYSTEM] Waiting for memory embedding for {agent.name} length {agent_memory_length}..."
-    )
+def _wait_for_ready(ready, name: str, timeout: float = 60.0) -> None:
+    """Wait for a readiness future, e.g. `Agent.ready`."""
     start = time.time()
-    while len(agent.memory.longmem.memory_bank) <= 0:
-        # the embedding is still processing
-        time.sleep(1)
-        if time.time() - start > 60:
-            logger.warning(
-                f"Waited for 60 seconds but the memory embedding is still not done"
-            )
-            break
+    try:
+        ready.result(timeout=timeout)
+    except TimeoutError:
+        logger.warning(
+            f"Waited for {timeout} seconds but the memory embedding of {name} is still not done"
+        )
+        return
+    except Exception as e:
+        logger.error(f"[SYSTEM] Memory embedding of {name} failed: {e}")
+        raise
     logger.info(
-        f"[SYSTEM] Memory embedding for {agent.name} has length {len(agent.memory.longmem.memory_bank)} from {agent_memory_length} documents."
+        f"[SYSTEM] Memory embedding of {name} done in {time.time() - start:.1f} seconds."
     )
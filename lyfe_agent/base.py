@@ -1,10 +1,18 @@
 class BaseState:
+    # Incremented whenever the state's data changes, so that consumers
+    # (e.g. AgentState.data) only recompute what depends on changed states
+    version = 0
+
     def __init__(self, input_keys):
         self.value = None
 
     def update(self, input_dict):
         pass
 
+    def touch(self):
+        """Mark the state as changed."""
+        self.version += 1
+
 
 class BaseInteraction:
     expected_inputs = []
@@ -1,11 +1,13 @@
 import os
-
-from hydra import compose, initialize
+import threading
+from collections.abc import Mapping
 
 configs_dir = os.path.dirname(os.path.abspath(__file__)) + "/configs"
 
 
 def load_yaml_file(file_name):
+    from hydra import compose, initialize
+
     if not file_name.endswith(".yaml"):
         file_name += ".yaml"
     with initialize(version_base=None, config_path="configs"):
@@ -33,7 +35,26 @@ brain_aliases = {
     "lively_brain": "base_brain",
 }
 
-brain_configs = {
-    alias: load_yaml_file(brain_cfg_file_name)
-    for alias, brain_cfg_file_name in brain_aliases.items()
-}
+class BrainConfigs(Mapping):
+    """Brain configs by alias, composed on first use instead of at import time."""
+
+    def __init__(self, aliases):
+        self.aliases = aliases
+        self._configs = {}
+        self._lock = threading.Lock()  # hydra's global state is not thread-safe
+
+    def __getitem__(self, alias):
+        file_name = self.aliases[alias]
+        with self._lock:
+            if alias not in self._configs:
+                self._configs[alias] = load_yaml_file(file_name)
+            return self._configs[alias]
+
+    def __iter__(self):
+        return iter(self.aliases)
+
+    def __len__(self):
+        return len(self.aliases)
+
+
+brain_configs = BrainConfigs(brain_aliases)
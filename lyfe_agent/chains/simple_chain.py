@@ -1,13 +1,18 @@
+import hashlib
 import logging
 import json
 import re
+import threading
 
 from langchain.output_parsers import PydanticOutputParser
 from langchain.chains import LLMChain
 from langchain.prompts import PromptTemplate
 from pydantic import BaseModel
-from typing import TypeVar
+from typing import Dict, NamedTuple, Tuple, TypeVar
 from lyfe_agent.utils.log_utils import get_colored_text
+from lyfe_agent.utils.cassette import cassette_stream
+from lyfe_agent.memory.prompt_budget import prompt_budget_chain
+from lyfe_agent.slowfast.cancellation import CancellationCallbackHandler, current_token
 
 from lyfe_agent.chains.base_chain import BaseChain
 from lyfe_agent.chains.chain_utils import (
@@ -44,6 +49,52 @@ class CustomOutputParser(PydanticOutputParser[T]):
         return self.CUSTOM_FORMAT_INSTRUCTIONS.format(schema=schema_str)
 
 
+class CompiledTemplate(NamedTuple):
+    """Artifacts of a chain config that do not depend on the agent."""
+
+    parsers: CustomOutputParser
+    prompt: PromptTemplate
+    stream_suffix: str  # template hash, part of the cassette stream name
+
+
+_compiled_templates: Dict[Tuple[str, str], CompiledTemplate] = {}
+_compiled_lock = threading.Lock()
+# stateless, so one handler serves all chains
+_log_handler = LogCallbackHandler()
+
+
+def compile_template(template: str, parser_config) -> CompiledTemplate:
+    """Compile a chain config once per process, agents share the result.
+
+    Building the pydantic model, its format instructions and the prompt template is
+    the bulk of the cost of a chain, and is the same for every agent with the brain.
+    """
+    fields = [(key, parser_config[key]) for key in parser_config]
+    key = (template, json.dumps(fields, default=str))
+    compiled = _compiled_templates.get(key)
+    if compiled is not None:
+        return compiled
+
+    pydantic_model = create_pydantic_model(name=f"parser", fields=dict(fields))
+    # parsers = PydanticOutputParser(pydantic_object=pydantic_model)
+    parsers = CustomOutputParser(pydantic_object=pydantic_model)
+    input_variables = re.findall(r"\{(.*?)\}", template)
+    prompt = PromptTemplate(
+        template=template + "\n{format_instructions}",
+        input_variables=input_variables,
+        partial_variables={
+            "format_instructions": parsers.get_format_instructions()
+        },
+    )
+    compiled = CompiledTemplate(
+        parsers=parsers,
+        prompt=prompt,
+        stream_suffix=hashlib.sha1(template.encode("utf-8")).hexdigest()[:8],
+    )
+    with _compiled_lock:
+        return _compiled_templates.setdefault(key, compiled)
+
+
 class ParserChain(BaseChain):
     def __init__(
         self,
@@ -54,26 +105,28 @@ class ParserChain(BaseChain):
         name=None,
         collect_data=False,
         verbose=False,
+        chain_name=None,
+        stream_field=None,
         **kwargs,
     ):
-        pydantic_model = create_pydantic_model(name=f"parser", fields=parser_config)
-        # self.parsers = PydanticOutputParser(pydantic_object=pydantic_model)
-        self.parsers = CustomOutputParser(pydantic_object=pydantic_model)
-        input_variables = re.findall(r"\{(.*?)\}", template)
-        template += "\n{format_instructions}"
-        prompt = PromptTemplate(
-            template=template,
-            input_variables=input_variables,
-            partial_variables={
-                "format_instructions": self.parsers.get_format_instructions()
-            },
-        )
-    
+        # selects the per-chain token budgets of memory variables
+        self.chain_name = chain_name
+        # JSON field whose value can be streamed while the answer is generated
+        self.stream_field = stream_field
+        # only the llm and the memory are bound per agent
+        compiled = compile_template(template, parser_config)
+        # identifies this chain's calls when recording/replaying a cassette
+        self.stream = f"{name}/{compiled.stream_suffix}"
+        self.parsers = compiled.parsers
+
         self.verbose = verbose
-        handler = LogCallbackHandler()
         self.collect_data = collect_data
         self.chain = LLMChain(
-            prompt=prompt, llm=llm, memory=memory, callbacks=[handler], verbose=verbose
+            prompt=compiled.prompt,
+            llm=llm,
+            memory=memory,
+            callbacks=[_log_handler],
+            verbose=verbose,
         )
 
     def log(self, chain_output):
@@ -95,8 +148,15 @@ class ParserChain(BaseChain):
                 {}
             )  # ensure that queried memories are properly reset after use
 
-    def run(self, chain_input, option=None, data_collector=None):
-        chain_output = self.chain.invoke(chain_input)["text"]
+    def run(self, chain_input, option=None, data_collector=None, callbacks=None):
+        # abort early if the slow function that runs this chain gets cancelled
+        token = current_token()
+        callbacks = list(callbacks or [])
+        if token:
+            callbacks.append(CancellationCallbackHandler(token))
+        config = {"callbacks": callbacks} if callbacks else None
+        with cassette_stream(self.stream), prompt_budget_chain(self.chain_name):
+            chain_output = self.chain.invoke(chain_input, config=config)["text"]
 
         # Temporary --- this is for data collection purposes
         self.add_data(chain_input, chain_output, option, data_collector)
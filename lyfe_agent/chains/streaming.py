@@ -0,0 +1,104 @@
+"""Streaming of a single JSON field out of a chain's output.
+
+Chains answer with a JSON object (see `CustomOutputParser`). When streaming, the
+string value of one field (e.g. the "response" of talk) is decoded incrementally
+from the tokens as they arrive, so that it can be shown before the completion ends.
+
+A call streams when a `FieldStreamCallbackHandler` is among its callbacks: the chat
+model wrappers (`LODChatModel`, `CassetteChatModel`) then generate through the
+`_stream` of the model they wrap, which reports every token to the callbacks. A bare
+chat model without these wrappers answers in one piece.
+
+Check against the mock server: `python -m lyfe_bench.utils.stream_check`
+"""
+import json
+import re
+from typing import Any, Callable, Optional
+
+from langchain.callbacks.base import BaseCallbackHandler
+from langchain.chat_models.base import generate_from_stream
+
+_ESCAPES = {'"': '"', "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+
+
+class JsonFieldStream:
+    """Incrementally decodes the string value of `field` from partial JSON text."""
+
+    def __init__(self, field: str):
+        self.field = field
+        self._key_pattern = re.compile(r'"' + re.escape(field) + r'"\s*:\s*"')
+        self._raw = ""
+        self._pos: Optional[int] = None  # position of the next undecoded char of the value
+        self.value = ""
+        self.done = False
+
+    def feed(self, chunk: str) -> str:
+        """Add raw output text, return the newly decoded part of the field value."""
+        if self.done:
+            return ""
+        self._raw += chunk
+        if self._pos is None:
+            match = self._key_pattern.search(self._raw)
+            if match is None:
+                return ""
+            self._pos = match.end()
+
+        decoded = []
+        raw, pos = self._raw, self._pos
+        while pos < len(raw):
+            char = raw[pos]
+            if char == '"':
+                self.done = True
+                pos += 1
+                break
+            if char != "\\":
+                decoded.append(char)
+                pos += 1
+                continue
+            # escape sequence, wait for more text if it is incomplete
+            if pos + 1 >= len(raw):
+                break
+            code = raw[pos + 1]
+            if code == "u":
+                if pos + 6 > len(raw):
+                    break
+                decoded.append(json.loads(f'"{raw[pos:pos + 6]}"'))
+                pos += 6
+            else:
+                decoded.append(_ESCAPES.get(code, code))
+                pos += 2
+        self._pos = pos
+
+        delta = "".join(decoded)
+        self.value += delta
+        return delta
+
+
+class FieldStreamCallbackHandler(BaseCallbackHandler):
+    """Calls `on_partial(value_so_far)` whenever the streamed field grows.
+
+    Also counts streamed tokens, since streamed completions report no token usage.
+    """
+
+    def __init__(self, field: str, on_partial: Callable[[str], Any]):
+        self.stream = JsonFieldStream(field)
+        self.on_partial = on_partial
+        self.num_tokens = 0
+
+    def on_llm_new_token(self, token: str, **kwargs: Any) -> None:
+        self.num_tokens += 1
+        if self.stream.feed(token):
+            self.on_partial(self.stream.value)
+
+
+def stream_requested(run_manager) -> bool:
+    """Whether the callbacks of a chat model call include a field stream."""
+    handlers = getattr(run_manager, "handlers", None) or []
+    return any(isinstance(handler, FieldStreamCallbackHandler) for handler in handlers)
+
+
+def generate_streaming(llm, messages, stop=None, run_manager=None, **kwargs):
+    """Generate with `llm._stream`, so that `run_manager` sees the tokens as they arrive."""
+    return generate_from_stream(
+        llm._stream(messages, stop=stop, run_manager=run_manager, **kwargs)
+    )
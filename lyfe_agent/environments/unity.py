@@ -106,9 +106,16 @@ class ExternalEnvWrapper(BaseProfilingClass):
         # Mappings
         # This will need to be modified if players can join before sim starts
         self.id_to_player_name = {}
+        # id <-> name maps and contacts, rebuilt only when players join or leave
+        self.names_version = 0
+        self._update_names()
         self.nearby_creatures = {id: [] for id in self.id_to_agent_name.keys()}
         self.visible_creatures = {id: [] for id in self.id_to_agent_name.keys()}
         self.locations = {id: [] for id in self.id_to_agent_name.keys()}
+        # nearby and visible creatures in the name format of the agents, converted
+        # once per proximity update instead of on every observation
+        self._nearby_names = {id: [] for id in self.id_to_agent_name.keys()}
+        self._visible_names = {id: frozenset() for id in self.id_to_agent_name.keys()}
 
         assert env_dict is not None, "env_dict must be provided"
         self.nonce = env_dict["NONCE"]
@@ -116,13 +123,25 @@ class ExternalEnvWrapper(BaseProfilingClass):
         # Handles those things that are observable to other agents
         self.agent_expressions = {id: {} for id in self.id_to_agent_name.keys()}
 
+    def _update_names(self):
+        """Rebuild the cached maps, called when players join or leave."""
+        self._id_to_name = self.id_to_agent_name | self.id_to_player_name
+        self._name_to_id = {v: k for k, v in self._id_to_name.items()}
+        self._contacts = {
+            "agent_usernames": list(self.id_to_agent_name.values()),
+            "player_usernames": list(self.id_to_player_name.values()),
+        }
+        self.names_version += 1
+
     @property
     def id_to_name(self):
-        return self.id_to_agent_name | self.id_to_player_name
+        """Read-only, rebuilt by `_update_names`."""
+        return self._id_to_name
 
     @property
     def name_to_id(self):
-        return {v: k for k, v in self.id_to_name.items()}
+        """Read-only, rebuilt by `_update_names`."""
+        return self._name_to_id
 
     def convert_action(self, action, agent_id):
         """Converts the action from the Python agent to the Unity agent.
@@ -135,8 +154,35 @@ class ExternalEnvWrapper(BaseProfilingClass):
         task_commands = []
         action_chat_message: str = action.get("talk", None)
         if action_chat_message is not None:
+            stream_id = action.get("talk_stream_id", None)
             data.append(
-                SendOutAgentChatMessage(agentId=agent_id, message=action_chat_message)
+                SendOutAgentChatMessage(
+                    agentId=agent_id,
+                    message=action_chat_message,
+                    streamId=stream_id,
+                    final=True if stream_id is not None else None,
+                )
+            )
+        else:
+            # reply still being generated, replaced by the final message with the same id
+            action_talk_partial = action.get("talk_partial", None)
+            if action_talk_partial is not None:
+                stream_id, partial_message = action_talk_partial
+                data.append(
+                    SendOutAgentChatMessage(
+                        agentId=agent_id,
+                        message=partial_message,
+                        streamId=stream_id,
+                        final=False,
+                    )
+                )
+
+        # an empty final message removes the partial reply of a stream without a reply
+        for stream_id in action.get("talk_retract", None) or []:
+            data.append(
+                SendOutAgentChatMessage(
+                    agentId=agent_id, message="", streamId=stream_id, final=True
+                )
             )
 
         action_code_message: str = action.get("code", None)
@@ -355,6 +401,7 @@ class ExternalEnvWrapper(BaseProfilingClass):
     def __process_agent_messages_handler_player_joined(self, observation, data):
         observation["player_joined"] = data.username
         self.id_to_player_name[data.playerId] = data.username
+        self._update_names()
         log_event(
             "OBSERVATION", "PLAYER", data.playerId, data.username, "player_joined"
         )
@@ -366,6 +413,7 @@ class ExternalEnvWrapper(BaseProfilingClass):
             observation["player_removed"] = player_name
             log_event("OBSERVATION", "PLAYER", player_id, player_name, "player_removed")
             self.id_to_player_name.pop(data.playerId)
+            self._update_names()
 
     def __process_agent_messages_handler_character_proximity(self, observation, data):
         # # for players
@@ -399,9 +447,16 @@ class ExternalEnvWrapper(BaseProfilingClass):
             if creature is not None
         ]
 
-        self.nearby_creatures[data.agentId] = observation["nearby_creature"].copy()
-        self.visible_creatures[data.agentId] = observation["visible_creature"].copy()
-        self.locations[data.agentId] = observation["locations"].copy()
+        # the lists are new for each update, so they can be shared with the observation
+        self.nearby_creatures[data.agentId] = observation["nearby_creature"]
+        self.visible_creatures[data.agentId] = observation["visible_creature"]
+        self.locations[data.agentId] = observation["locations"]
+        self._nearby_names[data.agentId] = [
+            name_lower2higher(n) for n in observation["nearby_creature"]
+        ]
+        self._visible_names[data.agentId] = frozenset(
+            name_lower2higher(n) for n in observation["visible_creature"]
+        )
 
     def __process_agent_messages_handler_agent_feedback(
         self, observation, data: SendInAgentFeedback
@@ -459,10 +514,7 @@ class ExternalEnvWrapper(BaseProfilingClass):
                 "nearby_creature": self.nearby_creatures[self.id_list[agent_id]],
                 "visible_creature": self.visible_creatures[self.id_list[agent_id]],
                 "locations": self.locations[self.id_list[agent_id]],
-                "contacts": {
-                    "agent_usernames": list(self.id_to_agent_name.values()),
-                    "player_usernames": list(self.id_to_player_name.values()),
-                },
+                "contacts": self._contacts,
             }
         )
 
@@ -470,9 +522,8 @@ class ExternalEnvWrapper(BaseProfilingClass):
 
     def get_observations(self, agent_index):
         """Pre-process observation from Unity to provide to the Python agents."""
-        raw_data = self.web_socket_env.get_observations(
-            self.web_socket_env.get_agent_id_list()[agent_index]
-        )
+        agent_id = self.id_list[agent_index]
+        raw_data = self.web_socket_env.get_observations(agent_id)
 
         obs = self.process_agent_messages(agent_index, raw_data)
 
@@ -497,18 +548,16 @@ class ExternalEnvWrapper(BaseProfilingClass):
         else:
             obs_chat = None
 
-        # original format: "name1;name2;name3"
-        nearby_creature = obs.get("nearby_creature", [])
-        nearby_creature = [name_lower2higher(n) for n in nearby_creature]
+        # original format: "name1;name2;name3", converted on proximity updates
+        nearby_creature = self._nearby_names[agent_id]
         # TODO: may actually want this to be under visible_creature
         expressions = {
-            name: self.agent_expressions.get(self.name_to_id.get(name), {})
+            name: self.agent_expressions.get(self._name_to_id.get(name), {})
             for name in nearby_creature
         }
 
         # format: "name1;name2;name3"
-        visible_creature = obs.get("visible_creature", [])
-        visible_creature = frozenset([name_lower2higher(n) for n in visible_creature])
+        visible_creature = self._visible_names[agent_id]
 
         # TODO: Need a simplification, this is too complicated, and hard for people to understand
         # TODO: It's also not clear what the types of each observation are
@@ -541,6 +590,16 @@ class ExternalEnvWrapper(BaseProfilingClass):
     def close(self):
         self.web_socket_env.close()
 
+    def wait_until_uncongested(self, timeout=None) -> bool:
+        """Wait until the websocket queues are below their high-water marks.
+
+        Used by the run loop to throttle action generation when Unity falls behind.
+        """
+        if not self.web_socket_env.is_congested():
+            return True
+        logger.warning("[SYSTEM] Websocket queues are congested, throttling agents")
+        return self.web_socket_env.wait_until_uncongested(timeout)
+
     def wait_until_ready(self, timeout=60):
         # Wait at most 60 seconds for incoming messages
         current_time = time.time()
@@ -21,13 +21,23 @@ class ActionSelection:
         option_executor: Dict[str, BaseOptionExecutor],
         executor: Executor,
         data_collectors: Dict[str, List],
+        supersede_on_new_event: bool = True,
+        min_supersede_time: float = 0.5,
     ):
+        """
+        supersede_on_new_event: cancel an in-flight action selection when a new event
+            arrives, so that the next selection sees the newer observation
+        min_supersede_time: seconds an action selection is allowed to run before it can
+            be superseded (avoids thrashing on bursts of events)
+        """
         self.agent_state = agent_state
         self.name = name
         self.memory = memory
         self.data_collectors = data_collectors
         self.executor = executor
         self.option_executor = option_executor
+        self.supersede_on_new_event = supersede_on_new_event
+        self.min_supersede_time = min_supersede_time
 
         # slow_forward is executing current option with the action-LLM chain
         self.slow_fast_sys = SlowFastModule(
@@ -54,6 +64,17 @@ class ActionSelection:
         # Slow forward thread
         self.slow_fast_sys.retrieve_result()
 
+        # slow_forward clears the new event flag when it starts, so a set flag while
+        # it is running means that its observations are outdated; a queued one has
+        # not read them yet and is left alone
+        if (
+            self.supersede_on_new_event
+            and self.slow_fast_sys.is_running
+            and self.agent_state.new_event_detector.data
+            and self.slow_fast_sys.time_since_start() >= self.min_supersede_time
+        ):
+            self.slow_fast_sys.supersede("superseded by a newer observation")
+
         should_submit = self.agent_state.should_submit_action_selection()
         can_submit = self.slow_fast_sys.can_submit_slow_func(self.agent_state.suspended_time)
         if should_submit and can_submit:
@@ -35,7 +35,9 @@ class CognitiveController(BaseOptionExecutor):
         self.data_collector = data_collector
         self.lock = Lock()
 
-        self.chain = ParserChain(llm=llm, memory=memory, name=self.name, **chain)
+        self.chain = ParserChain(
+            llm=llm, memory=memory, name=self.name, chain_name="cognitive_controller", **chain
+        )
 
         self.slow_fast_module = SlowFastModule(
             executor=self.executor,
@@ -2,7 +2,9 @@ import json
 
 from langchain_community.callbacks import get_openai_callback
 from lyfe_agent.chains.simple_chain import ParserChain
+from lyfe_agent.chains.streaming import FieldStreamCallbackHandler
 from lyfe_agent.brain_utils import calculate_lifespan
+from lyfe_agent.slowfast.cancellation import check_cancelled
 
 
 # Unclear whether this is best as an interaction
@@ -25,7 +27,9 @@ class LLMCall:
 
 
         self.chains = {
-            key: ParserChain(llm=self.llm, memory=self.memory, name=self.name, **val)
+            key: ParserChain(
+                llm=self.llm, memory=self.memory, name=self.name, chain_name=key, **val
+            )
             for key, val in chains.items()
         }
 
@@ -38,22 +42,42 @@ class LLMCall:
         chain=None,
         chain_input=None,
         data_collector=None,
+        on_partial=None,
     ):
         """
         Take action based on the prompt and the current status
+
+        on_partial: called with the value of the chain's stream field decoded so far,
+            while the answer is streamed (only for chains with a `stream_field`)
         """
         if option is not None:
             chain = self.chains.get(option, None)
 
         assert chain is not None, "Chain should not be None"
         chain_input = self.agent_state.data if chain_input is None else chain_input
+
+        stream_handler = None
+        if on_partial is not None and chain.stream_field:
+            stream_handler = FieldStreamCallbackHandler(chain.stream_field, on_partial)
+
         with get_openai_callback() as cb:
-            chain_answer = chain.run(chain_input, option, data_collector)
+            chain_answer = chain.run(
+                chain_input,
+                option,
+                data_collector,
+                callbacks=[stream_handler] if stream_handler else None,
+            )
+            # a request that could not be interrupted still must not act on stale inputs
+            check_cancelled()
             # calculate how long the talk is going to last based on the number of tokens generated
             cb_info = cb.__dict__
+            # streamed completions do not report token usage
+            completion_tokens = cb.completion_tokens or (
+                stream_handler.num_tokens if stream_handler else 0
+            )
 
             lifespan = calculate_lifespan(
-                cb.completion_tokens,
+                completion_tokens,
                 self.reading_speed,
                 self.decision_requester_step,
             )
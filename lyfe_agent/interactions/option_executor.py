@@ -1,11 +1,12 @@
 from collections import defaultdict
-from typing import Any, Callable, Dict
+from typing import Any, Callable, Dict, Optional, Tuple
 
 from langchain_community.callbacks import get_openai_callback
 from langchain.chains import LLMChain
 from langchain.prompts import PromptTemplate
 
 from lyfe_agent.base import BaseInteraction
+from lyfe_agent.slowfast.cancellation import CancellationCallbackHandler, current_token
 from lyfe_agent.utils.name_utils import name_match, name_include
 from lyfe_agent.states.agent_state import AgentStateData
 from lyfe_agent.states.simple_states import CurrentOption, Location, SimpleState
@@ -120,35 +121,66 @@ class Talk(BaseOptionExecutor):
             return self.action_to_env, self.memory_input
 
         self.is_active = True
-        chain_answer = self.run_llm(self.module_name)
-
+        # stream the reply to the environment while it is generated, if enabled
+        talk_stream = getattr(self, "talk_stream", None)
+        if talk_stream is not None and not talk_stream.enabled:
+            talk_stream = None
+        on_partial = None
+        if talk_stream is not None:
+            talk_stream.start()
+            on_partial = lambda text: talk_stream.push(self.filter_response(text)[1])
+        try:
+            chain_answer = self.run_llm(self.module_name, on_partial=on_partial)
+        except BaseException:
+            if talk_stream is not None:
+                # cancelled or failed: the reply streamed so far is not going to be said
+                talk_stream.retract(talk_stream.finish())
+            raise
+        stream_id = talk_stream.finish() if talk_stream is not None else None
+
+        response = None
         if chain_answer and all(chain_answer):
-            # TODO: a patch to make agent silent
-            if "[NONE]" in chain_answer["response"].upper():
-                chain_answer["response"] = None
+            is_included, response = self.filter_response(chain_answer["response"])
+            chain_answer["response"] = response
             # TODO: a patch to make agent move
-            else:
-                is_included, chain_answer["response"] = name_include(
-                    chain_answer["response"],
-                    self.talk_sensitive_keywords,
+            if is_included:
+                self.agent_state.update_option(
+                    option_name="choose_destination",
+                    option_goal=f"Based on what I said '{chain_answer['response']}', I need to go somewhere.",
                 )
-                if is_included:
-                    self.agent_state.update_option(
-                        option_name="choose_destination",
-                        option_goal=f"Based on what I said '{chain_answer['response']}', I need to go somewhere.",
-                    )
-                    # TODO: do we want interaction to update any state within itself? - Ivy
-                    self.agent_state.set_new_event(True)
-                    self.event_tracker.receive(True)
+                # TODO: do we want interaction to update any state within itself? - Ivy
+                self.agent_state.set_new_event(True)
+                self.event_tracker.receive(True)
             self.action_to_env[self.module_name] = chain_answer["response"]
             self.update_memory_input(chain_answer)
+
+        if talk_stream is not None:
+            if response is None:
+                # nothing to say: no final message replaces the partial reply
+                talk_stream.retract(stream_id)
+                stream_id = None
+            self.action_to_env["talk_stream_id"] = stream_id
         self.is_active = False
         return self.action_to_env, self.memory_input
 
-    def run_llm(self, option: str):
+    def filter_response(self, response: str) -> Tuple[bool, Optional[str]]:
+        """
+        Applied to the final reply and to the partial replies alike.
+
+        Returns:
+            Whether the reply includes a talk sensitive keyword, and the reply to say,
+            None to stay silent.
+        """
+        # TODO: a patch to make agent silent
+        if "[NONE]" in response.upper():
+            return False, None
+        return name_include(response, self.talk_sensitive_keywords)
+
+    def run_llm(self, option: str, on_partial: Callable[[str], None] = None):
         chain_answer, cb_info = self.llm_call(
             option=option,
             data_collector=self.data_collectors["slow_forward"],
+            on_partial=on_partial,
         )
 
         if option == "talk":
@@ -388,13 +420,13 @@ class Interview(BaseOptionExecutor):
 
         # initialize summary here
         if self.summary_state is None:
-            self.llm_call.agent_state._data["initial_question"] = observations[
-                "interview"
-            ]
+            self.llm_call.agent_state.set_variable(
+                "initial_question", observations["interview"]
+            )
             chain_answer, _ = self.llm_call(
                 option="initialize_interview",
             )
-            del self.llm_call.agent_state._data["initial_question"]
+            self.llm_call.agent_state.remove_variable("initial_question")
             self.summary_state = SummaryState(keys=chain_answer.keys())
             self.summary_state.update(**chain_answer)
         else:
@@ -444,15 +476,21 @@ Do not write anything beyond the output format suggested above.
 """
 prompt = PromptTemplate.from_template(template)
 
+
+def create_code_chain(llm) -> LLMChain:
+    return LLMChain(prompt=prompt, llm=llm, verbose=True)
+
+
 class CodeOptionExecutor(BaseOptionExecutor):
-    def __init__(self, name, description, docstring, code, llm, **kwargs):
+    def __init__(self, name, description, docstring, code, llm, chain=None, **kwargs):
         super().__init__(**kwargs)
         self.module_name = name
         self.description = description
         self.docstring = docstring
         self.code = code
  
-        self.chain = LLMChain(prompt=prompt, llm=llm, verbose=True)
+        # the chain does not depend on the skill, so an agent can share one across skills
+        self.chain = chain if chain is not None else create_code_chain(llm)
  
     def execute(self, observations, agent_state_data: AgentStateData):
         self.is_active = True
@@ -465,8 +503,10 @@ class CodeOptionExecutor(BaseOptionExecutor):
             "description": self.description,
             "docstring": self.docstring,
         }
+        token = current_token()
+        config = {"callbacks": [CancellationCallbackHandler(token)]} if token else None
         with get_openai_callback() as cb:
-            chain_answer = self.chain.invoke(agent_state_data | chain_input)["text"]
+            chain_answer = self.chain.invoke(agent_state_data | chain_input, config=config)["text"]
             # token usage information
             cb_info = cb.__dict__
         
@@ -12,10 +12,12 @@ def process_time(self, observations, sense_natural_language):
         self.time.update(observations.get("time"))
     sense_natural_language["time"] = observations["time"]
 
-    if observations.get("time") == self.schedule.current_goal_time:
+    # reached or passed, as idle agents are not stepped on every minute
+    if self.schedule.is_goal_due(observations.get("time")):
         self.current_option.update(
             option_name="cognitive_controller", option_goal=self.schedule.current_goal
         )
+        self.schedule.mark_goal_notified()
         new_event_time_based = True
 
     if int(observations["time"].split(":")[1]) == 0 and (
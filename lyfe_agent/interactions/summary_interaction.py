@@ -22,8 +22,12 @@ class SummaryInteraction(BaseInteraction):
             slow_func=self.update_world_model,
         )
         self.feedback_queue = deque()
+        # world-model updates can be suspended (see LODPolicy), feedback is still queued
+        self.enabled = True
 
-        self.chain = ParserChain(llm=self.llm, memory=self.memory, name=self.name,**chain)
+        self.chain = ParserChain(
+            llm=self.llm, memory=self.memory, name=self.name, chain_name="summary_interaction", **chain
+        )
 
     # TODO: all the inputs should become sources
     def execute(self, observations: Dict):
@@ -35,6 +39,9 @@ class SummaryInteraction(BaseInteraction):
             self.feedback_queue.append(observations.pop("general"))
             should_submit = True
 
+        if not self.enabled:
+            return
+
         new_obs = "\n".join(list(observations.values()))
 
         should_submit |= self.event_tracker.get()
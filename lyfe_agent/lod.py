@@ -0,0 +1,223 @@
+"""Level-of-detail (LOD) scheduling of agent cognition.
+
+Agents that are alone and have not observed anything for a while do not need
+the cadence of an agent in a conversation. The LOD policy demotes them to a
+background level, which submits slow functions less often, suspends world-model
+(summary) updates, can route their LLM calls to a cheaper model, and caps their
+LLM calls per simulated hour. Any event or nearby creature promotes the agent
+back to full cadence on the same step.
+
+The full level uses the brain's own `suspended_time` and `prob_boredom`.
+"""
+import logging
+from collections import deque
+from typing import Any, Dict, Optional
+
+from langchain.chat_models.base import BaseChatModel
+
+from lyfe_agent.activation import IGNORED_KEYS, STATE_KEYS
+from lyfe_agent.chains.streaming import generate_streaming, stream_requested
+from lyfe_agent.utils.clock import get_clock
+
+logger = logging.getLogger(__name__)
+
+FULL = "full"
+BACKGROUND = "background"
+HOUR = 3600.0
+
+
+class LODLevel:
+    """Cognitive cadence of one level of detail.
+
+    Args:
+        suspended_time: minimum seconds between two action selections
+        prob_boredom: probability per step to pick something new to do
+        max_idle_time: maximum seconds between two steps of an idle agent
+        world_model: whether summary (world model) updates run
+        low_tier: whether LLM calls use the cheaper model, if one is configured
+        max_llm_calls_per_hour: budget of LLM calls per simulated hour, None for no limit
+    """
+
+    def __init__(
+        self,
+        name: str,
+        suspended_time: float,
+        prob_boredom: float,
+        max_idle_time: float,
+        world_model: bool = True,
+        low_tier: bool = False,
+        max_llm_calls_per_hour: Optional[int] = None,
+    ):
+        self.name = name
+        self.suspended_time = suspended_time
+        self.prob_boredom = prob_boredom
+        self.max_idle_time = max_idle_time
+        self.world_model = world_model
+        self.low_tier = low_tier
+        self.max_llm_calls_per_hour = max_llm_calls_per_hour
+
+
+class LODPolicy:
+    """Promotes and demotes one agent between the full and background levels.
+
+    Args:
+        agent: the agent whose cadence is controlled
+        enabled: if False, the agent always stays at full level
+        idle_after: seconds without events and nearby creatures before demotion
+        background: parameters of the background level (see LODLevel), unset ones
+            are taken from the full level
+    """
+
+    def __init__(
+        self,
+        agent,
+        enabled: bool = True,
+        idle_after: float = 60.0,
+        background: Optional[Dict[str, Any]] = None,
+    ):
+        self.agent = agent
+        self.enabled = enabled
+        self.idle_after = idle_after
+
+        agent_state = agent.agent_state
+        self.levels = {
+            FULL: LODLevel(
+                FULL,
+                suspended_time=agent_state.suspended_time,
+                prob_boredom=agent_state.prob_boredom,
+                max_idle_time=agent.activation.max_idle_time,
+            )
+        }
+        # unset parameters of the background level are taken from the full level
+        background_params = vars(self.levels[FULL]) | {
+            key: value
+            for key, value in dict(background or {}).items()
+            if value is not None and key != "langmodel"  # the model is built by the agent
+        }
+        background_params["name"] = BACKGROUND
+        self.levels[BACKGROUND] = LODLevel(**background_params)
+        self.level = self.levels[FULL]
+
+        now = get_clock().time()
+        self._last_engaged = now
+        self._level_since = now
+        self._calls = deque()  # times of LLM calls, for the hourly budget
+
+        # metrics
+        self.time_in_level = {name: 0.0 for name in self.levels}
+        self.llm_calls = {name: 0 for name in self.levels}
+        self.promotions = 0
+        self.demotions = 0
+        self.blocked_submissions = 0  # submission checks refused by the call budget
+
+    @staticmethod
+    def is_engaged(observations: Dict) -> bool:
+        """Whether observations contain an event or a nearby creature."""
+        if observations.get("nearby_creature"):
+            return True
+        return any(
+            value
+            for key, value in observations.items()
+            if key not in STATE_KEYS and key not in IGNORED_KEYS
+        )
+
+    def update(self, observations: Dict) -> LODLevel:
+        """Select the level of the agent for this step, called before every step."""
+        if not self.enabled:
+            return self.level
+        now = get_clock().time()
+        if self.is_engaged(observations):
+            self._last_engaged = now
+        idle = now - self._last_engaged >= self.idle_after
+        level = self.levels[BACKGROUND if idle else FULL]
+        if level is not self.level:
+            self._set_level(level, now)
+        return self.level
+
+    def _set_level(self, level: LODLevel, now: float):
+        self.time_in_level[self.level.name] += now - self._level_since
+        self._level_since = now
+        if level.name == FULL:
+            self.promotions += 1
+            # the agent may have been skipped for a while, step it right away
+            self.agent.activation.wake()
+        else:
+            self.demotions += 1
+        logger.debug(f"[LOD] {self.agent.name}: {self.level.name} -> {level.name}")
+        self.level = level
+
+        agent_state = self.agent.agent_state
+        agent_state.suspended_time = level.suspended_time
+        agent_state.prob_boredom = level.prob_boredom
+        self.agent.activation.max_idle_time = level.max_idle_time
+        self.agent.activation.prob_boredom = level.prob_boredom
+        summary_interaction = getattr(self.agent, "summary_interaction", None)
+        if summary_interaction is not None:
+            summary_interaction.enabled = level.world_model
+
+    def _calls_in_last_hour(self, now: float) -> int:
+        while self._calls and now - self._calls[0] > HOUR:
+            self._calls.popleft()
+        return len(self._calls)
+
+    def allows_slow_func(self) -> bool:
+        """Whether the LLM call budget of the current level allows a new slow function."""
+        budget = self.level.max_llm_calls_per_hour
+        if budget is None or self._calls_in_last_hour(get_clock().time()) < budget:
+            return True
+        self.blocked_submissions += 1
+        return False
+
+    def record_llm_call(self):
+        now = get_clock().time()
+        self._calls.append(now)
+        # pruned here too, as levels without a budget never check it
+        self._calls_in_last_hour(now)
+        self.llm_calls[self.level.name] += 1
+
+    @property
+    def use_low_tier(self) -> bool:
+        return self.level.low_tier
+
+    @property
+    def info(self) -> Dict[str, Any]:
+        time_in_level = dict(self.time_in_level)
+        time_in_level[self.level.name] += get_clock().time() - self._level_since
+        return {
+            "level": self.level.name,
+            "time_in_level": {name: round(t, 1) for name, t in time_in_level.items()},
+            "llm_calls": dict(self.llm_calls),
+            "promotions": self.promotions,
+            "demotions": self.demotions,
+            "blocked_submissions": self.blocked_submissions,
+        }
+
+
+class LODChatModel(BaseChatModel):
+    """Chat model that counts calls for the LOD policy and routes them by tier."""
+
+    llm: BaseChatModel
+    low_llm: Optional[BaseChatModel] = None
+    policy: Any = None
+
+    @property
+    def _llm_type(self) -> str:
+        return "lod"
+
+    def _select_llm(self) -> BaseChatModel:
+        """Record a call and pick the model of the current tier."""
+        if self.policy is not None:
+            self.policy.record_llm_call()
+            if self.low_llm is not None and self.policy.use_low_tier:
+                return self.low_llm
+        return self.llm
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        llm = self._select_llm()
+        if stream_requested(run_manager):
+            return generate_streaming(llm, messages, stop=stop, run_manager=run_manager, **kwargs)
+        return llm._generate(messages, stop=stop, run_manager=run_manager, **kwargs)
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        llm = self._select_llm()
+        yield from llm._stream(messages, stop=stop, run_manager=run_manager, **kwargs)
@@ -6,17 +6,20 @@ from langchain.schema import BaseMemory
 from lyfe_agent.memory.memory_manager.abstract_memory_manager import AbstractMemoryManager
 from lyfe_agent.memory.memory_module.default_modules import MemoryStore, EmbeddingMemory
 from lyfe_agent.memory.memory_module.obsbuffer_modules import ObsBuffer
+from lyfe_agent.memory.prompt_budget import (
+    PromptBudget,
+    PromptMetrics,
+    count_tokens,
+    current_chain,
+    fit_items,
+)
 from lyfe_agent.chains.itemized_chain import ItemizedChain
-from sklearn.cluster import DBSCAN
-import nltk
-from nltk.tokenize import sent_tokenize
+from lyfe_agent.utils.encoder_utils import gather
+from lyfe_agent.utils.text_utils import sent_tokenize
 import re
 import threading
 
-from concurrent.futures import ThreadPoolExecutor
-
-
-nltk.download("punkt")
+from concurrent.futures import Future, ThreadPoolExecutor
 
 
 class ThreeStageMemoryManager(AbstractMemoryManager):
@@ -51,6 +54,13 @@ class ThreeStageMemoryManager(AbstractMemoryManager):
     tick_limit: int = 5
     db_scan_eps: float = 0.5
 
+    # token budgets of memory variables in prompts, and the resulting prompt sizes
+    prompt_budget: Any = None
+    prompt_metrics: Any = None
+
+    # future that completes when the memories of `fill_memories` are indexed
+    ready: Any = None
+
     def __init__(
         self,
         memory_modules,
@@ -58,9 +68,12 @@ class ThreeStageMemoryManager(AbstractMemoryManager):
         encoders,
         env_dict : Dict[str, str],
         executor=None,
+        prompt_budget: Optional[Dict[str, Any]] = None,
         **data: Any,
     ):
         super().__init__(**data)
+        self.prompt_budget = PromptBudget(**(prompt_budget or {}))
+        self.prompt_metrics = PromptMetrics()
         self.memory_keys = list(memory_modules.keys())
         self.prompt_keys = list(memory_prompts.keys())
         self.memory_vars = {name: "" for name in self.memory_keys}
@@ -137,15 +150,19 @@ class ThreeStageMemoryManager(AbstractMemoryManager):
 
     def fill_memories(self, memories: Dict[str, List]) -> None:
         """Used to sets of memories"""
+        pending = []
         for key, value in memories.items():
             if key in self.memory_keys:
-                mem_type = getattr(self, key)
-                for item in value:
-                    mem_type.add(item)
-                    if key == "workmem":
-                        self.obsbuffer.add(
-                            document=item, in_world_time="init", obs_type="visual"
-                        )
+                items = list(value)
+                # one bulk encoding request per memory module
+                future = getattr(self, key).add_many(items)
+                if isinstance(future, Future):
+                    pending.append(future)
+                if key == "workmem":
+                    self.obsbuffer.add_many(
+                        items, in_world_time="init", obs_type="visual"
+                    )
+        self.ready = gather(pending)
 
     def query(
         self, memory_key: str, text: str, num_memories_retrieved: int = 1
@@ -199,7 +216,19 @@ class ThreeStageMemoryManager(AbstractMemoryManager):
             future_recentmem.result()
         return
 
-    def _load_mem(self, memory_key, k=None):
+    def _fit(self, memory_key, items, usage, newest_last=True, budget=-1):
+        """Select `items` within the token budget of `memory_key` for the current chain."""
+        if budget == -1:
+            budget = self.prompt_budget.get(memory_key, current_chain())
+        kept, trimmed = fit_items(items, budget, newest_last=newest_last)
+        usage["tokens"][memory_key] = usage["tokens"].get(memory_key, 0) + sum(
+            count_tokens(item) for item in kept
+        )
+        usage["trimmed"] += trimmed
+        return kept
+
+    def _load_mem(self, memory_key, k=None, usage=None):
+        usage = usage if usage is not None else {"tokens": {}, "trimmed": 0}
         if memory_key == "convomem":
             talk_pattern = r"(.+?) said: (.+)"
             message_pattern = r"(.+?) messaged (.+?): (.+)"
@@ -211,19 +240,30 @@ class ThreeStageMemoryManager(AbstractMemoryManager):
             # right now an arbitrary parameter of 5 (thinking a unit of time for one longmem is about 5 recentmems)
             num_longmems = (self.recentmem.capacity - len(recentmems)) // 5
             longmems = self.longmem.items[-num_longmems:]
-            items = self.workmem.items + recentmems + longmems
+            # the budget goes to the most recent stage first
+            budget = self.prompt_budget.get(memory_key, current_chain())
+            items = []
+            for segment in (self.workmem.items, recentmems, longmems):
+                kept = self._fit(memory_key, segment, usage, budget=budget)
+                items += kept
+                if budget is not None:
+                    budget = max(0, budget - sum(count_tokens(item) for item in kept))
         else:
             items = getattr(self, memory_key).items
 
+        k = k if k else len(items)
+        items = items[-k:]
+        if items and memory_key != "reflectmem":
+            items = self._fit(memory_key, items, usage)
+
+        # also when the budget left no room for any item
         if not items:
             return "No conversation history yet." if memory_key == "convomem" else ""
 
-        k = k if k else len(items)
-
         if memory_key == "convomem" and len(items) > 1:
-            return "\n".join(items[-k:-1]) + "\nMost recently\n" + items[-1]
+            return "\n".join(items[:-1]) + "\nMost recently\n" + items[-1]
 
-        return "\n".join(items[-k:])
+        return "\n".join(items)
 
     def load_memory_variables(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
         """Return history buffer."""
@@ -233,19 +273,22 @@ class ThreeStageMemoryManager(AbstractMemoryManager):
         if inputs.get("summarize", False):
             return {}
 
-        self.memory_vars.update({"obsbuffer": self._load_mem("obsbuffer")})
-        self.memory_vars.update({"workmem": self._load_mem("workmem")})
-        self.memory_vars.update({"convomem": self._load_mem("convomem")})
-        self.memory_vars.update({"reflectmem": self._load_mem("reflectmem")})
+        usage = {"tokens": {}, "trimmed": 0}
+        self.memory_vars.update({"obsbuffer": self._load_mem("obsbuffer", usage=usage)})
+        self.memory_vars.update({"workmem": self._load_mem("workmem", usage=usage)})
+        self.memory_vars.update({"convomem": self._load_mem("convomem", usage=usage)})
+        self.memory_vars.update({"reflectmem": self._load_mem("reflectmem", usage=usage)})
 
-        self._update_memory_vars()
+        self._update_memory_vars(usage)
+        self.prompt_metrics.record(current_chain(), usage["tokens"], usage["trimmed"])
         return self.memory_vars
 
     @property
     def latest(self) -> str:
         return self.workmem.items[-1] if self.workmem.items else ""
 
-    def _update_memory_vars(self) -> None:
+    def _update_memory_vars(self, usage=None) -> None:
+        usage = usage if usage is not None else {"tokens": {}, "trimmed": 0}
         if self.workmem.items:
             query_workmem = self.workmem.items[-1]
             queried_recentmem_workmem = self.recentmem.query(
@@ -259,8 +302,13 @@ class ThreeStageMemoryManager(AbstractMemoryManager):
             queried_recentmem_workmem = []
             queried_longmem_workmem = []
 
-        queried_recentmem = set(queried_recentmem_workmem)
-        queried_longmem = set(queried_longmem_workmem)
+        # deduplicate while keeping the relevance ranking, which decides what fits the budget
+        queried_recentmem = self._fit(
+            "recentmem", list(dict.fromkeys(queried_recentmem_workmem)), usage, newest_last=False
+        )
+        queried_longmem = self._fit(
+            "longmem", list(dict.fromkeys(queried_longmem_workmem)), usage, newest_last=False
+        )
 
         if queried_recentmem:
             with self.memory_vars_lock:
@@ -280,6 +328,8 @@ class ThreeStageMemoryManager(AbstractMemoryManager):
         self, memory_from: str = "workmem", memory_to: str = "recentmem"
     ) -> str:
         """Summarize memory_from and add to memory_to"""
+        from sklearn.cluster import DBSCAN  # heavy, and only needed for summaries
+
         dbscan = DBSCAN(eps=self.db_scan_eps, min_samples=1)
         labels = dbscan.fit_predict(getattr(self, memory_from).items_embeddings)
 
@@ -5,16 +5,13 @@ from langchain.base_language import BaseLanguageModel
 from langchain.schema import BaseMemory
 from lyfe_agent.memory.memory_manager.abstract_memory_manager import AbstractMemoryManager
 from lyfe_agent.chains.itemized_chain import ItemizedChain
-import nltk
-from nltk.tokenize import sent_tokenize
+from lyfe_agent.utils.text_utils import sent_tokenize
 
 import re
 import threading
 
 from concurrent.futures import ThreadPoolExecutor
 
-nltk.download("punkt")
-
 
 def StringToListParser(text):
     # text = """
@@ -1,11 +1,10 @@
-from typing import Any, Dict, List, Optional, TypedDict
+from concurrent.futures import Future
+from typing import Any, Dict, List, Mapping, Optional, Sequence, TypedDict
 from pathlib import Path
 from lyfe_agent.memory.memory_manager.abstract_memory_manager import AbstractMemoryManager
 from lyfe_agent.memory.memory_module.default_modules import EmbeddingMemory
 from lyfe_agent.utils.encoder_utils import EncoderManager
-from lyfe_agent.utils.skill_utils import load_js_files
-
-import time
+from lyfe_agent.utils.skill_utils import SkillIndex, get_skill_index
 
 PROGRAM_DIR = Path(__file__).resolve().parent.parent.parent / "skills" / "minecraft" / "verified"
 
@@ -35,52 +34,52 @@ class SkillManager(AbstractMemoryManager):
     name: Any = None
 
     buffer: List[str] = []
-    skill_dict: Dict[str, SkillItem] = {}
-    skills: List[SkillItem] = []
+    buffer_version: int = 0
+    skill_dict: Mapping[str, SkillItem] = {}
+    skills: Sequence[SkillItem] = ()
+
+    # process-wide skill library, shared read-only by all agents
+    index: Optional[SkillIndex] = None
 
     def __init__(
         self,
         encoder: EncoderManager,
         env_dict : Dict[str, str],
         executor=None,
-        skills: Optional[List[SkillItem]] = [],
         init_query: str = "",
         **data: Any,
     ):
         super().__init__(**data)
 
-        # setting up three-stage memory modules
+        # Used to keep track of queried memories for data collection
+        assert env_dict, "env_dict must be provided"
+
+        # TODO: TEMPORARY SOLUTION.
+        # skills are parsed and embedded once per process, not once per agent
+        self.index = get_skill_index(
+            encoder.encoder_func,
+            PROGRAM_DIR,
+            cache_path=env_dict.get("SKILL_EMBEDDING_CACHE", None),
+        )
+        self.skills = self.index.skills
+        self.skill_dict = self.index.skill_dict
+
+        # the agent only queries the shared index, see `add` for new skills
         self.skillmem = EmbeddingMemory(
             name=self.name + "_skillmem",
             encoder=encoder,
-            capacity=10,
+            capacity=len(self.index) + 10,
             num_memories_retrieved=1,
             forgetting_algorithm=False,
         )
+        self.skillmem.memory_bank = self.index.skills
+        self.skillmem.embeddings = self.index.embeddings
 
-        # Used to keep track of queried memories for data collection
-        assert env_dict, "env_dict must be provided"
-
-        # set up memory variables if skills are added
-        # TODO: TEMPORARY SOLUTION.
-        loaded_skills = load_js_files(PROGRAM_DIR)
-        skills += loaded_skills
-        self.skills = skills
-        self.add(skills)
-        i = 0
-        while len(self.memories) < len(skills):
-            time.sleep(0.01)
-            if i > 100:
-                raise Exception("SkillManager failed to initialize")
         # initialize the buffer
         # Retrieve the top 3 memories
         self.update_skill_buffer(init_query, num_memories_retrieved=3)
-        while len(self.buffer) < 1:
-            time.sleep(0.01)
-            if i > 100:
-                raise Exception("Skill buffer failed to initialize")
-
-
+        if self.skills and not self.buffer:
+            raise Exception("Skill buffer failed to initialize")
 
     @property
     def memory_variables(self) -> List[str]:
@@ -106,15 +105,26 @@ class SkillManager(AbstractMemoryManager):
     def summarize(self) -> None:
         pass
 
-    def add(self, skills: List[SkillItem]) -> None:
+    def add(self, skills: List[SkillItem]) -> List[Future]:
         """
         Variables:
         - `skills` is a dictionary of dictionaries. The values of this dictionary are
         are skill details
+
+        Returns the futures of the skill embeddings.
         """
+        if self.skillmem.memory_bank is self.index.skills:
+            # copy on write, the shared index is read-only
+            self.skillmem.memory_bank = list(self.index.skills)
+            self.skillmem.embeddings = list(self.index.embeddings)
+            self.skill_dict = dict(self.index.skill_dict)
+        futures = []
         for skill in skills:            
-            self.skillmem.add(memory_or_key=skill["key"], value=skill)
+            future = self.skillmem.add(memory_or_key=skill["key"], value=skill)
+            if isinstance(future, Future):
+                futures.append(future)
             self.skill_dict[skill["key"]] = skill
+        return futures
 
     def query(self, query: str, num_memories_retrieved: str = 1) -> List[SkillItem]:
         """
@@ -141,6 +151,8 @@ class SkillManager(AbstractMemoryManager):
         Updates the skill buffer based on the query, does so by calling the query function.
         """
         buffer = self.query(query, num_memories_retrieved)
+        if buffer != self.buffer:
+            self.buffer_version += 1
         self.buffer = buffer
 
     def get_buffer(self) -> List[SkillItem]:
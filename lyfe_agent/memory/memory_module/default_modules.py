@@ -1,5 +1,8 @@
 import logging
 import random
+from concurrent.futures import Future
+
+import numpy as np
 from lyfe_agent.utils.encoder_utils import EncoderManager, BaseEmbeddingMemory
 from typing import Any, List
 from lyfe_agent.utils.log_utils import get_colored_text
@@ -65,6 +68,21 @@ class MemoryStore:
             self.memory_bank.pop(0)
         self.memory_bank.append(new_memory)
 
+    def add_many(
+        self, memories: List[str], memory_type: str = "generic", in_world_time: str = None
+    ) -> None:
+        """Add memories to the buffer in one pass."""
+        assert (
+            memory_type in self.metadata_type
+        ), "memory_type must be one of the following: {}".format(self.metadata_type)
+        self.memory_bank.extend(
+            {"content": memory, "metadata": {"in_world_time": in_world_time, "type": memory_type}}
+            for memory in memories
+        )
+        # keep the most recent memories if capacity is reached
+        if len(self.memory_bank) > self.capacity:
+            del self.memory_bank[: len(self.memory_bank) - self.capacity]
+
     def clear(self) -> None:
         """Clear all memories, but keep the last one."""
         self.memory_bank = self.memory_bank[-1:]
@@ -138,12 +156,16 @@ class EmbeddingMemory(BaseEmbeddingMemory):
             del self.memory_bank[index]
             del self.embeddings[index]
 
-    def add(self, memory_or_key: str, value: Any = None) -> None:
+    def add(self, memory_or_key: str, value: Any = None) -> Optional[Future]:
         """Add a memory to the memory bank.
         
         Args:
             memory_or_key (str): Memory content or key to be encoded.
             value (Any): Value to be stored in memory. If None, memory_or_key is stored.
+
+        Returns:
+            a future that completes once the memory is encoded and stored, None
+            for encoders that store it synchronously
         """
         if len(self.memory_bank) == self.capacity:
             with self.lock:
@@ -153,8 +175,9 @@ class EmbeddingMemory(BaseEmbeddingMemory):
         logger.debug(f"Queueing memory to {self.agent_name} module")
         value = value if value is not None else memory_or_key
         # Encoder will encode memory and add it to self
-        self.encoder.queue_mem(module=self, key=memory_or_key, value=value)
+        future = self.encoder.queue_mem(module=self, key=memory_or_key, value=value)
         logger.debug(f"Adding memory: {get_colored_text(text=memory_or_key, color='blue')}")
+        return future
 
     def fill_encoder_memories(self, embedding, memory_content):
         """Add memories that come from encoder."""
@@ -164,6 +187,57 @@ class EmbeddingMemory(BaseEmbeddingMemory):
         self.memory_bank.append(memory_content)
         self.embeddings.append(embedding)
 
+    def add_many(self, memories_or_keys: List[str], values: List[Any] = None) -> Optional[Future]:
+        """Add memories with one bulk encoding request.
+
+        Capacity is enforced once all memories are stored, see `fill_encoder_memories_many`.
+
+        Returns:
+            a future that completes once all memories are encoded and stored, None
+            for encoders that store them synchronously
+        """
+        if not isinstance(self.encoder, EncoderManager):
+            values = values if values is not None else [None] * len(memories_or_keys)
+            for memory_or_key, value in zip(memories_or_keys, values):
+                self.add(memory_or_key, value)
+            return None
+
+        logger.debug(f"Queueing {len(memories_or_keys)} memories to {self.agent_name} module")
+        return self.encoder.queue_mems(module=self, keys=memories_or_keys, values=values)
+
+    def fill_encoder_memories_many(self, embeddings, memory_contents):
+        """Add memories that come from one bulk encoding.
+
+        Equivalent to calling `fill_encoder_memories` for each memory in order, with the
+        forgetting pass done as one vectorized operation: a memory is forgotten if a
+        memory added after it is similar.
+        """
+        if not len(embeddings):
+            return
+        new_embeddings = np.vstack([np.asarray(embedding).reshape(1, -1) for embedding in embeddings])
+        keep_new = np.ones(len(new_embeddings), dtype=bool)
+        if self.forgetting_algorithm:
+            # new memories that are similar to a later new memory
+            similar = np.triu(cosine_similarity(new_embeddings) >= self.forgetting_threshold, k=1)
+            keep_new = ~similar.any(axis=1)
+            if self.memory_bank:
+                # existing memories that are similar to any new memory
+                similar = cosine_similarity(np.vstack(self.embeddings), new_embeddings)
+                keep_old = ~(similar >= self.forgetting_threshold).any(axis=1)
+                self.memory_bank[:] = [m for m, keep in zip(self.memory_bank, keep_old) if keep]
+                self.embeddings[:] = [e for e, keep in zip(self.embeddings, keep_old) if keep]
+
+        for embedding, memory_content, keep in zip(embeddings, memory_contents, keep_new):
+            if keep:
+                self.memory_bank.append(memory_content)
+                self.embeddings.append(embedding)
+
+        # keep the most recent memories if capacity is reached
+        excess = len(self.memory_bank) - self.capacity
+        if excess > 0:
+            del self.memory_bank[:excess]
+            del self.embeddings[:excess]
+
     def query(self, text: str, num_memories_retrieved: int = 1, timeout=5.0) -> List[str]:
         """Retrieve memories based on query content."""
         if not isinstance(self.encoder, EncoderManager):
@@ -324,6 +398,17 @@ class PineconeEmbeddingMemory(BaseEmbeddingMemory):
         self.encoder.queue_mem(module=self, key=memory)
         logger.debug(f"Adding memory: {get_colored_text(text=memory, color='blue')}")
 
+    def add_many(self, memories: List[str]) -> Future:
+        """Add memories with one bulk encoding request."""
+        excess = len(self.ids) + len(memories) - self.capacity
+        if excess > 0 and self.ids:
+            with self.lock:
+                forgotten, self.ids = self.ids[:excess], self.ids[excess:]
+                self.memory_bank.delete(ids=forgotten, namespace="general-space")
+
+        logger.debug(f"Queueing {len(memories)} memories to {self.agent_name} module")
+        return self.encoder.queue_mems(module=self, keys=memories)
+
     def fill_encoder_memories(self, embedding, memory_content):
         """Add memories that come from encoder."""
         embedding = embedding.tolist()
@@ -1,6 +1,7 @@
 import datetime
 import logging
 from lyfe_agent.memory.document import Document
+from lyfe_agent.utils.clock import get_clock
 from threading import Event, Lock
 from typing import List, Dict, Union, Any, Optional
 
@@ -78,7 +79,7 @@ class ObsBuffer:
         # Create metadata
         metadata = {
             "in_world_time": in_world_time,
-            "expire_time": datetime.datetime.now() + self.delay,
+            "expire_time": get_clock().now() + self.delay,
             "type": obs_type,
         }
 
@@ -90,6 +91,36 @@ class ObsBuffer:
             self.observation_bank.pop(0)
         self.observation_bank.append(observation)
 
+    def add_many(
+        self,
+        documents: List[str],
+        obs_type: str = "audio",
+        in_world_time: str = None,
+    ) -> None:
+        """Add observations to the buffer in one pass."""
+        assert obs_type in [
+            "audio",
+            "visual",
+            "spacial",
+            "mental",
+        ], f"obs_type must be within {['audio', 'visual', 'spacial', 'mental']}"
+
+        expire_time = get_clock().now() + self.delay
+        self.observation_bank.extend(
+            Document(
+                content=document,
+                metadata={
+                    "in_world_time": in_world_time,
+                    "expire_time": expire_time,
+                    "type": obs_type,
+                },
+            )
+            for document in documents
+        )
+        # keep the most recent observations if capacity is reached
+        if len(self.observation_bank) > self.capacity:
+            del self.observation_bank[: len(self.observation_bank) - self.capacity]
+
     def clear(self) -> None:
         """Clear all observations."""
         self.observation_bank = []
@@ -99,8 +130,8 @@ class ObsBuffer:
         self.observation_bank = [
             observation
             for observation in self.observation_bank
-            # if observation["metadata"]["expire_time"] > datetime.datetime.now()
-            if observation.metadata["expire_time"] > datetime.datetime.now()
+            # if observation["metadata"]["expire_time"] > get_clock().now()
+            if observation.metadata["expire_time"] > get_clock().now()
         ]
 
     def update(self) -> None:
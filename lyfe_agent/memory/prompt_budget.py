@@ -0,0 +1,175 @@
+"""Token budgets for memory variables in prompts.
+
+`load_memory_variables` used to join whole memory stores into the prompt, so prompt
+size (and therefore LLM latency and cost) grew with the length of a simulation.
+A PromptBudget caps each memory variable at a number of tokens, configurable per
+chain, and selects the items to keep by recency (or by relevance rank for queried
+memories), truncating an item only if it alone exceeds the budget.
+"""
+import contextlib
+import contextvars
+import functools
+import logging
+import threading
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHAIN = "default"
+CHARS_PER_TOKEN = 4  # rough estimate used when tiktoken is not available
+
+_current_chain = contextvars.ContextVar("prompt_budget_chain", default=DEFAULT_CHAIN)
+
+_UNRESOLVED = object()
+_encoding = _UNRESOLVED
+_encoding_lock = threading.Lock()
+
+
+def _get_encoding():
+    """The tiktoken encoding, resolved on first use, None to estimate tokens instead.
+
+    Resolving it may download the BPE file, so it is not done at import time, and an
+    offline machine with a cold cache falls back to the estimate.
+    """
+    global _encoding
+    if _encoding is _UNRESOLVED:
+        with _encoding_lock:
+            if _encoding is _UNRESOLVED:
+                encoding = None
+                if tiktoken is not None:
+                    try:
+                        encoding = tiktoken.get_encoding("cl100k_base")
+                    except Exception as e:
+                        logger.warning(
+                            f"[PROMPT BUDGET] tiktoken encoding unavailable ({e}), "
+                            f"estimating {CHARS_PER_TOKEN} characters per token"
+                        )
+                _encoding = encoding
+    return _encoding
+
+
+@functools.lru_cache(maxsize=65_536)
+def count_tokens(text: str) -> int:
+    """Number of tokens in `text`, cached per memory item."""
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def truncate_to_tokens(text: str, budget: int) -> str:
+    """Keep the beginning of `text` so that it fits in `budget` tokens."""
+    if budget <= 0:
+        return ""
+    encoding = _get_encoding()
+    if encoding is not None:
+        tokens = encoding.encode(text, disallowed_special=())
+        return text if len(tokens) <= budget else encoding.decode(tokens[:budget]) + "..."
+    max_chars = budget * CHARS_PER_TOKEN
+    return text if len(text) <= max_chars else text[:max_chars] + "..."
+
+
+def fit_items(
+    items: List[str], budget: Optional[int], newest_last: bool = True
+) -> Tuple[List[str], int]:
+    """Select items to fit in a token budget.
+
+    Args:
+        items: candidate items, oldest first if `newest_last`, otherwise ranked
+            by relevance (most relevant first)
+        budget: maximum number of tokens, None for no limit
+        newest_last: keep the newest items (True) or the top ranked items (False)
+
+    Returns:
+        the kept items in their original order, and the number of dropped or truncated items
+    """
+    if budget is None:
+        return items, 0
+    if budget <= 0:
+        return [], len(items)
+
+    ordered = reversed(items) if newest_last else items
+    kept, used, truncated = [], 0, 0
+    for item in ordered:
+        tokens = count_tokens(item)
+        if used + tokens <= budget:
+            kept.append(item)
+            used += tokens
+        elif not kept:
+            # a single item larger than the whole budget is truncated instead of dropped
+            kept.append(truncate_to_tokens(item, budget))
+            truncated = 1
+            break
+        else:
+            break
+
+    if newest_last:
+        kept.reverse()
+    return kept, len(items) - len(kept) + truncated
+
+
+@contextlib.contextmanager
+def prompt_budget_chain(chain_name: Optional[str]):
+    """Memory variables loaded inside this block use the budgets of `chain_name`."""
+    token = _current_chain.set(chain_name or DEFAULT_CHAIN)
+    try:
+        yield
+    finally:
+        _current_chain.reset(token)
+
+
+def current_chain() -> str:
+    return _current_chain.get()
+
+
+class PromptBudget:
+    """Token budgets per memory variable, with per-chain overrides.
+
+    Example config:
+        default:
+            workmem: 400
+            convomem: 600
+        chains:
+            talk:
+                convomem: 1000
+    """
+
+    def __init__(self, default: Dict[str, int] = None, chains: Dict[str, Dict[str, int]] = None):
+        self.default = dict(default or {})
+        self.chains = {name: dict(budgets or {}) for name, budgets in (chains or {}).items()}
+
+    def get(self, memory_key: str, chain_name: str = DEFAULT_CHAIN) -> Optional[int]:
+        budgets = self.chains.get(chain_name, {})
+        return budgets.get(memory_key, self.default.get(memory_key))
+
+
+class PromptMetrics:
+    """Per-chain statistics on the size of the memory variables put in prompts."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.stats: Dict[str, Dict[str, float]] = {}
+
+    def record(self, chain_name: str, tokens: Dict[str, int], trimmed: int):
+        total = sum(tokens.values())
+        with self.lock:
+            stats = self.stats.setdefault(
+                chain_name, {"calls": 0, "total_tokens": 0, "max_tokens": 0, "trimmed_items": 0}
+            )
+            stats["calls"] += 1
+            stats["total_tokens"] += total
+            stats["max_tokens"] = max(stats["max_tokens"], total)
+            stats["trimmed_items"] += trimmed
+        logger.debug(f"[PROMPT BUDGET][{chain_name}] {total} memory tokens {tokens}, {trimmed} items trimmed")
+
+    def report(self) -> Dict[str, Dict[str, float]]:
+        with self.lock:
+            return {
+                chain_name: stats | {"mean_tokens": stats["total_tokens"] / max(stats["calls"], 1)}
+                for chain_name, stats in self.stats.items()
+            }
@@ -7,6 +7,8 @@ class Schedule:
         Initializes the Schedule with a given initial_schedule or an empty one.
         """
         self.current_time = "01/01 06:00"
+        # time of the last goal whose time was reached, see `is_goal_due`
+        self.notified_goal_time = None
         self.schedule = [
             self._get_formatted(event) for event in (initial_schedule or [])
         ]
@@ -112,6 +114,26 @@ class Schedule:
         """
         return self.schedule[0]["metadata"]["time"] if self.schedule else None
 
+    def is_goal_due(self, time_str):
+        """
+        Returns True if the time of the current goal is reached or passed at time_str,
+        and was not yet marked with `mark_goal_notified`.
+        """
+        goal_time = self.current_goal_time
+        if time_str is None or goal_time is None or goal_time == self.notified_goal_time:
+            return False
+        try:
+            return not self._is_time_less_than(time_str, goal_time)
+        except ValueError:
+            # times without a date
+            return time_str == goal_time
+
+    def mark_goal_notified(self):
+        """
+        Marks the time of the current goal as reached, so that it is acted upon once.
+        """
+        self.notified_goal_time = self.current_goal_time
+
     @property
     def is_empty(self):
         """
@@ -0,0 +1,98 @@
+"""Cooperative cancellation of slow functions.
+
+`Future.cancel()` cannot stop a slow function that already runs on a pool worker.
+Instead, every submitted slow function gets a CancellationToken, which is made
+available to the code it calls through `current_token()`. Long-running steps
+(chain invocations, LLM requests and streamed responses) check the token and abort
+with `SlowFuncCancelled`, which frees the worker and stops spending tokens.
+"""
+import contextlib
+import contextvars
+import logging
+import threading
+from typing import Any, Optional
+
+from langchain.callbacks.base import BaseCallbackHandler
+
+logger = logging.getLogger(__name__)
+
+_current_token = contextvars.ContextVar("cancellation_token", default=None)
+
+
+class SlowFuncCancelled(Exception):
+    """Raised inside a slow function whose token was cancelled."""
+
+
+class CancellationToken:
+    """Thread-safe flag shared between the submitter and the running slow function."""
+
+    def __init__(self, name: str = ""):
+        self.name = name
+        self.reason: Optional[str] = None
+        # set by the worker when the slow function starts, None while it is queued
+        self.started_at = None
+        self._event = threading.Event()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self, reason: str = "cancelled"):
+        if self._event.is_set():
+            return
+        self.reason = reason
+        self._event.set()
+        logger.debug(f"[CANCEL] {self.name} cancelled: {reason}")
+
+    def raise_if_cancelled(self):
+        if self._event.is_set():
+            raise SlowFuncCancelled(f"{self.name} cancelled: {self.reason}")
+
+
+@contextlib.contextmanager
+def cancellation_scope(token: Optional[CancellationToken]):
+    """Make `token` the current token for code running inside this block."""
+    reset = _current_token.set(token)
+    try:
+        yield token
+    finally:
+        _current_token.reset(reset)
+
+
+def current_token() -> Optional[CancellationToken]:
+    return _current_token.get()
+
+
+def check_cancelled():
+    """Raise SlowFuncCancelled if the current slow function was cancelled."""
+    token = _current_token.get()
+    if token is not None:
+        token.raise_if_cancelled()
+
+
+class CancellationCallbackHandler(BaseCallbackHandler):
+    """Aborts a chain when its token is cancelled.
+
+    Checked before every LLM request and on every streamed token, so a cancelled
+    call never starts a new request and a streamed response is closed early.
+    """
+
+    raise_error = True
+
+    def __init__(self, token: CancellationToken):
+        self.token = token
+
+    def on_chain_start(self, serialized, inputs, **kwargs: Any) -> None:
+        self.token.raise_if_cancelled()
+
+    def on_llm_start(self, serialized, prompts, **kwargs: Any) -> None:
+        self.token.raise_if_cancelled()
+
+    def on_chat_model_start(self, serialized, messages, **kwargs: Any) -> None:
+        self.token.raise_if_cancelled()
+
+    def on_llm_new_token(self, token: str, **kwargs: Any) -> None:
+        self.token.raise_if_cancelled()
+
+    def on_retry(self, retry_state, **kwargs: Any) -> Any:
+        self.token.raise_if_cancelled()
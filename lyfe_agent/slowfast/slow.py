@@ -1,11 +1,16 @@
 import concurrent.futures
 from concurrent.futures import Executor, Future
 from threading import Lock
-import datetime
 import random
 
 import logging
+from lyfe_agent.utils.clock import get_clock
 from lyfe_agent.utils.log_utils import log_message, log_error
+from lyfe_agent.slowfast.cancellation import (
+    CancellationToken,
+    SlowFuncCancelled,
+    cancellation_scope,
+)
 from typing import Any
 
 logger = logging.getLogger(__name__)
@@ -111,12 +116,30 @@ class SlowThreadModule:
         self._future = Future()
         self._current_input = None
         self._future.set_result(None)
-        self._time_submit_slow_func = datetime.datetime.now()
+        self._time_submit_slow_func = get_clock().now()
+        self._token = CancellationToken(self.name)
+        # called with the future when a submitted slow func completes (e.g. to wake the agent)
+        self.on_complete = None
+        # checked last before a submission, returns False to hold it back (e.g. a call budget)
+        self.submit_gate = None
+
+    def _run_slow_func(self, token, inputs):
+        """Runs on the worker thread, with `token` visible to chains and LLM calls."""
+        with cancellation_scope(token):
+            token.raise_if_cancelled()
+            return self.slow_func(inputs)
+
+    def cancel(self, reason: str = "cancelled"):
+        """Cooperatively cancel the in-flight slow function, if any."""
+        if self._future.done() or self._token.cancelled:
+            return
+        self._token.cancel(reason)
+        self._future.cancel()  # only effective if the task has not started yet
 
     def can_submit_slow_func(self, external_signal=False, suspended_time=0.0) -> bool:
         """Determines if a new slow func should be submitted for execution."""
         time_since_last_run = (
-            datetime.datetime.now() - self._time_submit_slow_func
+            get_clock().now() - self._time_submit_slow_func
         ).total_seconds()
         enough_time_passed = time_since_last_run >= suspended_time
         return (
@@ -124,6 +147,7 @@ class SlowThreadModule:
             and self._future.done()
             and external_signal
             and enough_time_passed
+            and (self.submit_gate is None or self.submit_gate())
         )
 
     def submit_slow_func(self, inputs):
@@ -133,8 +157,11 @@ class SlowThreadModule:
         logger.debug(f"[SLOW] Submitting slow func for {self.name} {inputs}")
         try:
             self._current_input = inputs  # Save the input
-            self._future = self._executor.submit(self.slow_func, inputs)
-            self._time_submit_slow_func = datetime.datetime.now()
+            self._token = CancellationToken(self.name)
+            self._future = self._executor.submit(self._run_slow_func, self._token, inputs)
+            if self.on_complete is not None:
+                self._future.add_done_callback(self.on_complete)
+            self._time_submit_slow_func = get_clock().now()
         except Exception as e:
             logger.error(f"[SLOW] Exception during {self.name} process because of {e}")
 
@@ -176,13 +203,16 @@ class SlowThreadModule:
                     f"[SLOW] {self.name} result retrieval timed out after {COMPLETION_TIMEOUT}"
                 )
                 self._latest_slow_result = None
+            except (SlowFuncCancelled, concurrent.futures.CancelledError):
+                logger.debug(f"[SLOW] {self.name} slow func was cancelled")
+                self._latest_slow_result = None
             except Exception as e:
                 logger.error(f"[SLOW] Exception during {self.name} process")
                 self._latest_slow_result = None
 
     def _handle_incomplete_task(self):
         time_since_last_run = (
-            datetime.datetime.now() - self._time_submit_slow_func
+            get_clock().now() - self._time_submit_slow_func
         ).total_seconds()
 
         if not self._future.cancelled() and time_since_last_run > INCOMPLETION_TIMEOUT:
@@ -190,7 +220,7 @@ class SlowThreadModule:
                 f"[SLOW] {self.name} process timed out after {time_since_last_run}s."
             )
             self._latest_slow_result = None
-            self._future.cancel()
+            self.cancel(f"timed out after {time_since_last_run:.1f}s")
 
     def log_io_pair(self, input_data, output_data):
         """Logs the input and output data."""
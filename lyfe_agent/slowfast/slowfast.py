@@ -5,7 +5,13 @@ import datetime
 import random
 
 import logging
+from lyfe_agent.utils.clock import get_clock
 from lyfe_agent.utils.log_utils import log_error
+from lyfe_agent.slowfast.cancellation import (
+    CancellationToken,
+    SlowFuncCancelled,
+    cancellation_scope,
+)
 from typing import Any
 
 logger = logging.getLogger(__name__)
@@ -61,10 +67,56 @@ class SlowFastModule:
         self._future.set_result(None)
         self._slow_result_first_avail = True
         self._count = 0
-        self._time_submit_slow_func = datetime.datetime.now() + datetime.timedelta(
+        self._time_submit_slow_func = get_clock().now() + datetime.timedelta(
             seconds=random.uniform(-0.5, 0.5)
         )
         self._current_input = None
+        self._token = CancellationToken(self.name)
+        # called with the future when a submitted slow func completes (e.g. to wake the agent)
+        self.on_complete = None
+        # checked last before a submission, returns False to hold it back (e.g. a call budget)
+        self.submit_gate = None
+
+    def _run_slow_func(self, token, inputs):
+        """Runs on the worker thread, with `token` visible to chains and LLM calls."""
+        token.started_at = get_clock().now()
+        with cancellation_scope(token):
+            token.raise_if_cancelled()
+            return self.slow_func(inputs)
+
+    @property
+    def is_running(self) -> bool:
+        """Whether the slow func runs on a worker, not merely queued for one."""
+        return self._token.started_at is not None and not self._future.done()
+
+    def time_since_start(self) -> float:
+        """Seconds the slow func has been running, 0 if it has not started."""
+        started_at = self._token.started_at
+        if started_at is None:
+            return 0.0
+        return (get_clock().now() - started_at).total_seconds()
+
+    def cancel(self, reason: str = "cancelled"):
+        """Cooperatively cancel the in-flight slow function, if any."""
+        if self._future.done() or self._token.cancelled:
+            return
+        self._token.cancel(reason)
+        self._future.cancel()  # only effective if the task has not started yet
+
+    def supersede(self, reason: str = "superseded"):
+        """
+        Cancel the in-flight slow function and drop its result, so that a new one
+        can be submitted right away instead of waiting for the stale one to finish.
+        """
+        if self._future.done():
+            return
+        logger.debug(f"[SLOW FAST] {self.name} in-flight slow func {reason}")
+        self.cancel(reason)
+        with self._result_lock:
+            self._latest_slow_result = None
+            self._slow_result_first_avail = False
+            self._future = Future()
+            self._future.set_result(None)
 
     def get_result(self, inputs):
         with self._result_lock:
@@ -76,18 +128,26 @@ class SlowFastModule:
     def can_submit_slow_func(self, suspended_time=0.0) -> bool:
         """Determines if a new slow func should be submitted for execution."""
         time_since_last_run = (
-            datetime.datetime.now() - self._time_submit_slow_func
+            get_clock().now() - self._time_submit_slow_func
         ).total_seconds()
         enough_time_passed = time_since_last_run >= suspended_time
-        return self._slow_on and self._future.done() and enough_time_passed
+        return (
+            self._slow_on
+            and self._future.done()
+            and enough_time_passed
+            and (self.submit_gate is None or self.submit_gate())
+        )
 
     def submit_slow_func(self, inputs):
         """Submit a new slow func for execution."""
         logger.debug(f"[SLOW FAST] Submitting slow func for {self.name} {inputs}")
         try:
             self._current_input = inputs  # Save the input
-            self._future = self.executor.submit(self.slow_func, inputs)
-            self._time_submit_slow_func = datetime.datetime.now()
+            self._token = CancellationToken(self.name)
+            self._future = self.executor.submit(self._run_slow_func, self._token, inputs)
+            if self.on_complete is not None:
+                self._future.add_done_callback(self.on_complete)
+            self._time_submit_slow_func = get_clock().now()
             self._count += 1
             self._slow_result_first_avail = (
                 True  # When slow result first becomes available
@@ -132,6 +192,9 @@ class SlowFastModule:
                     )
                 )
                 self._latest_slow_result = None
+            except (SlowFuncCancelled, concurrent.futures.CancelledError):
+                logger.debug(f"[SLOW FAST] {self.name} slow func was cancelled")
+                self._latest_slow_result = None
             except Exception as e:
                 logger.error(
                     log_error(self, f"Exception during {self.name} process", exc=e)
@@ -140,10 +203,10 @@ class SlowFastModule:
 
     def _handle_incomplete_task(self):
         time_since_last_run = (
-            datetime.datetime.now() - self._time_submit_slow_func
+            get_clock().now() - self._time_submit_slow_func
         ).total_seconds()
         if not self._future.cancelled() and time_since_last_run > INCOMPLETION_TIMEOUT:
-            current_time = datetime.datetime.now()
+            current_time = get_clock().now()
             if self._last_log_time is None or (current_time - self._last_log_time).total_seconds() > 10.0:
                 logger.error(
                     log_error(
@@ -154,7 +217,7 @@ class SlowFastModule:
                 self._last_log_time = current_time
             self._latest_slow_result = None
             self._slow_result_first_avail = False
-            self._future.cancel()
+            self.cancel(f"timed out after {time_since_last_run:.1f}s")
 
     def log_io_pair(self, input_data, output_data):
         """Logs the input and output data."""
@@ -1,15 +1,35 @@
-import datetime
 import random
+import threading
 
 from lyfe_agent.states.options import Options
 from typing import Dict, Optional
 
 from lyfe_agent.states.simple_states import describe_location
+from lyfe_agent.utils.clock import get_clock
 
 
 # TODO: More structured description
 AgentStateData = Dict
 
+
+class AgentStateSnapshot(dict):
+    """Read-only view of the agent state handed to chains.
+
+    Snapshots are shared between callers until the state changes, so they must not
+    be mutated; use `snapshot | {...}` to derive a new (plain) dict instead.
+    """
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("AgentStateSnapshot is read-only, use `data | {...}` instead")
+
+    __setitem__ = __delitem__ = _readonly
+    update = pop = popitem = clear = setdefault = __ior__ = _readonly
+
+
+def state_versions(*states):
+    """Dependency key for cached fields: which state objects, at which versions."""
+    return tuple((id(state), getattr(state, "version", 0)) for state in states)
+
 # Class that aggregates all agent states together that are passed downstream (container of states)
 # Note that the current definition is a temporary one
 class AgentState:
@@ -47,7 +67,14 @@ class AgentState:
             setattr(self, key, data[key])
 
         # self._data = {} if data is None else data  # Note the underscore prefix
+        # extra variables set by option executors (see set_variable)
         self._data = {}
+        self._data_version = 0
+
+        # incremental assembly of `data`: field group -> (dependency key, value)
+        self._field_cache = {}
+        self._snapshot = None
+        self._snapshot_lock = threading.Lock()
 
         self.nonce = [None, '', ' ', '\n', '.']
 
@@ -67,6 +94,10 @@ class AgentState:
         self.evaluation_monitor = observations.get("evaluation_monitor", False)
 
         self.schedule.update(new_time=self.current_time.data)
+        if self.schedule.is_goal_due(self.current_time.data):
+            # not handled by the sense interaction
+            self.schedule.mark_goal_notified()
+            self.set_new_event(True, "schedule goal time")
         self.options.update(observations)
         # self.option_history.update(self.current_option)
         self.repetition_detector.update()
@@ -75,39 +106,101 @@ class AgentState:
     # Perceptions that are observable to the agent, passed along to chains
     @property
     def data(self) -> AgentStateData:
-        self._data.update({
-            "name": self.name, # this is the only one that is a string right now
-            "personality": self.personality,
-            "current_goal": self.current_goal,
-            "current_time": self.current_time.data,
-            "time": self.current_time.data,
-            "map": self.knowledge.get_map_content(self.location),
-            "receiver": "None",
-            "bag_content": self.knowledge.get_bag_content(),
-            "contacts": self.contacts.get_contacts(),
-            "evaluation_monitor": self.evaluation_monitor,  # Used for downstream tasks outside the simulation
-        })
-        # get world model related information
-        self._data |= self.summary_state.data
-        self._data |= self.current_option.data
-
-        # get location
-        self._data["location"] = describe_location(self.location)
-
-        self._data["nearby_creature"] = ", ".join(
-            [str(n) for n in self.nearby_creature.data]
-            if self.nearby_creature.data  # is not None
-            else []
-        )
+        """
+        Returns a read-only snapshot of the agent state.
+        Each field group is only recomputed when the states it depends on have a new
+        version, and the previous snapshot is returned as is if nothing changed.
+        """
+        with self._snapshot_lock:
+            changed = self._snapshot is None
+            fields = {}
+            for key, deps, compute in self._field_groups():
+                cached = self._field_cache.get(key)
+                if cached is None or cached[0] != deps:
+                    cached = (deps, compute())
+                    self._field_cache[key] = cached
+                    changed = True
+                fields.update(cached[1])
+
+            if changed:
+                self._snapshot = AgentStateSnapshot(fields)
+            return self._snapshot
+
+    def _field_groups(self):
+        """(key, dependencies, compute) for every group of fields in `data`."""
+        # states may be swapped out temporarily (e.g. Interview), hence the lookup here
+        location, knowledge = self.location, self.knowledge
+        nearby_creature, options = self.nearby_creature, self.options
+        return [
+            (
+                "metadata",
+                (self.name, self.personality, self.current_goal, self.evaluation_monitor),
+                lambda: {
+                    "name": self.name,  # this is the only one that is a string right now
+                    "personality": self.personality,
+                    "current_goal": self.current_goal,
+                    "receiver": "None",
+                    "evaluation_monitor": self.evaluation_monitor,  # Used for downstream tasks outside the simulation
+                },
+            ),
+            (
+                "time",
+                state_versions(self.current_time),
+                lambda: {
+                    "current_time": self.current_time.data,
+                    "time": self.current_time.data,
+                },
+            ),
+            (
+                "map",
+                state_versions(knowledge, location),
+                lambda: {
+                    "map": knowledge.get_map_content(location),
+                    "bag_content": knowledge.get_bag_content(),
+                },
+            ),
+            (
+                "contacts",
+                state_versions(self.contacts),
+                lambda: {"contacts": self.contacts.get_contacts()},
+            ),
+            # get world model related information
+            ("summary", state_versions(self.summary_state), lambda: self.summary_state.data),
+            ("current_option", state_versions(self.current_option), lambda: self.current_option.data),
+            # get location
+            ("location", state_versions(location), lambda: {"location": describe_location(location)}),
+            (
+                "nearby_creature",
+                state_versions(nearby_creature),
+                lambda: {
+                    "nearby_creature": ", ".join(
+                        [str(n) for n in nearby_creature.data]
+                        if nearby_creature.data  # is not None
+                        else []
+                    )
+                },
+            ),
+            ("options", state_versions(options), self._options_fields),
+            (
+                "realworld_datetime",
+                int(get_clock().time()),
+                lambda: {"realworld_datetime": get_clock().now().strftime('%Y-%m-%d %H:%M:%S')},
+            ),
+            ("variables", self._data_version, lambda: dict(self._data)),
+        ]
 
+    def _options_fields(self):
         available_options, illustrations = self.options.get_available_options_and_descriptions()
-        
-        self._data["option_list"] = available_options
-        self._data["illustration"] = illustrations
+        return {"option_list": available_options, "illustration": illustrations}
 
-        self._data["realworld_datetime"] = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    def set_variable(self, key, value):
+        """Expose an extra variable to chains through `data`."""
+        self._data[key] = value
+        self._data_version += 1
 
-        return self._data
+    def remove_variable(self, key):
+        self._data.pop(key, None)
+        self._data_version += 1
 
     # Make updates related to action here
     def start_action(self, action):
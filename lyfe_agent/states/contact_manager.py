@@ -52,6 +52,7 @@ class ContactManager(BaseState):
         for contact in contacts:
             if contact not in self._agent_contacts and contact != self._name:
                 self._agent_contacts.append(contact)
+                self.touch()
 
     def add_player_contacts(self, contacts: List[str]):
         """Add player contacts to the agent.
@@ -62,6 +63,7 @@ class ContactManager(BaseState):
         for contact in contacts:
             if contact not in self._player_contacts:
                 self._player_contacts.append(contact)
+                self.touch()
 
     def update(self, contacts_info):
         if contacts_info and self._add_players:
@@ -34,12 +34,14 @@ class KnowledgeManager(BaseState):
     def set_map(self, map):
         # Convert the map list to a dictionary with empty strings as values
         self.map = {location: "" for location in map}
+        self.touch()
 
     def update(self, observations):
         # Update the map with new locations from observations
         for location in observations.get("locations", []):
             if location not in self.map:
                 logger.info(f"Adding location {location} to the map.")
+                self.touch()
             self.map[location] = ""  # Add location with an empty string as its value
 
     def get_map_content(self, location):
@@ -65,9 +65,17 @@ class Options:
         # determines the kinds of options that are available
         self.env_detail = None
 
+        # incremented whenever the available options change (see `version`)
+        self._version = 0
+
         for item in self.option_list:
             self.option_status.add_variable(item)
 
+    @property
+    def version(self):
+        """Changes whenever get_available_options_and_descriptions would change."""
+        return (self._version, self.skill_manager.buffer_version)
+
     @property
     def data(self): # TODO: integrate with skill manager
         return self._available_options
@@ -115,6 +123,8 @@ class Options:
         TODO: for now `env_detail` is a string, but really acts as a boolean
         where we only care if it is 'basic' or not 'basic'.
         """
+        if env_detail != self.env_detail:
+            self._version += 1
         self.env_detail = env_detail
 
     def update(self, observations):
@@ -134,6 +144,7 @@ class Options:
         if observations.get("environment_details"):
             self.set_env_conditioning(observations["environment_details"])
 
+        previous_options = self._available_options
         self._available_options = self._all_available_options.copy()
 
         self._update_last_chosen_option()
@@ -142,6 +153,9 @@ class Options:
         self._possibly_avoid_action_repeat()
         self._talk_only_if_someone_is_around()
 
+        if self._available_options != previous_options:
+            self._version += 1
+
     def _update_last_chosen_option(self):
         if self.option_history.last_option and (
             self.option_history.last_option.option_name
@@ -67,6 +67,8 @@ class SimpleState(BaseState):
         return self._data
 
     def update(self, value):
+        if value != self._data:
+            self.touch()
         self._data = value
 
 
@@ -86,6 +88,7 @@ class NewEventDetector(SimpleState):
             self._data = (new_event, "not given")
         else:
             self._data = (new_event, source_reason)
+        self.touch()
 
 
 class CurrentOption(BaseState):
@@ -97,6 +100,7 @@ class CurrentOption(BaseState):
         self.option_name = option_name
         if option_goal:
             self.option_goal = option_goal
+        self.touch()
 
     @property
     def data(self):
@@ -127,3 +131,4 @@ class Location(BaseState):
             self.destination = destination
         if self.type == "person" and nearby_creature:
             self.found = self.destination in nearby_creature.data
+        self.touch()
@@ -45,3 +45,4 @@ class SummaryState(BaseState):
                 self.summary_details[key] = kwargs[key]
             # After updating, make sure the summary is also updated
             self._update_summary()
+            self.touch()
@@ -0,0 +1,89 @@
+import threading
+import uuid
+from typing import List, Optional, Tuple
+
+from lyfe_agent.base import BaseState
+
+
+class TalkStream(BaseState):
+    """
+    Hand-off of partially generated talk from the slow thread to the agent's main loop.
+
+    The talk option executor starts a stream, pushes the reply decoded so far while the
+    LLM is still generating, and finishes the stream once the full reply is parsed.
+    The agent pops the latest partial reply on every step and emits it to the environment.
+    A stream that ends without a reply (cancelled, failed or silent) is retracted, so that
+    the environment can remove the partial reply it already shows.
+
+    Streaming is off unless `enabled`, as the game client must support `streamId`/`final`.
+    """
+
+    def __init__(self, enabled: bool = False, min_chars: int = 8):
+        self.enabled = enabled
+        # partial replies shorter than this are held back (e.g. a "[NONE]" in the making)
+        self.min_chars = min_chars
+        self._lock = threading.Lock()
+        self._stream_id: Optional[str] = None
+        self._text = ""
+        self._dirty = False
+        self._retracted: List[str] = []
+
+    @property
+    def data(self):
+        return self._stream_id
+
+    @property
+    def pending(self) -> bool:
+        """Whether a partial reply or a retraction is waiting to be popped."""
+        return self._dirty or bool(self._retracted)
+
+    def start(self) -> str:
+        with self._lock:
+            self._stream_id = uuid.uuid4().hex
+            self._text = ""
+            self._dirty = False
+            return self._stream_id
+
+    def push(self, text: Optional[str]):
+        """Sets the partial reply, None once the reply is known not to be said."""
+        if text is None:
+            with self._lock:
+                self._dirty = False
+            return
+        text = text.strip()
+        if len(text) < self.min_chars or text.upper().startswith("[NONE"):
+            return
+        with self._lock:
+            if self._stream_id is not None and text != self._text:
+                self._text = text
+                self._dirty = True
+
+    def pop(self) -> Optional[Tuple[str, str]]:
+        """Returns (stream_id, text so far) if the partial reply changed since the last pop."""
+        with self._lock:
+            if not self._dirty:
+                return None
+            self._dirty = False
+            return self._stream_id, self._text
+
+    def finish(self) -> Optional[str]:
+        """Ends the stream, returns its id if any partial reply was emitted for it."""
+        with self._lock:
+            stream_id = self._stream_id if self._text else None
+            self._stream_id = None
+            self._text = ""
+            self._dirty = False
+            return stream_id
+
+    def retract(self, stream_id: Optional[str]):
+        """Queues the retraction of a finished stream that has no final reply."""
+        if stream_id is None:
+            return
+        with self._lock:
+            self._retracted.append(stream_id)
+
+    def pop_retracted(self) -> List[str]:
+        """Returns the ids of the streams retracted since the last pop."""
+        with self._lock:
+            retracted, self._retracted = self._retracted, []
+            return retracted
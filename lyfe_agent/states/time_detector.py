@@ -1,5 +1,7 @@
 from lyfe_agent.base import BaseState
-from datetime import datetime, timedelta
+from datetime import timedelta
+
+from lyfe_agent.utils.clock import get_clock
 
 
 class ExpireTimeDetector(BaseState):
@@ -7,7 +9,7 @@ class ExpireTimeDetector(BaseState):
         self.delta_time = timedelta(minutes=delta_time)
         self.record_action_time = {
             "option_name": None,
-            "expire_time": datetime.now() + self.delta_time,
+            "expire_time": get_clock().now() + self.delta_time,
         }
         self.is_expired = False
         self.time_based_new_event = time_based_new_event
@@ -20,16 +22,25 @@ class ExpireTimeDetector(BaseState):
         ):
             self.record_action_time = {
                 "option_name": current_option.data["option_name"],
-                "expire_time": datetime.now() + self.delta_time,
+                "expire_time": get_clock().now() + self.delta_time,
             }
             self.is_expired = False
 
         if (
             self.time_based_new_event
-            and datetime.now() > self.record_action_time["expire_time"]
+            and get_clock().now() > self.record_action_time["expire_time"]
         ):
             self.is_expired = True
 
+    @property
+    def is_due(self) -> bool:
+        """Whether the current option expires as soon as the detector is updated."""
+        return (
+            self.time_based_new_event
+            and not self.is_expired
+            and get_clock().now() > self.record_action_time["expire_time"]
+        )
+
     @property
     def data(self):
         return {
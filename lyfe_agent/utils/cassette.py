@@ -0,0 +1,327 @@
+"""Record/replay ("cassette") backend for LLM and embedding I/O.
+
+A cassette captures every chat-model call and every encoder batch made during a
+run, together with its inputs, outputs and wall-clock latency, into a single
+gzip-compressed JSON-lines file. In replay mode the same file is served back so
+that a simulation can be re-run deterministically without the live APIs, either
+at the recorded latency (realistic timing) or at zero latency (full speed).
+
+Usage:
+    cassette = Cassette("run.cassette.jsonl.gz", mode="record")
+    use_cassette(cassette)
+    llm = wrap_llm(llm)                      # done in Agent.setup_brain
+    encoder_func = wrap_encoder(encoder_func)  # done when building EncoderManager
+    ...
+    cassette.close()
+
+LLM calls are replayed in order per stream. A stream is the chain that issued the
+call (see `cassette_stream`), so concurrent chains of different agents do not
+steal each other's answers. Embeddings are content addressed, since they are a
+pure function of the text.
+"""
+import base64
+import contextlib
+import contextvars
+import gzip
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import defaultdict, deque
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from langchain.chat_models.base import BaseChatModel, generate_from_stream
+from langchain.schema import AIMessage, ChatGeneration, ChatResult
+from langchain.schema.messages import AIMessageChunk
+from langchain.schema.output import ChatGenerationChunk
+
+from lyfe_agent.chains.streaming import generate_streaming, stream_requested
+
+logger = logging.getLogger(__name__)
+
+CASSETTE_VERSION = 1
+MODES = ("off", "record", "replay")
+LATENCIES = ("recorded", "zero")
+
+_active_cassette: Optional["Cassette"] = None
+_current_stream = contextvars.ContextVar("cassette_stream", default=None)
+
+
+class CassetteMiss(RuntimeError):
+    """Raised when a replayed run asks for a call that was never recorded."""
+
+
+def _encode_array(array) -> Dict[str, Any]:
+    array = np.asarray(array, dtype=np.float32)
+    return {
+        "shape": list(array.shape),
+        "b64": base64.b64encode(array.tobytes()).decode("ascii"),
+    }
+
+
+def _decode_array(data: Dict[str, Any]) -> np.ndarray:
+    array = np.frombuffer(base64.b64decode(data["b64"]), dtype=np.float32)
+    return array.reshape(data["shape"])
+
+
+def _text_key(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+class Cassette:
+    """Records LLM/encoder calls to a file, or replays them from one.
+
+    Args:
+        path: location of the cassette file (gzip compressed JSON lines)
+        mode: "record", "replay" or "off"
+        latency: in replay mode, "recorded" sleeps for the recorded latency of each
+            call, "zero" returns immediately
+        strict: in replay mode, raise CassetteMiss for unknown embeddings instead of
+            falling back to a deterministic pseudo-embedding
+    """
+
+    def __init__(
+        self,
+        path: str,
+        mode: str = "record",
+        latency: str = "recorded",
+        strict: bool = False,
+    ):
+        assert mode in MODES, f"mode must be one of {MODES}, got {mode}"
+        assert latency in LATENCIES, f"latency must be one of {LATENCIES}, got {latency}"
+        self.path = path
+        self.mode = mode
+        self.latency = latency
+        self.strict = strict
+
+        self.lock = threading.Lock()
+        self._file = None
+
+        # replay state
+        self._llm_streams: Dict[str, deque] = defaultdict(deque)
+        self._embeddings: Dict[str, np.ndarray] = {}
+        self._encoder_latencies: deque = deque()
+        self.misses = 0
+
+        if self.mode == "record":
+            self._file = gzip.open(self.path, "wt", encoding="utf-8")
+            self._write({"kind": "header", "version": CASSETTE_VERSION})
+        elif self.mode == "replay":
+            self._load()
+        logger.info(f"[CASSETTE] {self.mode} cassette at {self.path}")
+
+    @property
+    def recording(self) -> bool:
+        return self.mode == "record"
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == "replay"
+
+    def _write(self, entry: Dict[str, Any]):
+        with self.lock:
+            self._file.write(json.dumps(entry, default=str) + "\n")
+
+    def _load(self):
+        with gzip.open(self.path, "rt", encoding="utf-8") as f:
+            for line in f:
+                entry = json.loads(line)
+                kind = entry["kind"]
+                if kind == "header":
+                    assert (
+                        entry["version"] == CASSETTE_VERSION
+                    ), f"Unsupported cassette version {entry['version']}"
+                elif kind == "llm":
+                    self._llm_streams[entry["stream"]].append(entry)
+                elif kind == "encode":
+                    embeddings = _decode_array(entry["output"])
+                    for text, embedding in zip(entry["input"], embeddings):
+                        self._embeddings.setdefault(_text_key(text), embedding)
+                    self._encoder_latencies.append(entry["latency"])
+        logger.info(
+            f"[CASSETTE] Loaded {sum(len(s) for s in self._llm_streams.values())} llm calls "
+            f"in {len(self._llm_streams)} streams and {len(self._embeddings)} embeddings"
+        )
+
+    def _wait(self, latency: float):
+        if self.latency == "recorded" and latency > 0:
+            time.sleep(latency)
+
+    def llm_call(
+        self, stream: str, messages: List[Dict[str, str]], call: Callable[[], Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """Run or replay one chat-model call.
+
+        `call` returns a dict with "text" and (optionally) "llm_output".
+        """
+        if self.replaying:
+            with self.lock:
+                queue = self._llm_streams.get(stream)
+                entry = queue.popleft() if queue else None
+            if entry is None:
+                self.misses += 1
+                raise CassetteMiss(f"No recorded llm call left for stream {stream}")
+            if entry["input"] != messages:
+                logger.debug(f"[CASSETTE] Prompt drift on stream {stream}")
+            self._wait(entry["latency"])
+            return entry["output"]
+
+        start_time = time.perf_counter()
+        output = call()
+        latency = time.perf_counter() - start_time
+        if self.recording:
+            self._write(
+                {
+                    "kind": "llm",
+                    "stream": stream,
+                    "input": messages,
+                    "output": output,
+                    "latency": round(latency, 4),
+                }
+            )
+        return output
+
+    def encode(self, texts: List[str], call: Callable[[List[str]], Any]) -> np.ndarray:
+        """Run or replay one encoder batch."""
+        if self.replaying:
+            with self.lock:
+                latency = (
+                    self._encoder_latencies.popleft() if self._encoder_latencies else 0.0
+                )
+            embeddings = [self._replay_embedding(text) for text in texts]
+            self._wait(latency)
+            return np.stack(embeddings)
+
+        start_time = time.perf_counter()
+        embeddings = call(texts)
+        latency = time.perf_counter() - start_time
+        if self.recording:
+            self._write(
+                {
+                    "kind": "encode",
+                    "input": list(texts),
+                    "output": _encode_array(embeddings),
+                    "latency": round(latency, 4),
+                }
+            )
+        return embeddings
+
+    def _replay_embedding(self, text: str) -> np.ndarray:
+        embedding = self._embeddings.get(_text_key(text))
+        if embedding is not None:
+            return embedding
+        self.misses += 1
+        if self.strict:
+            raise CassetteMiss(f"No recorded embedding for text: {text[:50]}")
+        # Texts that embed the simulation time rarely match exactly, so fall back to a
+        # deterministic unit vector seeded by the text instead of aborting the run.
+        dim = next(iter(self._embeddings.values())).shape[-1] if self._embeddings else 1536
+        seed = int(_text_key(text)[:8], 16)
+        embedding = np.random.default_rng(seed).standard_normal(dim).astype(np.float32)
+        return embedding / np.linalg.norm(embedding)
+
+    def close(self):
+        if self._file is not None:
+            with self.lock:
+                self._file.close()
+                self._file = None
+        if self.misses:
+            logger.warning(f"[CASSETTE] {self.misses} calls were not found on the cassette")
+
+
+def use_cassette(cassette: Optional[Cassette]):
+    """Set the process-wide cassette used by `wrap_llm` and `wrap_encoder`."""
+    global _active_cassette
+    _active_cassette = cassette
+
+
+def get_cassette() -> Optional[Cassette]:
+    return _active_cassette
+
+
+@contextlib.contextmanager
+def cassette_stream(stream: str):
+    """Tag llm calls made inside this block with a replay stream."""
+    token = _current_stream.set(stream)
+    try:
+        yield
+    finally:
+        _current_stream.reset(token)
+
+
+class CassetteChatModel(BaseChatModel):
+    """Chat model that routes every call through a cassette."""
+
+    llm: BaseChatModel
+    cassette: Any
+    default_stream: str = "default"
+
+    @property
+    def _llm_type(self) -> str:
+        return "cassette"
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        if stream_requested(run_manager):
+            return generate_streaming(self, messages, stop=stop, run_manager=run_manager, **kwargs)
+        stream = _current_stream.get() or self.default_stream
+        serialized = [{"role": m.type, "content": m.content} for m in messages]
+
+        def call():
+            result = self.llm._generate(messages, stop=stop, run_manager=run_manager, **kwargs)
+            return {"text": result.generations[0].text, "llm_output": result.llm_output}
+
+        output = self.cassette.llm_call(stream, serialized, call)
+        if self.cassette.replaying and run_manager is not None:
+            # let streaming consumers see the replayed answer
+            run_manager.on_llm_new_token(output["text"])
+        return ChatResult(
+            generations=[ChatGeneration(message=AIMessage(content=output["text"]))],
+            llm_output=output.get("llm_output"),
+        )
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        stream = _current_stream.get() or self.default_stream
+        serialized = [{"role": m.type, "content": m.content} for m in messages]
+        chunks = []
+
+        def call():
+            # the wrapped model reports the tokens to run_manager as they arrive
+            chunks.extend(
+                self.llm._stream(messages, stop=stop, run_manager=run_manager, **kwargs)
+            )
+            result = generate_from_stream(iter(chunks))
+            return {"text": result.generations[0].text, "llm_output": result.llm_output}
+
+        output = self.cassette.llm_call(stream, serialized, call)
+        if chunks:
+            yield from chunks
+            return
+        # replayed answers arrive in one piece
+        if run_manager is not None:
+            run_manager.on_llm_new_token(output["text"])
+        yield ChatGenerationChunk(message=AIMessageChunk(content=output["text"]))
+
+
+def wrap_llm(llm, default_stream: str = "default"):
+    """Wrap a chat model with the active cassette, if any."""
+    cassette = get_cassette()
+    if cassette is None or cassette.mode == "off":
+        return llm
+    return CassetteChatModel(llm=llm, cassette=cassette, default_stream=default_stream)
+
+
+def wrap_encoder(encoder_func: Callable):
+    """Wrap an encoder function with the active cassette, if any."""
+    cassette = get_cassette()
+    if cassette is None or cassette.mode == "off":
+        return encoder_func
+
+    def encode(texts):
+        if isinstance(texts, str):
+            texts = [texts]
+        return cassette.encode(texts, encoder_func)
+
+    return encode
@@ -0,0 +1,92 @@
+"""Injectable clock for agent and environment timing.
+
+Expiry of observations, option timeouts, slow function scheduling and the frame
+rate of the python environments all read the time through `get_clock()` instead
+of `datetime.now()`. By default this is the wall clock. With a VirtualClock the
+environment advances time by one frame per tick instead of sleeping, so that a
+run with instant (mocked or replayed) LLM backends is not bound to real time.
+
+Usage:
+    use_clock(VirtualClock())  # before agents and environment are created
+    ...
+    get_clock().wait(1.0 / frame_rate)  # done in GraphEnv.time_update
+"""
+import datetime
+import logging
+import threading
+import time
+from typing import Optional, Union
+
+logger = logging.getLogger(__name__)
+
+MODES = ("real", "virtual")
+
+
+class Clock:
+    """Wall clock."""
+
+    virtual = False
+
+    def time(self) -> float:
+        """Seconds since the epoch."""
+        return time.time()
+
+    def now(self) -> datetime.datetime:
+        return datetime.datetime.fromtimestamp(self.time())
+
+    def wait(self, seconds: float):
+        """Let `seconds` pass. Only the simulation loop should call this."""
+        if seconds > 0:
+            time.sleep(seconds)
+
+
+class VirtualClock(Clock):
+    """Clock that only moves forward when the simulation loop waits.
+
+    Args:
+        start: initial time, as a datetime, an ISO formatted string or seconds since
+            the epoch. Defaults to the wall clock time at creation.
+    """
+
+    virtual = True
+
+    def __init__(self, start: Union[datetime.datetime, str, float, None] = None):
+        if start is None:
+            start = time.time()
+        elif isinstance(start, str):
+            start = datetime.datetime.fromisoformat(start).timestamp()
+        elif isinstance(start, datetime.datetime):
+            start = start.timestamp()
+        self._time = float(start)
+        self._lock = threading.Lock()
+
+    def time(self) -> float:
+        with self._lock:
+            return self._time
+
+    def wait(self, seconds: float):
+        self.advance(seconds)
+
+    def advance(self, seconds: float):
+        if seconds > 0:
+            with self._lock:
+                self._time += seconds
+
+
+_clock: Clock = Clock()
+
+
+def use_clock(clock: Optional[Clock]):
+    """Set the process-wide clock, None restores the wall clock."""
+    global _clock
+    _clock = clock if clock is not None else Clock()
+    logger.info(f"[CLOCK] Using {'virtual' if _clock.virtual else 'real'} clock")
+
+
+def get_clock() -> Clock:
+    return _clock
+
+
+def create_clock(mode: str = "real", start=None) -> Clock:
+    assert mode in MODES, f"mode must be one of {MODES}, got {mode}"
+    return VirtualClock(start) if mode == "virtual" else Clock()
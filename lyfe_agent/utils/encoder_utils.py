@@ -1,14 +1,16 @@
 from abc import ABC, abstractmethod
-from typing import Dict, Union, List, Tuple, Any
+from typing import Dict, Iterable, Union, List, Tuple, Any
 import time
 import logging
+from concurrent.futures import Future
 from queue import Queue
 from threading import Lock, Event
 
 
 import numpy as np
 import openai
-from openai import OpenAI
+
+from lyfe_agent.utils.llm_clients import get_openai_client
 
 logger = logging.getLogger(__name__)
 
@@ -45,9 +47,17 @@ class BaseEmbeddingMemory:
     def add(self, memory: str) -> None:
         raise NotImplementedError
 
+    def add_many(self, memories: List[str]) -> None:
+        raise NotImplementedError
+
     def fill_encoder_memories(self, embedding, memory_content):
         raise NotImplementedError
 
+    def fill_encoder_memories_many(self, embeddings, memory_contents):
+        """Add memories that come from one bulk encoding, see `EncoderManager.queue_mems`."""
+        for embedding, memory_content in zip(embeddings, memory_contents):
+            self.fill_encoder_memories(embedding, memory_content)
+
     def query(self, text: str, num_memories_retrieved: int = 1, timeout=5.0) -> List[str]:
         raise NotImplementedError
 
@@ -88,6 +98,7 @@ class EncoderManager:
         self.queue = Queue()  # main queue for incoming documents
         self.query_queue = Queue()  # Additional queue for queries
         self.batch_size = batch_size  # maximum batch size for processing documents
+        self.max_request_size = 2048  # maximum number of documents per encoder call
         self.max_wait_time = max_wait_time  # maximum waiting time to form a batch
         self.encoder_func = encoder_func  # custom encoder function
         logger.info(f"Initializing EncoderManager with executor {executor}")
@@ -108,20 +119,51 @@ class EncoderManager:
         self.monitor_interval = 2.0
 
     def queue_mem(self, module: BaseEmbeddingMemory, 
-                  key: str, value: Any = None):
+                  key: str, value: Any = None) -> Future:
         """Queue a document to be encoded.
         
         Args:
             module: the class that will hold the encoded embedding
             key: the memory key to be encoded
             value: the memory value to be stored
+
+        Returns:
+            a future that completes once the memory is stored in `module`
         """
-        # The queue holds tuples of (type, module, data)
-        self.queue.put(("doc", module, key, value))
+        # The queue holds tuples of (type, module, key, value, future)
+        future = Future()
+        self.queue.put(("doc", module, key, value, future))
         self.queue_counter += 1
+        return future
+
+    def queue_mems(self, module: BaseEmbeddingMemory,
+                   keys: List[str], values: List[Any] = None) -> Future:
+        """Queue documents to be encoded and stored together.
+
+        The documents are encoded in as few requests as possible, and stored with a
+        single `module.fill_encoder_memories_many` call.
+
+        Args:
+            module: the class that will hold the encoded embeddings
+            keys: the memory keys to be encoded
+            values: the memory values to be stored, defaults to the keys
+
+        Returns:
+            a future that completes once all memories are stored in `module`
+        """
+        keys = list(keys)
+        values = list(values) if values is not None else keys
+        assert len(keys) == len(values), "keys and values must have the same length"
+        future = Future()
+        if not keys:
+            future.set_result(None)
+            return future
+        self.queue.put(("docs", module, keys, values, future))
+        self.queue_counter += len(keys)
+        return future
 
     def queue_query(self, module: BaseEmbeddingMemory, query: Any):
-        self.query_queue.put(("query", module, query, None))
+        self.query_queue.put(("query", module, query, None, None))
         self.query_queue_counter += 1
 
     def monitor_queues(self):
@@ -178,21 +220,44 @@ class EncoderManager:
 
     def process_batch(
             self, 
-            batch: List[Tuple[str, BaseEmbeddingMemory, str, Any]]
+            batch: List[Tuple[str, BaseEmbeddingMemory, str, Any, Future]]
         ):
         """Encode a batch and send embeddings to the MemoryModules.
         
         Args:
-            batch: a list of tuples of (type, module, key, value)
+            batch: a list of tuples of (type, module, key, value, future), where
+                key and value are lists for the "docs" type
         """
         logger.debug(f"Processing batch to be encoded. Batch size {len(batch)}...")
-        embeddings = self.encoder_func([key for _type, module, key, val in batch])
-
-        for (_type, module, key, val), embedding in zip(batch, embeddings):
+        # bulk items ("docs") carry lists of keys
+        texts = []
+        for _type, module, key, val, future in batch:
+            texts.extend(key if _type == "docs" else [key])
+        try:
+            embeddings = []
+            for start in range(0, len(texts), self.max_request_size):
+                embeddings.extend(self.encoder_func(texts[start : start + self.max_request_size]))
+        except Exception as e:
+            # fail the waiting futures instead of the encoding thread
+            logger.error(f"[ENCODER] Failed to encode a batch of {len(texts)} documents: {e}")
+            for _type, module, key, val, future in batch:
+                if future is not None:
+                    future.set_exception(e)
+            batch.clear()
+            return
+
+        offset = 0
+        for _type, module, key, val, future in batch:
+            count = len(key) if _type == "docs" else 1
+            item_embeddings = embeddings[offset : offset + count]
+            offset += count
             with module.lock:
                 if _type == "doc":
-                    module.fill_encoder_memories(embedding, val)
+                    module.fill_encoder_memories(item_embeddings[0], val)
+                elif _type == "docs":
+                    module.fill_encoder_memories_many(item_embeddings, val)
                 elif _type == "query":
+                    embedding = item_embeddings[0]
                     name = "" if not hasattr(module, "name") else module.name
                     # assuming 'retrieved' is a queue in MemoryModule
                     if type(embedding) == list:
@@ -200,6 +265,8 @@ class EncoderManager:
                     else:
                         module.query_embeddings.append(embedding.tolist())
                     module.query_event.set()
+            if future is not None:
+                future.set_result(None)
 
         batch.clear()
 
@@ -227,6 +294,33 @@ class EncoderManager:
         self._stop_event.set()
 
 
+def gather(futures: Iterable[Future]) -> Future:
+    """A future that completes when all `futures` are done.
+
+    It fails with the first exception among them, like `asyncio.gather`.
+    """
+    futures = list(futures)
+    combined = Future()
+    remaining = [len(futures)]
+    lock = Lock()
+
+    def _on_done(future: Future):
+        with lock:
+            remaining[0] -= 1
+            if combined.done():
+                return
+            if future.exception() is not None:
+                combined.set_exception(future.exception())
+            elif remaining[0] == 0:
+                combined.set_result(None)
+
+    if not futures:
+        combined.set_result(None)
+    for future in futures:
+        future.add_done_callback(_on_done)
+    return combined
+
+
 class EncoderCollection:
     """
     A collection of different encoders used in one simulation.
@@ -313,26 +407,34 @@ class SentenceTransformerEncoder(EmbeddingEncoder):
 
 def get_embeddings(
     texts: Union[str, List[str]],
-    model_name: str = "text-embedding-3-small"
+    model_name: str = "text-embedding-3-small",
+    base_url: str = None,
 ):
     if isinstance(texts, str):
         texts = [texts]
-    embeddings_data = OpenAI().embeddings.create(
+    embeddings_data = get_openai_client(base_url).embeddings.create(
         input = texts,
         model = model_name,
     ).data
     return [item.embedding for item in embeddings_data] 
 class OpenAIEncoder(EmbeddingEncoder):
-    def __init__(self, model_name):
+    def __init__(self, model_name, base_url=None):
+        """
+        base_url: optional OpenAI-compatible endpoint (e.g. a local mock server),
+            defaults to the OPENAI_BASE_URL environment variable / api.openai.com
+        """
         logger.info(f"Initializing OpenAI encoder with model {model_name}")
         self.model = model_name
+        self.base_url = base_url
         self.encoder = get_embeddings
 
     def __call__(self, text: Union[str, List[str]]):
         # TODO: There seems to be a bug here
         start_time = time.time()
         logger.debug(f"Calling OpenAI encoder with model {self.model}")
-        results = np.array(self.encoder(text, model_name=self.model))
+        results = np.array(
+            self.encoder(text, model_name=self.model, base_url=self.base_url)
+        )
         logger.debug(
             "OpenAI encoder finished in %.2f seconds" % (time.time() - start_time)
         )
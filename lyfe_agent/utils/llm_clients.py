@@ -0,0 +1,141 @@
+"""Process-wide registry of LLM and embedding clients.
+
+Every agent used to instantiate its own chat model, and the encoder created a new
+OpenAI client for every batch, each with its own HTTP connection pool. Clients are
+now shared: one chat model per distinct langmodel config, one OpenAI client per
+endpoint, all on a single keep-alive HTTP pool (HTTP/2 if the `h2` package is
+installed). Chat models are stateless between calls, so sharing them across agents
+and threads is safe.
+
+Usage:
+    configure_http_pool(max_connections=200)  # optional, before clients are created
+    llm = get_chat_model(brain_cfg.langmodel)  # done in Agent.setup_brain
+    client = get_openai_client(base_url)        # done in get_embeddings
+"""
+import importlib.util
+import json
+import logging
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+import httpx
+from hydra.utils import instantiate
+from omegaconf import DictConfig, OmegaConf
+from openai import OpenAI
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_pool_config = {
+    "max_connections": 100,
+    "max_keepalive_connections": 50,
+    "keepalive_expiry": 60.0,  # in seconds
+    "timeout": 60.0,  # in seconds, per request
+    "http2": None,  # None: use HTTP/2 if h2 is installed
+}
+_http_client: Optional[httpx.Client] = None
+_async_http_client: Optional[httpx.AsyncClient] = None
+_openai_clients: Dict[Tuple, OpenAI] = {}
+_chat_models: Dict[str, Any] = {}
+
+# chat model classes that accept shared httpx clients
+_HTTPX_TARGETS = ("langchain_openai.",)
+
+
+def configure_http_pool(**kwargs):
+    """Set options of the shared HTTP pool. Must be called before any client is created."""
+    unknown = set(kwargs) - set(_pool_config)
+    assert not unknown, f"Unknown HTTP pool options {unknown}"
+    with _lock:
+        if _http_client is not None or _async_http_client is not None:
+            logger.warning("[CLIENTS] HTTP pool already created, new options are ignored")
+            return
+        _pool_config.update({k: v for k, v in kwargs.items() if v is not None})
+
+
+def _client_kwargs() -> Dict[str, Any]:
+    http2 = _pool_config["http2"]
+    if http2 is None:
+        http2 = importlib.util.find_spec("h2") is not None
+    return {
+        "limits": httpx.Limits(
+            max_connections=_pool_config["max_connections"],
+            max_keepalive_connections=_pool_config["max_keepalive_connections"],
+            keepalive_expiry=_pool_config["keepalive_expiry"],
+        ),
+        "timeout": _pool_config["timeout"],
+        "http2": http2,
+    }
+
+
+def get_http_client() -> httpx.Client:
+    """The shared keep-alive HTTP pool."""
+    global _http_client
+    with _lock:
+        if _http_client is None:
+            kwargs = _client_kwargs()
+            _http_client = httpx.Client(**kwargs)
+            logger.info(
+                f"[CLIENTS] Created shared HTTP pool (http2={kwargs['http2']}, "
+                f"max_connections={_pool_config['max_connections']})"
+            )
+        return _http_client
+
+
+def get_async_http_client() -> httpx.AsyncClient:
+    """The shared keep-alive HTTP pool for async calls."""
+    global _async_http_client
+    with _lock:
+        if _async_http_client is None:
+            _async_http_client = httpx.AsyncClient(**_client_kwargs())
+        return _async_http_client
+
+
+def get_openai_client(base_url: Optional[str] = None, api_key: Optional[str] = None) -> OpenAI:
+    """Shared OpenAI client for an endpoint."""
+    key = (base_url, api_key)
+    client = _openai_clients.get(key)
+    if client is None:
+        http_client = get_http_client()
+        with _lock:
+            client = _openai_clients.get(key)
+            if client is None:
+                client = OpenAI(base_url=base_url, api_key=api_key, http_client=http_client)
+                _openai_clients[key] = client
+    return client
+
+
+def get_chat_model(langmodel_cfg: DictConfig):
+    """Shared chat model for a langmodel config (a partial `_target_` config)."""
+    container = OmegaConf.to_container(langmodel_cfg, resolve=True)
+    key = json.dumps(container, sort_keys=True, default=str)
+    llm = _chat_models.get(key)
+    if llm is not None:
+        return llm
+
+    kwargs = {}
+    if container["_target_"].startswith(_HTTPX_TARGETS):
+        kwargs = {
+            "http_client": get_http_client(),
+            "http_async_client": get_async_http_client(),
+        }
+    with _lock:
+        llm = _chat_models.get(key)
+        if llm is None:
+            llm = instantiate(langmodel_cfg)(**kwargs)
+            _chat_models[key] = llm
+            logger.info(f"[CLIENTS] Created chat model {container['_target_']} ({len(_chat_models)} in total)")
+    return llm
+
+
+def close_clients():
+    """Close the shared HTTP pool and forget all clients."""
+    global _http_client, _async_http_client
+    with _lock:
+        _chat_models.clear()
+        _openai_clients.clear()
+        if _http_client is not None:
+            _http_client.close()
+            _http_client = None
+        # the async pool is closed with its event loop
+        _async_http_client = None
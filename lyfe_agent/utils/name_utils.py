@@ -1,5 +1,6 @@
 """Helper function to converting name formats."""
 
+import functools
 from difflib import SequenceMatcher
 from typing import List, Tuple
 
@@ -61,10 +62,12 @@ def name_include(target: str, keywords_list: List[str]) -> Tuple[bool, str]:
     return False, target
 
 
+@functools.lru_cache(maxsize=4096)
 def name_lower2higher(name: str) -> str:
     """Convert name from lower to title case.
 
     Will convert a name of form john_smith to John Smith
+    Memoized, since it runs on every nearby creature of every proximity update.
     """
     return " ".join(name.split("_")).title() if name != "[NONE]" else None
 
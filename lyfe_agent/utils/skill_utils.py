@@ -1,6 +1,13 @@
 from pathlib import Path
+from types import MappingProxyType
+from typing import Callable, Dict, List, Optional
+import hashlib
+import json
 import re
 import logging
+import threading
+
+import numpy as np
 
 logger = logging.getLogger(__name__)
 
@@ -68,6 +75,93 @@ def load_js_files(folder_path):
 
     return js_files_data
 
+class SkillIndex:
+    """Immutable index of a skill library, shared read-only by all agents.
+
+    Args:
+        skills: skills as returned by `load_js_files`
+        embeddings: one embedding per skill, of its key
+    """
+
+    def __init__(self, skills: List[Dict], embeddings):
+        self.skills = tuple(skills)
+        self.skill_dict = MappingProxyType({skill["key"]: skill for skill in self.skills})
+        if self.skills:
+            embeddings = np.asarray(embeddings, dtype=float)
+        else:
+            embeddings = np.empty((0, 0))
+        embeddings.setflags(write=False)
+        self.embeddings = embeddings
+
+    def __len__(self) -> int:
+        return len(self.skills)
+
+
+_indexes: Dict[str, SkillIndex] = {}
+_lock = threading.Lock()
+
+
+def _digest(skills: List[Dict], model: Optional[str]) -> str:
+    content = json.dumps([model, [skill["key"] for skill in skills]])
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def _load_cached_embeddings(cache_path: Path, digest: str):
+    try:
+        with open(cache_path, "r", encoding="utf-8") as file:
+            cache = json.load(file)
+    except (OSError, ValueError):
+        return None
+    return cache["embeddings"] if cache.get("digest") == digest else None
+
+
+def _save_cached_embeddings(cache_path: Path, digest: str, embeddings) -> None:
+    try:
+        with open(cache_path, "w", encoding="utf-8") as file:
+            json.dump({"digest": digest, "embeddings": np.asarray(embeddings).tolist()}, file)
+    except OSError as e:
+        logger.warning(f"[SKILLS] Could not write skill embedding cache {cache_path}: {e}")
+
+
+def get_skill_index(
+    encoder_func: Callable,
+    folder_path,
+    cache_path: Optional[str] = None,
+) -> SkillIndex:
+    """Process-wide skill index of a folder of JS files.
+
+    The skills are parsed and embedded once, by the first agent that asks for
+    them; the others wait and share the result.
+
+    Args:
+        encoder_func: function that takes a list of documents and returns embeddings
+        folder_path: Path to the folder containing the JS files.
+        cache_path: optional JSON file to load the embeddings from, or to save them to
+    """
+    key = str(Path(folder_path).resolve())
+    with _lock:
+        index = _indexes.get(key)
+        if index is not None:
+            return index
+
+        skills = load_js_files(folder_path)
+        digest = _digest(skills, getattr(encoder_func, "model", None))
+        embeddings = None
+        if cache_path is not None and skills:
+            embeddings = _load_cached_embeddings(Path(cache_path), digest)
+            if embeddings is not None:
+                logger.info(f"[SKILLS] Loaded skill embeddings from {cache_path}")
+        if embeddings is None and skills:
+            embeddings = encoder_func([skill["key"] for skill in skills])
+            if cache_path is not None:
+                _save_cached_embeddings(Path(cache_path), digest, embeddings)
+
+        index = SkillIndex(skills, embeddings)
+        _indexes[key] = index
+        logger.info(f"[SKILLS] Indexed {len(index)} skills from {folder_path}")
+        return index
+
+
 if __name__ == "__main__":
     # Usage example
     from pprint import pprint
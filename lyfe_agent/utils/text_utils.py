@@ -0,0 +1,49 @@
+"""Offline text utilities.
+
+`sent_tokenize` replaces nltk's punkt tokenizer, which had to be downloaded at
+import time. Summaries are short, plain English paragraphs, for which splitting
+on sentence-final punctuation, with a list of common abbreviations, is enough.
+"""
+import re
+from typing import List
+
+_ABBREVIATIONS = frozenset(
+    {
+        "mr", "mrs", "ms", "dr", "prof", "sr", "jr", "st", "mt", "vs", "etc",
+        "e.g", "i.e", "a.m", "p.m", "no", "inc", "ltd", "co", "jan", "feb", "mar",
+        "apr", "jun", "jul", "aug", "sep", "sept", "oct", "nov", "dec",
+    }
+)
+# sentence-final punctuation, optionally followed by closing quotes or brackets
+_SENTENCE_END = re.compile(r"[.!?]+[\"'”’)\]]*(?=\s)")
+
+
+def _is_abbreviation(text: str) -> bool:
+    """Whether `text`, which ends with a period, ends with an abbreviation or an initial."""
+    words = text[:-1].split()
+    if not words:
+        return False
+    word = words[-1].lstrip("\"'“‘([")
+    # single capital letters are initials, as in "J. R. R. Tolkien"
+    return word.lower() in _ABBREVIATIONS or (len(word) == 1 and word.isupper())
+
+
+def sent_tokenize(text: str) -> List[str]:
+    """Split text into sentences."""
+    sentences = []
+    start = 0
+    for match in _SENTENCE_END.finditer(text):
+        end = match.end()
+        candidate = text[start:end]
+        if match.group() == "." and _is_abbreviation(candidate):
+            continue
+        # a lowercase continuation means the period did not end the sentence
+        following = text[end:].lstrip()
+        if following and following[0].islower():
+            continue
+        sentences.append(candidate.strip())
+        start = end
+    tail = text[start:].strip()
+    if tail:
+        sentences.append(tail)
+    return [sentence for sentence in sentences if sentence]
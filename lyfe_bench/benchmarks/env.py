@@ -1,6 +1,5 @@
 import logging
 import json
-import time
 import os
 from pathlib import Path
 from omegaconf import OmegaConf
@@ -51,16 +50,16 @@ class BenchmarkEnv(GraphEnv):
         self.evaluators_dict = evaluators_dict
 
         # Time tracking
-        self.sim_start = time.perf_counter()
         self.total_time = self.env_specs["total_time"]
         del self.env_specs["total_time"]
 
         super().__init__(agents, **self.env_specs)
+        self.sim_start = self.clock.time()
 
 
     def time_update(self):
         super().time_update()
-        self.sim_time = time.perf_counter() - self.sim_start
+        self.sim_time = self.clock.time() - self.sim_start
         if self.sim_time > self.total_time:
             return True
         return False
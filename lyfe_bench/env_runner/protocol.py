@@ -0,0 +1,246 @@
+"""Observation messages between the env runner and the agent server.
+
+Observations of a frame can be sent in three layouts (`batching`):
+
+- "key": one message per observation key per agent,
+  {"message_type": <key>, "agent_id": ..., "data": <value>}, the original protocol
+- "agent": one message per agent per frame,
+  {"message_type": "observation", "agent_id": ..., "frame": ..., "data": {<key>: <value>}}
+- "frame": one message per frame,
+  {"message_type": "frame", "frame": ..., "data": {<agent_id>: {<key>: <value>}}}
+
+With `delta`, keys whose value did not change since the last message to the agent,
+such as `locations`, are omitted, and keys that disappeared are listed under
+"removed" (per agent in "frame" messages, not sent in the "key" layout). Messages
+that contain all keys have "keyframe": true, which is the first message to each
+agent and then every `keyframe_interval` frames if set. Frames without changes are
+not sent.
+
+Messages are JSON text, or MessagePack bytes with the "msgpack" encoding.
+`ObservationDecoder` rebuilds the full observations on the agent side.
+"""
+import json
+import logging
+from collections import defaultdict
+from typing import Any, Dict, List, Tuple, Union
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+logger = logging.getLogger(__name__)
+
+MESSAGE_TYPE_KEY = "message_type"
+AGENT_ID_KEY = "agent_id"
+DATA_KEY = "data"
+FRAME_KEY = "frame"
+KEYFRAME_KEY = "keyframe"
+REMOVED_KEY = "removed"
+PROTOCOL_KEY = "protocol"
+
+OBSERVATION_MESSAGE_TYPE = "observation"
+FRAME_MESSAGE_TYPE = "frame"
+
+BATCHING_KEY = "key"
+BATCHING_AGENT = "agent"
+BATCHING_FRAME = "frame"
+BATCHINGS = (BATCHING_KEY, BATCHING_AGENT, BATCHING_FRAME)
+
+JSON = "json"
+MSGPACK = "msgpack"
+ENCODINGS = (JSON, MSGPACK)
+
+
+def loads(message: Union[str, bytes]) -> Any:
+    """Decode a message, binary messages are MessagePack."""
+    if isinstance(message, (bytes, bytearray)):
+        if msgpack is None:
+            raise ValueError("Received a binary message, but msgpack is not installed")
+        return msgpack.unpackb(message, raw=False)
+    return json.loads(message)
+
+
+def dumps(message: Any, encoding: str = JSON) -> Union[str, bytes]:
+    if encoding == MSGPACK:
+        return msgpack.packb(message)
+    return json.dumps(message)
+
+
+def _json_object(items: List[Tuple[str, str]]) -> str:
+    """JSON object text from keys and already encoded values."""
+    return "{" + ", ".join(f"{json.dumps(key)}: {value}" for key, value in items) + "}"
+
+
+class ObservationEncoder:
+    """Turns the observations of a frame into messages, see the module docstring.
+
+    Args:
+        batching: one of BATCHINGS
+        delta: omit keys that did not change since the last message to the agent
+        encoding: one of ENCODINGS
+        keyframe_interval: with delta, send all keys every this many frames, 0 for never
+    """
+
+    def __init__(
+        self,
+        batching: str = BATCHING_FRAME,
+        delta: bool = True,
+        encoding: str = JSON,
+        keyframe_interval: int = 0,
+    ):
+        assert batching in BATCHINGS, f"batching must be one of {BATCHINGS}"
+        assert encoding in ENCODINGS, f"encoding must be one of {ENCODINGS}"
+        if encoding == MSGPACK and msgpack is None:
+            logger.warning("msgpack is not installed, encoding observations as JSON")
+            encoding = JSON
+        self.batching = batching
+        self.delta = delta
+        self.encoding = encoding
+        self.keyframe_interval = keyframe_interval
+        # agent id -> key -> encoded value last sent, to detect changes
+        self._last: Dict[str, Dict[str, Union[str, bytes]]] = {}
+
+    @property
+    def settings(self) -> dict:
+        return {
+            "batching": self.batching,
+            "delta": self.delta,
+            "encoding": self.encoding,
+            "keyframe_interval": self.keyframe_interval,
+        }
+
+    def _encode_value(self, value: Any) -> Union[str, bytes]:
+        if self.encoding == MSGPACK:
+            return msgpack.packb(value)
+        return json.dumps(value)
+
+    def _changes(self, agent_id: str, observation: Dict[str, Any], keyframe: bool):
+        """Encoded values of the changed keys, the removed keys, and whether all keys are sent."""
+        encoded = {key: self._encode_value(value) for key, value in observation.items()}
+        last = self._last.get(agent_id)
+        self._last[agent_id] = encoded
+        if not self.delta or keyframe or last is None:
+            return encoded, [], True
+        changed = {key: value for key, value in encoded.items() if last.get(key) != value}
+        removed = [key for key in last if key not in encoded]
+        return changed, removed, False
+
+    def encode_frame(
+        self, frame: int, observations: Dict[str, Dict[str, Any]]
+    ) -> List[Union[str, bytes]]:
+        """Messages to send for the observations of all agents in a frame."""
+        keyframe = bool(self.keyframe_interval) and frame % self.keyframe_interval == 0
+        changes = {
+            agent_id: self._changes(agent_id, observation, keyframe)
+            for agent_id, observation in observations.items()
+        }
+
+        if self.batching == BATCHING_KEY:
+            return [
+                self._message(
+                    {MESSAGE_TYPE_KEY: key, AGENT_ID_KEY: agent_id},
+                    [(DATA_KEY, value)],
+                )
+                for agent_id, (changed, _, _) in changes.items()
+                for key, value in changed.items()
+            ]
+
+        if self.batching == BATCHING_AGENT:
+            messages = []
+            for agent_id, (changed, removed, full) in changes.items():
+                if not (changed or removed or full):
+                    continue
+                header = {
+                    MESSAGE_TYPE_KEY: OBSERVATION_MESSAGE_TYPE,
+                    AGENT_ID_KEY: agent_id,
+                    FRAME_KEY: frame,
+                    KEYFRAME_KEY: full,
+                }
+                if removed:
+                    header[REMOVED_KEY] = removed
+                messages.append(self._message(header, [(DATA_KEY, self._object(changed))]))
+            return messages
+
+        data = [
+            (agent_id, self._object(changed))
+            for agent_id, (changed, removed, full) in changes.items()
+            if changed or full
+        ]
+        removed = {agent_id: keys for agent_id, (_, keys, _) in changes.items() if keys}
+        if not (data or removed):
+            return []
+        header = {
+            MESSAGE_TYPE_KEY: FRAME_MESSAGE_TYPE,
+            FRAME_KEY: frame,
+            KEYFRAME_KEY: all(full for _, _, full in changes.values()),
+        }
+        if removed:
+            header[REMOVED_KEY] = removed
+        return [self._message(header, [(DATA_KEY, self._object(dict(data)))])]
+
+    def _object(self, items: Dict[str, Union[str, bytes]]) -> Union[str, bytes]:
+        """Encoded object from keys and encoded values, without encoding them again."""
+        if self.encoding == MSGPACK:
+            # MessagePack maps are a header followed by the keys and values
+            packer = msgpack.Packer()
+            chunks = [packer.pack_map_header(len(items))]
+            for key, value in items.items():
+                chunks.append(packer.pack(key))
+                chunks.append(value)
+            return b"".join(chunks)
+        return _json_object(list(items.items()))
+
+    def _message(self, header: dict, encoded_items: List[Tuple[str, Union[str, bytes]]]):
+        """Message from a header of plain values and already encoded items."""
+        items = {key: self._encode_value(value) for key, value in header.items()}
+        items.update(encoded_items)
+        return self._object(items)
+
+    def reset(self):
+        """Forget what was sent, so that the next messages are keyframes."""
+        self._last.clear()
+
+
+class ObservationDecoder:
+    """Rebuilds the full observation of each agent from the messages, for the agent side."""
+
+    def __init__(self):
+        self.observations: Dict[str, Dict[str, Any]] = defaultdict(dict)
+
+    def _apply(self, agent_id: str, data: dict, removed=(), keyframe: bool = False):
+        observation = self.observations[agent_id]
+        if keyframe:
+            observation.clear()
+        observation.update(data)
+        for key in removed:
+            observation.pop(key, None)
+
+    def decode(self, message: Union[str, bytes, dict]) -> Dict[str, Dict[str, Any]]:
+        """Apply a message, returns the full observations of the agents it updated."""
+        if not isinstance(message, dict):
+            message = loads(message)
+        message_type = message.get(MESSAGE_TYPE_KEY)
+        if message_type == FRAME_MESSAGE_TYPE:
+            removed = message.get(REMOVED_KEY, {})
+            agent_ids = set(message[DATA_KEY]) | set(removed)
+            for agent_id in agent_ids:
+                self._apply(
+                    agent_id,
+                    message[DATA_KEY].get(agent_id, {}),
+                    removed.get(agent_id, ()),
+                    message.get(KEYFRAME_KEY, False),
+                )
+        elif message_type == OBSERVATION_MESSAGE_TYPE:
+            agent_ids = [message[AGENT_ID_KEY]]
+            self._apply(
+                message[AGENT_ID_KEY],
+                message[DATA_KEY],
+                message.get(REMOVED_KEY, ()),
+                message.get(KEYFRAME_KEY, False),
+            )
+        else:
+            # one key of one agent
+            agent_ids = [message[AGENT_ID_KEY]]
+            self._apply(message[AGENT_ID_KEY], {message_type: message[DATA_KEY]})
+        return {agent_id: self.observations[agent_id] for agent_id in agent_ids}
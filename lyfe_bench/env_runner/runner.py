@@ -2,12 +2,21 @@
 
 import asyncio
 import websockets
-import json
 import time
 from typing import Any, Dict, List, Callable
 from collections import defaultdict
 from asyncio import Queue
 import logging
+from lyfe_bench.env_runner.protocol import (
+    AGENT_ID_KEY,
+    BATCHING_KEY,
+    JSON,
+    MESSAGE_TYPE_KEY,
+    PROTOCOL_KEY,
+    ObservationEncoder,
+    dumps,
+    loads,
+)
 from lyfe_bench.environments.base import BaseMultiAgentEnv
 
 
@@ -15,10 +24,6 @@ logger = logging.getLogger(__name__)
 
 # TODO: Move this beautiful code somewhere more permanent, agent-api?
 
-MESSAGE_TYPE_KEY = "message_type"
-AGENT_ID_KEY = "agent_id"
-DATA_KEY = "data"
-
 
 class EnvRunner:
     """
@@ -37,6 +42,7 @@ class EnvRunner:
         websocket_url: str,
         overflow: str = "drop",
         frame_rate=60,
+        protocol: dict = None,
     ) -> None:
         """
         Initialize the environment runner.
@@ -46,12 +52,19 @@ class EnvRunner:
             websocket_url: URL of the websocket server to connect to agents.
             overflow: Strategy for handling when more actions are received than the environment can process.
             frame_rate: The frame rate at which the environment should run.
+            protocol: Default options of the observation messages (batching, delta, encoding,
+                keyframe_interval), see `protocol.py`. The agent server can override them with
+                a "protocol" entry in its first message, the options in use are sent in the ack.
+                By default, one JSON message is sent per observation key.
         """
         self._make_env = make_env
 
         self.websocket_url = websocket_url
         self.overflow_strategy = overflow
         self._frame_interval = 1.0 / frame_rate
+        self._protocol = {"batching": BATCHING_KEY, "delta": False, "encoding": JSON}
+        self._protocol.update(protocol or {})
+        self._encoder: ObservationEncoder = None
 
         self.websocket: websockets.WebSocketClientProtocol = None
 
@@ -66,25 +79,24 @@ class EnvRunner:
         self.websocket = await websockets.connect(self.websocket_url)
         logger.info("Connected to WebSocket.")
 
-    async def _send_observation(
-        self, agent_id: str, observation: Dict[str, Any]
+    async def _send_observations(
+        self, frame: int, observations: Dict[str, Dict[str, Any]]
     ) -> None:
-        """Send observations to agents through WebSocket."""
-        for key, val in observation.items():
-            # TODO: Validate if key is a valid message type
-
-            # Convert the observation into a JSON string
-            message = json.dumps(
-                {MESSAGE_TYPE_KEY: key, AGENT_ID_KEY: agent_id, DATA_KEY: val}
-            )
+        """Send the observations of all agents in a frame through WebSocket.
+
+        The layout depends on the protocol, e.g. one message per frame with only the
+        keys that changed, instead of one message per key per agent.
+        """
+        # TODO: Validate if keys are valid message types
+        for message in self._encoder.encode_frame(frame, observations):
             await self.websocket.send(message)
 
     async def _receive_actions(self) -> None:
         """Receive actions from agents through WebSocket and add them to the queue."""
         # Get a single message from the WebSocket
-        async for json_message in self.websocket:
-            # Convert the message into a Python dictionary
-            message = json.loads(json_message)
+        async for raw_message in self.websocket:
+            # Convert the message into a Python dictionary, binary messages are MessagePack
+            message = loads(raw_message)
 
             if self._first_message is None:
                 self._first_message = message
@@ -150,11 +162,16 @@ class EnvRunner:
         # Wait until first message is not None, then use first message to initialize environment
         while self._first_message is None:
             await asyncio.sleep(0.1)
-        env_data = self._first_message  # Assuming first message is the environment data
+        env_data = dict(self._first_message)  # Assuming first message is the environment data
+        # the agent server may ask for another message layout
+        self._protocol.update(env_data.pop(PROTOCOL_KEY, None) or {})
+        self._encoder = ObservationEncoder(**self._protocol)
         # TODO: Validate if first message is a valid environment data
         self.env = self._make_env(**env_data)
-        # Send an acknowledgment back to the communicator
-        await self.websocket.send(json.dumps({MESSAGE_TYPE_KEY: "ack"}))
+        # Send an acknowledgment back to the communicator, with the protocol in use
+        await self.websocket.send(
+            dumps({MESSAGE_TYPE_KEY: "ack", PROTOCOL_KEY: self._encoder.settings})
+        )
 
     async def run(self) -> None:
         """Run the environment-agent loop."""
@@ -175,10 +192,12 @@ class EnvRunner:
                 loop_start = time.time()
 
                 # Get observation for each agent
-                for agent_id in self.env.agent_ids:
-                    observation = self.env.observe(agent_id)
-                    # Send the observation to the agent (through communicator)
-                    await self._send_observation(agent_id, observation)
+                observations = {
+                    agent_id: self.env.observe(agent_id)
+                    for agent_id in self.env.agent_ids
+                }
+                # Send the observations to the agents (through communicator)
+                await self._send_observations(i, observations)
 
                 # Get all actions from agents
                 actions = await self._process_actions()
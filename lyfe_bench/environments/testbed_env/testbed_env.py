@@ -6,7 +6,6 @@ Note that ML-agents use an old version of pettingzoo <=1.21 (with major API diff
 """
 
 import logging
-import time
 
 import numpy as np
 
@@ -31,6 +30,7 @@ from lyfe_bench.utils.messaging.location_system import (
 # from lyfe_bench.utils.world_time import world_time_update, world_time_format_str
 from lyfe_bench.utils.world_time import WorldTime
 from lyfe_bench.utils.logging import get_colored_text
+from lyfe_agent.utils.clock import get_clock
 
 logger = logging.getLogger(__name__)
 
@@ -77,6 +77,7 @@ class GraphEnv:
         time_multiplier: int = 20,
         world_time=default_world_time,
         map=None,
+        clock=None,
         **kwargs,
     ):
         self.agents = agents
@@ -89,9 +90,10 @@ class GraphEnv:
         # observation_space = Dict({"message": Text(max_length=1000)})
         # self.render_mode = render_mode
 
-        # To implement fix rate sampling of the env
+        # To implement fix rate sampling of the env, with a virtual clock frames do not wait
+        self.clock = clock if clock is not None else get_clock()
         self.frame_rate = frame_rate
-        self.start_time = time.perf_counter()
+        self.start_time = self.clock.time()
 
         # To implement world time
         self.world_time = WorldTime(world_time)
@@ -131,7 +133,7 @@ class GraphEnv:
         )
 
         # for debugging
-        self._cycle_end_time = time.time()
+        self._cycle_end_time = self.clock.time()
 
     # # this cache ensures that same space object is returned for the same agent
     # # allows action space seeding to work as expected
@@ -216,7 +218,7 @@ class GraphEnv:
         # receiver stores the agent that this agent messages to since last reset
         self.receiver = {agent: [] for agent in self.agents}
 
-        self.start_time = time.perf_counter()
+        self.start_time = self.clock.time()
 
         # Providing detail on environment
         for agent in self.agents.values():
@@ -310,16 +312,16 @@ class GraphEnv:
 
         max_time = 1.0 / self.frame_rate
         # Simulate fixed frame rate
-        elapsed_time = time.perf_counter() - self.start_time
-        time.sleep(max(max_time - elapsed_time, 0))
-        self.start_time = time.perf_counter()
+        elapsed_time = self.clock.time() - self.start_time
+        self.clock.wait(max(max_time - elapsed_time, 0))
+        self.start_time = self.clock.time()
 
         # Logging
-        logger.debug(f"Cycle time: {time.time() - self._cycle_end_time:.3f} s")
+        logger.debug(f"Cycle time: {self.clock.time() - self._cycle_end_time:.3f} s")
         # Update the world time
-        self.world_time += self.time_multiplier * (time.time() - self._cycle_end_time)
+        self.world_time += self.time_multiplier * (self.clock.time() - self._cycle_end_time)
 
-        self._cycle_end_time = time.time()
+        self._cycle_end_time = self.clock.time()
 
     def wait_until_ready(self, timeout):
         pass
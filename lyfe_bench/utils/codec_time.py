@@ -0,0 +1,187 @@
+"""Codec microbenchmark.
+
+Times decoding of each SendIn message type (parse + validation, or trusted
+construction of the flat ones) and encoding of each SendOut message type (model_dump_json, the
+compiled serializer, MessagePack), with the size of the encoded frames, so that
+the gains of lyfe_python_env.codec can be checked for the installed libraries.
+
+Usage:
+    python -m lyfe_bench.utils.codec_time
+    python -m lyfe_bench.utils.codec_time --agents 50 --number 2000
+"""
+import argparse
+import json
+import sys
+import timeit
+from typing import Callable, Dict, List, Tuple
+
+from lyfe_python_env import codec
+from lyfe_python_env.datatype.send_in import (
+    SendInAgentChatMessage,
+    SendInAgentMovementEnded,
+    SendInCharacterProximity,
+    SendInPlayerAdded,
+    SendInPlayerChatMessage,
+)
+from lyfe_python_env.datatype.send_out import (
+    SendOutAgentChatMessage,
+    SendOutAgentDirectMessage,
+    SendOutAgentMoveLocation,
+    SendOutCharacterEmote,
+    SendOutTask,
+)
+
+
+def _transform(i: int) -> dict:
+    return {
+        "position": {"x": 1.5 * i, "y": 0.0, "z": -2.25 * i},
+        "rotation": {"x": 0.0, "y": 90.0, "z": 0.0},
+    }
+
+
+def send_in_samples(num_agents: int) -> Dict[str, Tuple[type, dict]]:
+    """Message type -> (model class, decoded message), as sent by Unity."""
+    agent_ids = [f"agent-{i}" for i in range(num_agents)]
+    return {
+        "CHARACTER_PROXIMITY": (
+            SendInCharacterProximity,
+            {
+                "messageType": "CHARACTER_PROXIMITY",
+                "players": [{"playerId": "player-0", "transform": _transform(0)}],
+                "agents": [
+                    {
+                        "agentId": agent_id,
+                        "transform": _transform(i),
+                        "nearBy": {"players": ["player-0"], "agents": agent_ids[:3], "locations": ["Cafe"]},
+                        "visibility": {"players": ["player-0"], "agents": agent_ids[:3]},
+                    }
+                    for i, agent_id in enumerate(agent_ids)
+                ],
+            },
+        ),
+        "AGENT_CHAT_MESSAGE": (
+            SendInAgentChatMessage,
+            {
+                "messageType": "AGENT_CHAT_MESSAGE",
+                "agentId": agent_ids[0],
+                "message": "Good morning! Are you coming to the festival tonight?",
+                "receiverAgentIds": agent_ids[1:4],
+                "locations": ["Cafe"],
+            },
+        ),
+        "AGENT_MOVE_ENDED": (
+            SendInAgentMovementEnded,
+            {"messageType": "AGENT_MOVE_ENDED", "agentId": agent_ids[0], "arrivalDestination": "Library"},
+        ),
+        "PLAYER_ADDED": (
+            SendInPlayerAdded,
+            {
+                "messageType": "PLAYER_ADDED",
+                "playerId": "player-1",
+                "username": "player",
+                "nameFirst": "Ada",
+                "transform": _transform(1),
+            },
+        ),
+        "PLAYER_CHAT_MESSAGE": (
+            SendInPlayerChatMessage,
+            {
+                "messageType": "PLAYER_CHAT_MESSAGE",
+                "playerId": "player-0",
+                "message": "Hello everyone!",
+                "receiverAgentIds": agent_ids[:3],
+            },
+        ),
+    }
+
+
+def send_out_samples() -> Dict[str, object]:
+    """Message type -> SendOut model, as sent by the agents."""
+    return {
+        "AGENT_CHAT_MESSAGE": SendOutAgentChatMessage(
+            agentId="agent-0", message="I will be there at eight.", streamId="s-0", final=True
+        ),
+        "AGENT_DIRECT_MESSAGE": SendOutAgentDirectMessage(
+            agentId="agent-0", message="See you soon.", receiverId="agent-1"
+        ),
+        "AGENT_MOVE_LOCATION": SendOutAgentMoveLocation(agentId="agent-0", location="Library"),
+        "TASK": SendOutTask(
+            taskId="task-0",
+            waitForResponse=False,
+            commands=[SendOutCharacterEmote(userId="agent-0", emoteId=1, emoteActive=True)],
+        ),
+    }
+
+
+def best(func: Callable, number: int, repeat: int) -> float:
+    """Best time per call, in microseconds."""
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number * 1e6
+
+
+def bench_decode(num_agents: int, number: int, repeat: int) -> List[Dict]:
+    rows = []
+    for name, (cls, data) in send_in_samples(num_agents).items():
+        text = json.dumps(data)
+        row = {
+            "type": name,
+            "validate": best(lambda: cls.model_validate(json.loads(text)), number, repeat),
+            "validate_json": best(lambda: cls.model_validate_json(text), number, repeat),
+            "trusted": best(lambda: codec.construct(cls, codec.loads(text), trusted=True), number, repeat),
+            "json_bytes": len(text.encode("utf-8")),
+        }
+        if codec.msgpack is not None:
+            packed = codec.msgpack.packb(data)
+            row["msgpack"] = best(lambda: codec.construct(cls, codec.loads(packed)), number, repeat)
+            row["msgpack_bytes"] = len(packed)
+        rows.append(row)
+    return rows
+
+
+def bench_encode(number: int, repeat: int) -> List[Dict]:
+    json_codec = codec.Codec(codec.JSON)
+    msgpack_codec = codec.Codec(codec.MSGPACK) if codec.msgpack is not None else None
+    rows = []
+    for name, model in send_out_samples().items():
+        row = {
+            "type": name,
+            "model_dump_json": best(lambda: model.model_dump_json(exclude_none=True), number, repeat),
+            "compiled": best(lambda: json_codec.dumps(model), number, repeat),
+            "json_bytes": len(json_codec.dumps(model).encode("utf-8")),
+        }
+        if msgpack_codec is not None:
+            row["msgpack"] = best(lambda: msgpack_codec.dumps(model), number, repeat)
+            row["msgpack_bytes"] = len(msgpack_codec.dumps(model))
+        rows.append(row)
+    return rows
+
+
+def report(title: str, rows: List[Dict]) -> None:
+    columns = [column for column in rows[0] if column != "type"]
+    print(f"\n{title}")
+    print(f"  {'type':<24}" + "".join(f"{column:>18}" for column in columns))
+    for row in rows:
+        cells = [
+            f"{row[column]:>18d}" if column.endswith("_bytes") else f"{row[column]:>15.2f} us"
+            for column in columns
+        ]
+        print(f"  {row['type']:<24}" + "".join(cells))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--agents", type=int, default=20, help="agents in proximity messages")
+    parser.add_argument("--number", type=int, default=1000, help="calls per timing")
+    parser.add_argument("--repeat", type=int, default=5, help="keep the best of this many timings")
+    args = parser.parse_args(argv)
+
+    print(
+        f"orjson: {'yes' if codec.orjson is not None else 'no'}, "
+        f"msgpack: {'yes' if codec.msgpack is not None else 'no'}"
+    )
+    report("Decoding SendIn (per message)", bench_decode(args.agents, args.number, args.repeat))
+    report("Encoding SendOut (per message)", bench_encode(args.number, args.repeat))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
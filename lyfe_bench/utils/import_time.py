@@ -0,0 +1,83 @@
+"""Import-time benchmark.
+
+Imports each module in a fresh interpreter with `python -X importtime` and reports
+the wall time and the slowest imports, so that regressions in startup time of
+worker and evaluation processes are easy to spot.
+
+Usage:
+    python -m lyfe_bench.utils.import_time lyfe_agent lyfe_agent.agent --top 15
+    python -m lyfe_bench.utils.import_time lyfe_agent --budget 1.0  # exit 1 if slower
+"""
+import argparse
+import re
+import subprocess
+import sys
+import time
+from typing import Dict, List, Tuple
+
+_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s+)(\S+)")
+
+
+def measure(module: str, repeat: int = 3) -> Tuple[float, List[Tuple[str, int, int]]]:
+    """Best wall time (s) of importing `module`, and (name, self us, cumulative us) per import."""
+    best, imports = float("inf"), []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            capture_output=True,
+            text=True,
+        )
+        elapsed = time.perf_counter() - start
+        if result.returncode != 0:
+            raise RuntimeError(f"Importing {module} failed:\n{result.stderr[-2000:]}")
+        if elapsed < best:
+            best = elapsed
+            imports = [
+                (match.group(4), int(match.group(1)), int(match.group(2)))
+                for match in map(_LINE.match, result.stderr.splitlines())
+                if match
+            ]
+    return best, imports
+
+
+def report(module: str, elapsed: float, imports: List[Tuple[str, int, int]], top: int) -> Dict:
+    # top-level packages by cumulative time, e.g. which third-party library is heavy
+    packages: Dict[str, int] = {}
+    for name, self_us, _ in imports:
+        package = name.split(".")[0]
+        packages[package] = packages.get(package, 0) + self_us
+
+    print(f"\n{module}: {elapsed:.3f} s wall time, {len(imports)} modules imported")
+    print(f"  {'package':<40} {'self (ms)':>10}")
+    for package, self_us in sorted(packages.items(), key=lambda x: -x[1])[:top]:
+        print(f"  {package:<40} {self_us / 1000:>10.1f}")
+    print(f"  {'slowest imports':<40} {'cumulative (ms)':>16}")
+    for name, _, cumulative_us in sorted(imports, key=lambda x: -x[2])[:top]:
+        print(f"  {name:<40} {cumulative_us / 1000:>16.1f}")
+    return {"module": module, "wall_time": elapsed, "num_modules": len(imports)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("modules", nargs="*", default=["lyfe_agent"])
+    parser.add_argument("--top", type=int, default=10, help="number of rows to show")
+    parser.add_argument("--repeat", type=int, default=3, help="keep the best of this many runs")
+    parser.add_argument("--budget", type=float, default=None, help="fail if any import is slower (s)")
+    args = parser.parse_args(argv)
+
+    over_budget = []
+    for module in args.modules:
+        elapsed, imports = measure(module, args.repeat)
+        report(module, elapsed, imports, args.top)
+        if args.budget is not None and elapsed > args.budget:
+            over_budget.append(module)
+
+    if over_budget:
+        print(f"\nOver the {args.budget} s budget: {', '.join(over_budget)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,388 @@
+"""Local OpenAI-compatible mock server for load testing.
+
+Serves `/v1/chat/completions` and `/v1/embeddings` with configurable latency,
+error rates and 429 (rate limit) injection, so that the full agent stack can be
+benchmarked without a live service.
+
+Chat completions return schema-valid JSON for `ParserChain` prompts: the reduced
+schema that `CustomOutputParser` appends to every prompt
+("Provide the answers in the following JSON format: {...}") is parsed back out of
+the last message. Fields that ask for a choice offered by the prompt (the action of
+cognitive_controller, the receiver of message, the destination of choose_destination
+and the person of find_person) get one of the offered choices, so that agents act on
+the answers; the other fields get a short placeholder answer.
+Requests with `"stream": true` get the same answer as `chat.completion.chunk`
+server-sent events, a few characters per chunk, ended by `data: [DONE]`.
+Embeddings are deterministic unit vectors seeded by the input text.
+
+Usage:
+    python -m lyfe_bench.utils.mock_openai --port 8000 --latency lognormal:0.8:0.4 --rate-limit 0.02
+
+and point the agents at it with `langmodel: mock_openai` (see
+`lyfe_agent/configs/langmodel/mock_openai.yaml`) and
+`OpenAIEncoder(model_name=..., base_url="http://127.0.0.1:8000/v1")`.
+"""
+import argparse
+import ast
+import hashlib
+import json
+import logging
+import random
+import re
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_PATTERN = re.compile(r"following JSON format:\s*(\{.*\})\s*$", re.DOTALL)
+# placeholder of a schema field -> where the prompt lists the choices, see the default chains
+CHOICE_PATTERNS = {
+    "[YOUR ACTION": re.compile(r"choose from (.+?): \[YOUR ACTION\]"),
+    "[YOUR RECEIVER": re.compile(r"among the following options: (.+?)\.?[ \t]*$", re.MULTILINE),
+    "[LOCATION": re.compile(r"destination in this world are: (.+?)\.?[ \t]*$", re.MULTILINE),
+    "[PERSON": re.compile(r"The available people are: (.+?)\.?[ \t]*$", re.MULTILINE),
+}
+DEFAULT_EMBEDDING_DIM = 1536
+
+
+@dataclass
+class LatencyDistribution:
+    """Latency in seconds, drawn from a named distribution.
+
+    Spec strings: "constant:0.5", "uniform:0.2:1.0", "normal:0.8:0.2",
+    "lognormal:0.8:0.4" (median, sigma of the underlying normal).
+    """
+
+    kind: str = "constant"
+    params: List[float] = field(default_factory=lambda: [0.0])
+
+    @classmethod
+    def from_spec(cls, spec: str) -> "LatencyDistribution":
+        kind, *params = spec.split(":")
+        assert kind in ("constant", "uniform", "normal", "lognormal"), f"Unknown latency {kind}"
+        return cls(kind=kind, params=[float(p) for p in params] or [0.0])
+
+    def sample(self, rng: random.Random) -> float:
+        if self.kind == "constant":
+            value = self.params[0]
+        elif self.kind == "uniform":
+            value = rng.uniform(self.params[0], self.params[1])
+        elif self.kind == "normal":
+            value = rng.gauss(self.params[0], self.params[1])
+        else:
+            value = self.params[0] * rng.lognormvariate(0.0, self.params[1])
+        return max(0.0, value)
+
+
+@dataclass
+class MockConfig:
+    chat_latency: LatencyDistribution = field(default_factory=LatencyDistribution)
+    embedding_latency: LatencyDistribution = field(default_factory=LatencyDistribution)
+    error_rate: float = 0.0  # fraction of requests answered with a 500
+    rate_limit: float = 0.0  # fraction of requests answered with a 429
+    retry_after: float = 1.0  # seconds, sent in the Retry-After header of a 429
+    embedding_dim: int = DEFAULT_EMBEDDING_DIM
+    seed: Optional[int] = None
+
+
+class MockStats:
+    """Thread-safe request counters, served at `/stats`."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counts: Dict[str, int] = {}
+
+    def incr(self, key: str):
+        with self.lock:
+            self.counts[key] = self.counts.get(key, 0) + 1
+
+    def snapshot(self) -> Dict[str, int]:
+        with self.lock:
+            return dict(self.counts)
+
+
+def count_tokens(text: str) -> int:
+    """Rough token estimate (about 4 characters per token)."""
+    return max(1, len(text) // 4)
+
+
+def schema_from_prompt(prompt: str) -> Optional[Dict[str, str]]:
+    """Extract the reduced parser schema appended by `CustomOutputParser`."""
+    match = SCHEMA_PATTERN.search(prompt)
+    if match is None:
+        return None
+    try:
+        schema = json.loads(match.group(1))
+    except json.JSONDecodeError:
+        return None
+    return schema if isinstance(schema, dict) else None
+
+
+def parse_choices(text: str) -> List[str]:
+    """Choices listed in a prompt, as a Python list literal or separated by commas."""
+    text = text.strip()
+    if text.startswith("["):
+        try:
+            choices = ast.literal_eval(text)
+        except (ValueError, SyntaxError):
+            choices = text.strip("[]").split(",")
+    else:
+        choices = text.split(",")
+    choices = [str(choice).strip().strip("'\"") for choice in choices]
+    return [choice for choice in choices if choice and choice != "None"]
+
+
+def prompt_choices(placeholder: str, prompt: str) -> List[str]:
+    """Choices offered by the prompt for a schema field, empty for a free answer."""
+    for prefix, pattern in CHOICE_PATTERNS.items():
+        if str(placeholder).startswith(prefix):
+            match = pattern.search(prompt)
+            return parse_choices(match.group(1)) if match else []
+    return []
+
+
+def fake_answer(schema: Optional[Dict[str, str]], rng: random.Random, prompt: str = "") -> str:
+    if schema is None:
+        return "Okay."
+    words = ["yes", "sure", "let us talk", "I will go now", "sounds good", "maybe later"]
+    answer = {}
+    for key, placeholder in schema.items():
+        choices = prompt_choices(placeholder, prompt)
+        answer[key] = rng.choice(choices or words)
+    return json.dumps(answer)
+
+
+def fake_embedding(text: str, dim: int) -> List[float]:
+    rng = random.Random(hashlib.sha1(text.encode("utf-8")).digest())
+    vector = [rng.gauss(0.0, 1.0) for _ in range(dim)]
+    norm = sum(v * v for v in vector) ** 0.5
+    return [v / norm for v in vector]
+
+
+class MockOpenAIHandler(BaseHTTPRequestHandler):
+    server: "MockOpenAIServer"
+    protocol_version = "HTTP/1.1"  # keep-alive
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+    def _send_json(self, status: int, payload: Dict, headers: Optional[Dict[str, str]] = None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_json(self) -> Dict:
+        length = int(self.headers.get("Content-Length", 0))
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def _inject_failure(self) -> bool:
+        config = self.server.config
+        roll = self.server.random()
+        if roll < config.rate_limit:
+            self.server.stats.incr("429")
+            self._send_json(
+                429,
+                {"error": {"message": "Rate limit reached (mock)", "type": "rate_limit_exceeded"}},
+                headers={"Retry-After": str(config.retry_after)},
+            )
+            return True
+        if roll < config.rate_limit + config.error_rate:
+            self.server.stats.incr("500")
+            self._send_json(500, {"error": {"message": "Internal error (mock)", "type": "server_error"}})
+            return True
+        return False
+
+    def do_GET(self):
+        if self.path.rstrip("/") == "/stats":
+            self._send_json(200, self.server.stats.snapshot())
+        elif self.path.rstrip("/") == "/v1/models":
+            self._send_json(200, {"object": "list", "data": []})
+        else:
+            self._send_json(404, {"error": {"message": f"Unknown path {self.path}"}})
+
+    def do_POST(self):
+        path = self.path.rstrip("/")
+        if path.endswith("/chat/completions"):
+            handler, latency = self._chat_completions, self.server.config.chat_latency
+        elif path.endswith("/embeddings"):
+            handler, latency = self._embeddings, self.server.config.embedding_latency
+        else:
+            self._send_json(404, {"error": {"message": f"Unknown path {self.path}"}})
+            return
+
+        request = self._read_json()
+        time.sleep(self.server.sample_latency(latency))
+        if self._inject_failure():
+            return
+        response = handler(request)
+        if request.get("stream") and handler == self._chat_completions:
+            self._send_stream(response, request)
+        else:
+            self._send_json(200, response)
+
+    def _send_stream(self, completion: Dict, request: Dict, chunk_chars: int = 4):
+        """Send a chat completion as `chat.completion.chunk` server-sent events."""
+        self.server.stats.incr("chat_stream")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        def chunk(delta: Dict, finish_reason: Optional[str] = None, **extra) -> Dict:
+            return {
+                "id": completion["id"],
+                "object": "chat.completion.chunk",
+                "created": completion["created"],
+                "model": completion["model"],
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+                **extra,
+            }
+
+        content = completion["choices"][0]["message"]["content"]
+        events = [chunk({"role": "assistant", "content": ""})]
+        events += [
+            chunk({"content": content[i : i + chunk_chars]})
+            for i in range(0, len(content), chunk_chars)
+        ]
+        events.append(chunk({}, "stop"))
+        if (request.get("stream_options") or {}).get("include_usage"):
+            events.append({**chunk({}), "choices": [], "usage": completion["usage"]})
+
+        for event in events:
+            self._write_chunk(f"data: {json.dumps(event)}\n\n".encode("utf-8"))
+        self._write_chunk(b"data: [DONE]\n\n")
+        self._write_chunk(b"")  # end of the chunked body
+
+    def _write_chunk(self, data: bytes):
+        self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+    def _chat_completions(self, request: Dict) -> Dict:
+        self.server.stats.incr("chat")
+        messages = request.get("messages", [])
+        prompt = "\n".join(str(m.get("content", "")) for m in messages)
+        content = self.server.fake_answer(prompt)
+        prompt_tokens, completion_tokens = count_tokens(prompt), count_tokens(content)
+        return {
+            "id": f"chatcmpl-{uuid.uuid4().hex}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "mock"),
+            "choices": [
+                {
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": "stop",
+                }
+            ],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        }
+
+    def _embeddings(self, request: Dict) -> Dict:
+        self.server.stats.incr("embeddings")
+        texts = request.get("input", [])
+        if isinstance(texts, str):
+            texts = [texts]
+        dim = request.get("dimensions") or self.server.config.embedding_dim
+        data = [
+            {"object": "embedding", "index": i, "embedding": fake_embedding(str(text), dim)}
+            for i, text in enumerate(texts)
+        ]
+        tokens = sum(count_tokens(str(text)) for text in texts)
+        return {
+            "object": "list",
+            "data": data,
+            "model": request.get("model", "mock"),
+            "usage": {"prompt_tokens": tokens, "total_tokens": tokens},
+        }
+
+
+class MockOpenAIServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, config: MockConfig):
+        super().__init__(address, MockOpenAIHandler)
+        self.config = config
+        self.stats = MockStats()
+        self.rng = random.Random(config.seed)
+        self._rng_lock = threading.Lock()
+
+    # the handler threads share the seeded generator
+    def random(self) -> float:
+        with self._rng_lock:
+            return self.rng.random()
+
+    def sample_latency(self, latency: LatencyDistribution) -> float:
+        with self._rng_lock:
+            return latency.sample(self.rng)
+
+    def fake_answer(self, prompt: str) -> str:
+        schema = schema_from_prompt(prompt)
+        with self._rng_lock:
+            return fake_answer(schema, self.rng, prompt)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+
+def start_mock_server(host="127.0.0.1", port=0, config: Optional[MockConfig] = None):
+    """Start the mock server in a daemon thread and return it (port 0 picks a free port)."""
+    server = MockOpenAIServer((host, port), config or MockConfig())
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    logger.info(f"Mock OpenAI server listening on {server.base_url}")
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local OpenAI-compatible mock server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--latency", default="constant:0", help="chat latency, e.g. lognormal:0.8:0.4")
+    parser.add_argument("--embedding-latency", default="constant:0")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="fraction of 429 responses")
+    parser.add_argument("--retry-after", type=float, default=1.0)
+    parser.add_argument("--embedding-dim", type=int, default=DEFAULT_EMBEDDING_DIM)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    config = MockConfig(
+        chat_latency=LatencyDistribution.from_spec(args.latency),
+        embedding_latency=LatencyDistribution.from_spec(args.embedding_latency),
+        error_rate=args.error_rate,
+        rate_limit=args.rate_limit,
+        retry_after=args.retry_after,
+        embedding_dim=args.embedding_dim,
+        seed=args.seed,
+    )
+    server = MockOpenAIServer((args.host, args.port), config)
+    logging.basicConfig(level=logging.INFO)
+    logger.info(f"Mock OpenAI server listening on {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        logger.info(f"Request counts: {server.stats.snapshot()}")
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Check that talk replies stream through the wrapped chat models.
+
+Runs a ParserChain with a `stream_field` against the local mock OpenAI server, with
+the chat model wrapped as in `Agent.setup_brain` (LOD, and optionally a recording
+cassette), and checks that partial replies reach the stream callback and end with
+the final reply.
+
+Usage:
+    python -m lyfe_bench.utils.stream_check
+    python -m lyfe_bench.utils.stream_check --cassette /tmp/stream.cassette.jsonl.gz
+"""
+import argparse
+import json
+import logging
+import sys
+from typing import List, Optional
+
+from langchain_openai import ChatOpenAI
+
+from lyfe_agent.chains.simple_chain import ParserChain
+from lyfe_agent.chains.streaming import FieldStreamCallbackHandler
+from lyfe_agent.lod import LODChatModel
+from lyfe_agent.utils.cassette import Cassette, CassetteChatModel
+from lyfe_bench.utils.mock_openai import start_mock_server
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE = "You are {name}. Reply to the latest message: '{message}'"
+PARSER_CONFIG = {"response": "[YOUR REPLY]"}
+
+
+def check(cassette_path: Optional[str] = None) -> bool:
+    server = start_mock_server()
+    llm = ChatOpenAI(model="gpt-3.5-turbo", base_url=server.base_url, api_key="mock")
+    cassette = None
+    if cassette_path is not None:
+        cassette = Cassette(cassette_path, mode="record")
+        llm = CassetteChatModel(llm=llm, cassette=cassette)
+    llm = LODChatModel(llm=llm)
+    chain = ParserChain(
+        TEMPLATE, PARSER_CONFIG, llm, memory=None, name="stream_check", stream_field="response"
+    )
+
+    partials: List[str] = []
+    handler = FieldStreamCallbackHandler("response", partials.append)
+    try:
+        output = chain.run({"name": "Ada", "message": "Hello!"}, callbacks=[handler])
+    finally:
+        if cassette is not None:
+            cassette.close()
+        server.shutdown()
+
+    response = json.loads(output)["response"]
+    print(f"final reply: {response!r}")
+    print(f"partial replies ({len(partials)}): {partials}")
+    print(f"requests: {server.stats.snapshot()}")
+    if not partials:
+        print("FAIL: no partial reply was produced")
+        return False
+    if partials[-1] != response:
+        print("FAIL: the last partial reply differs from the final reply")
+        return False
+    print("OK")
+    return True
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cassette", default=None, help="also record through a cassette at this path")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.WARNING)
+    return 0 if check(args.cassette) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
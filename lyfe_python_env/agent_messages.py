@@ -0,0 +1,92 @@
+"""Messages from Unity waiting for the next step of each agent."""
+import heapq
+import threading
+from collections import defaultdict
+from operator import itemgetter
+from typing import Any, Dict, Iterable, List, Tuple
+
+from lyfe_python_env.datatype.send_in import SEND_IN_CHARACTER_PROXIMITY
+
+# messages that describe the current state of an agent, so only the latest matters
+STATE_MESSAGE_TYPES = frozenset({SEND_IN_CHARACTER_PROXIMITY})
+
+
+class AgentMessages:
+    """Raw messages per agent, filled by the incoming message pump and taken by the env.
+
+    Direct messages go to a per-agent inbox, which `take` swaps for an empty one.
+    State-like messages (STATE_MESSAGE_TYPES) are coalesced at ingestion: a newer one
+    replaces the unread one of the same agent and type, in its place. Event-like
+    messages such as chat are all kept, in order.
+
+    Broadcasts (e.g. players joining) are appended once to a shared log, and every
+    agent reads the log from its own cursor. Messages carry a sequence number, so
+    `take` returns direct and broadcast messages in arrival order, in time
+    proportional to the number of new messages.
+
+    Args:
+        agent_ids: agents that receive broadcasts from the start; other agents receive
+            the broadcasts that arrive after their first message or read
+    """
+
+    def __init__(self, agent_ids: Iterable[str] = ()):
+        self._lock = threading.Lock()
+        self._seq = 0  # sequence number of the next message
+        self._inboxes: Dict[str, List[Tuple[int, Any]]] = defaultdict(list)
+        # agent id -> message type -> index of the unread state message in the inbox
+        self._state_index: Dict[str, Dict[str, int]] = defaultdict(dict)
+
+        self._log: List[Tuple[int, Any]] = []  # broadcasts not yet read by all agents
+        self._log_offset = 0  # position of self._log[0] since the start
+        self._cursors: Dict[str, int] = {agent_id: 0 for agent_id in agent_ids}
+
+        self.coalesced_count = 0
+
+    def _register(self, agent_id: str) -> None:
+        if agent_id not in self._cursors:
+            self._cursors[agent_id] = self._log_offset + len(self._log)
+
+    def append(self, agent_id: str, message: Any) -> None:
+        message_type = getattr(message, "messageType", None)
+        with self._lock:
+            self._register(agent_id)
+            inbox = self._inboxes[agent_id]
+            if message_type in STATE_MESSAGE_TYPES:
+                index = self._state_index[agent_id].get(message_type)
+                if index is not None:
+                    inbox[index] = (inbox[index][0], message)
+                    self.coalesced_count += 1
+                    return
+                self._state_index[agent_id][message_type] = len(inbox)
+            inbox.append((self._seq, message))
+            self._seq += 1
+
+    def broadcast(self, message: Any) -> None:
+        """Append a message for every agent."""
+        with self._lock:
+            self._log.append((self._seq, message))
+            self._seq += 1
+
+    def take(self, agent_id: str) -> List[Any]:
+        """Remove and return the unread messages of an agent, in arrival order."""
+        with self._lock:
+            self._register(agent_id)
+            inbox = self._inboxes.pop(agent_id, [])
+            self._state_index.pop(agent_id, None)
+            broadcasts = self._log[self._cursors[agent_id] - self._log_offset :]
+            self._cursors[agent_id] = self._log_offset + len(self._log)
+            self._compact()
+
+        if not broadcasts:
+            return [message for _, message in inbox]
+        if not inbox:
+            return [message for _, message in broadcasts]
+        return [message for _, message in heapq.merge(inbox, broadcasts, key=itemgetter(0))]
+
+    def _compact(self) -> None:
+        """Drop broadcasts that every agent has read, the lock is held."""
+        read_by_all = min(self._cursors.values()) - self._log_offset
+        # amortized: only when at least half of the log is read by all
+        if read_by_all > 0 and 2 * read_by_all >= len(self._log):
+            del self._log[:read_by_all]
+            self._log_offset += read_by_all
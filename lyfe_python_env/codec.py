@@ -0,0 +1,113 @@
+"""Encoding and decoding of the messages exchanged with Unity.
+
+Decoding: `loads` parses a frame (orjson if installed), and `construct` builds the
+SendIn model, validated unless the input is trusted. Validation is the default: it
+runs in pydantic-core and is as fast as construction for the nested messages, e.g.
+proximity updates, so only flat models of trusted input skip it.
+
+Encoding: `Codec.dumps` serializes SendOut models with their compiled pydantic-core
+serializer, as JSON text or as MessagePack bytes. With the "auto" encoding, JSON is
+used until the game client sends a binary (MessagePack) frame, after which replies
+are binary as well.
+
+Benchmark: `python -m lyfe_bench.utils.codec_time`
+"""
+import json
+import logging
+import typing
+from enum import Enum
+from typing import Any, Dict, Type, Union
+
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+logger = logging.getLogger(__name__)
+
+JSON = "json"
+MSGPACK = "msgpack"
+AUTO = "auto"
+ENCODINGS = (JSON, MSGPACK, AUTO)
+
+_plain_models: Dict[type, bool] = {}  # model class -> whether it has only plain fields
+
+
+def loads(message: Union[str, bytes]) -> Any:
+    """Parse a frame, binary frames are MessagePack."""
+    if isinstance(message, (bytes, bytearray)):
+        if msgpack is None:
+            raise ValueError("Received a binary frame, but msgpack is not installed")
+        return msgpack.unpackb(message, raw=False)
+    if orjson is not None:
+        return orjson.loads(message)
+    return json.loads(message)
+
+
+def _is_plain(annotation) -> bool:
+    """Whether values of a field are used as decoded, with no model or enum to build."""
+    if isinstance(annotation, type):
+        return not issubclass(annotation, (BaseModel, Enum))
+    return all(_is_plain(arg) for arg in typing.get_args(annotation) if arg is not type(None))
+
+
+def _constructible(cls: Type[BaseModel]) -> bool:
+    """Whether a model can be built from trusted data with `model_construct`."""
+    plain = _plain_models.get(cls)
+    if plain is None:
+        plain = all(_is_plain(field.annotation) for field in cls.model_fields.values())
+        _plain_models[cls] = plain
+    return plain
+
+
+def construct(cls: Type[BaseModel], data: dict, trusted: bool = False) -> BaseModel:
+    """Build a model from decoded data.
+
+    Trusted data of models with only plain fields skips validation. Nested models,
+    such as the agents of a proximity update, are validated: pydantic-core builds them
+    faster than Python code could construct them.
+    """
+    if trusted and _constructible(cls):
+        return cls.model_construct(**data)
+    return cls.model_validate(data)
+
+
+class Codec:
+    """Serializes SendOut models for the connection to one game client.
+
+    Args:
+        encoding: "json", "msgpack", or "auto" to reply in the encoding of the client
+        trusted: whether flat incoming messages are built without validation
+    """
+
+    def __init__(self, encoding: str = JSON, trusted: bool = False):
+        assert encoding in ENCODINGS, f"encoding must be one of {ENCODINGS}"
+        if encoding != JSON and msgpack is None:
+            logger.warning(f"[CODEC] msgpack is not installed, using JSON instead of {encoding}")
+            encoding = JSON
+        self.encoding = encoding
+        self.trusted = trusted
+        self.binary = encoding == MSGPACK
+
+    def loads(self, message: Union[str, bytes]) -> Any:
+        if self.encoding == AUTO and not self.binary and isinstance(message, (bytes, bytearray)):
+            logger.info("[CODEC] Client sent MessagePack, switching to binary frames")
+            self.binary = True
+        return loads(message)
+
+    def construct(self, cls: Type[BaseModel], data: dict) -> BaseModel:
+        return construct(cls, data, trusted=self.trusted)
+
+    def dumps(self, data: BaseModel) -> Union[str, bytes]:
+        # the compiled serializer of the class, without the model_dump wrappers
+        serializer = type(data).__pydantic_serializer__
+        if self.binary:
+            return msgpack.packb(serializer.to_python(data, mode="json", exclude_none=True))
+        return serializer.to_json(data, exclude_none=True).decode("utf-8")
@@ -71,6 +71,9 @@ class SendOutAgent(BaseModel):
 
 class SendOutAgentChatMessage(SendOutAgent):
     message: str
+    # set when the message is streamed: partial messages share the id of the final one
+    streamId: Optional[str] = None
+    final: Optional[bool] = None
     messageType: str = Field(default=SEND_OUT_AGENT_CHAT_MESSAGE)
 
 
@@ -0,0 +1,528 @@
+"""Headless stand-in for the Unity game client.
+
+`HeadlessUnity` connects to the websocket server of `StandaloneWebsocketServerWrapper`
+the way the Unity build does, so that the websocket layer and the agents can be
+load tested on a machine without Unity:
+
+- on GAME_DATA it spawns the agents of the scene (and `num_players` players) on a
+  2D plane, and replies with PLAYER_ADDED and a load_scene TASK_COMPLETED_MESSAGE
+- characters walk to their destination at `speed` units/s, agents send
+  AGENT_MOVE_ENDED on arrival and players wander between locations
+- every `proximity_interval` seconds it sends a CHARACTER_PROXIMITY update with the
+  characters and locations within `nearby_radius` of each character
+- agent chat is delivered to the nearby agents, direct messages to their receiver,
+  and each player chats with nearby agents every `player_chat_interval` seconds
+- all other SendOut commands are consumed and counted
+
+Location names are placed at `locations` if given, otherwise at a position derived
+from the name, so any scene works. The latency of an agent is the time from a
+message delivered to it until its next command, see `get_stats`.
+
+Usage:
+    python -m lyfe_python_env.headless --port 8765 --players 2 --duration 120
+"""
+import argparse
+import asyncio
+import json
+import logging
+import math
+import random
+import time
+import uuid
+import zlib
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import websockets
+
+from lyfe_python_env import codec
+from lyfe_python_env.datatype.send_in import (
+    SEND_IN_AGENT_CHAT_MESSAGE,
+    SEND_IN_AGENT_DIRECT_MESSAGE,
+    SEND_IN_AGENT_MOVE_ENDED,
+    SEND_IN_CHARACTER_PROXIMITY,
+    SEND_IN_PLAYER_ADDED,
+    SEND_IN_PLAYER_CHAT_MESSAGE,
+    SEND_IN_TASK_COMPLETED_MESSAGE,
+    UnityCommandType,
+)
+from lyfe_python_env.datatype.send_out import (
+    SEND_OUT_AGENT_CHAT_MESSAGE,
+    SEND_OUT_AGENT_DIRECT_MESSAGE,
+    SEND_OUT_AGENT_MOVE_DESTINATION_LOCATION,
+    SEND_OUT_AGENT_MOVE_STOP_TASK,
+    SEND_OUT_AGENTS_SPAWN_LOCATION_MESSAGE,
+    SEND_OUT_GAME_DATA,
+    SEND_OUT_TASK,
+)
+
+logger = logging.getLogger(__name__)
+
+PLAYER_LINES = [
+    "Hi there! What are you up to today?",
+    "Has anyone seen the new exhibit at the library?",
+    "I'm heading to the cafe, want to join?",
+    "What do you think about the festival next week?",
+]
+
+
+@dataclass
+class Character:
+    id: str
+    name: str
+    is_agent: bool
+    x: float
+    z: float
+    heading: float = 0.0
+    destination: Optional[str] = None
+    target: Optional[Tuple[float, float]] = None
+
+
+def _transform(character: Character) -> dict:
+    return {
+        "position": {"x": character.x, "y": 0.0, "z": character.z},
+        "rotation": {"x": 0.0, "y": character.heading, "z": 0.0},
+    }
+
+
+class HeadlessUnity:
+    """Simulated game client, see the module docstring.
+
+    Args:
+        url, port: websocket server of the Python side
+        num_players: simulated players that join after the scene is loaded
+        locations: location name -> (x, z)
+        world_size: side of the square plane characters are spawned on
+        speed: walking speed in units per second
+        nearby_radius: distance within which characters and locations are nearby
+        tick_rate: simulation steps per second
+        proximity_interval: seconds between CHARACTER_PROXIMITY updates
+        player_chat_interval: mean seconds between chat messages of a player
+        encoding: "json" or "msgpack", the encoding of the frames sent
+        seed: seed of the simulation
+        connect_retries: connection attempts while the server is not listening yet
+        connect_backoff: seconds before the first retry, doubled after each attempt
+    """
+
+    def __init__(
+        self,
+        url: str = "localhost",
+        port: int = 8765,
+        num_players: int = 1,
+        locations: Optional[Dict[str, Tuple[float, float]]] = None,
+        world_size: float = 100.0,
+        speed: float = 4.0,
+        nearby_radius: float = 15.0,
+        tick_rate: float = 20.0,
+        proximity_interval: float = 0.5,
+        player_chat_interval: float = 30.0,
+        encoding: str = codec.JSON,
+        seed: int = 0,
+        connect_retries: int = 10,
+        connect_backoff: float = 0.25,
+    ):
+        assert encoding in (codec.JSON, codec.MSGPACK), "encoding must be json or msgpack"
+        if encoding == codec.MSGPACK and codec.msgpack is None:
+            raise ImportError("The msgpack encoding needs `pip install msgpack`")
+        self.url = url
+        self.port = port
+        self.num_players = num_players
+        self.locations = dict(locations or {})
+        self.world_size = world_size
+        self.speed = speed
+        self.nearby_radius = nearby_radius
+        self.tick_rate = tick_rate
+        self.proximity_interval = proximity_interval
+        self.player_chat_interval = player_chat_interval
+        self.encoding = encoding
+        self.connect_retries = connect_retries
+        self.connect_backoff = connect_backoff
+        self._random = random.Random(seed)
+
+        self.characters: Dict[str, Character] = {}
+        self.scene_loaded = None  # asyncio.Event, created in the loop of `run`
+        self._websocket = None
+        self._send_lock = None
+
+        # metrics
+        self.start_time = None
+        self.received = Counter()  # message type -> count
+        self.sent = Counter()
+        self.bytes_received = 0
+        self.bytes_sent = 0
+        self._pending_since: Dict[str, float] = {}  # agent id -> first unanswered message
+        self.latencies: List[float] = []
+
+    # --- world ---
+
+    def location_position(self, name: str) -> Tuple[float, float]:
+        if name not in self.locations:
+            # stable position for unknown names, so runs are reproducible
+            rng = random.Random(zlib.crc32(name.encode("utf-8")))
+            self.locations[name] = (
+                rng.uniform(0, self.world_size),
+                rng.uniform(0, self.world_size),
+            )
+        return self.locations[name]
+
+    def _random_position(self) -> Tuple[float, float]:
+        return (
+            self._random.uniform(0, self.world_size),
+            self._random.uniform(0, self.world_size),
+        )
+
+    def _spawn(self, character_id: str, name: str, is_agent: bool, transform: dict = None):
+        if transform and transform.get("position"):
+            x, z = transform["position"]["x"], transform["position"]["z"]
+        else:
+            x, z = self._random_position()
+        self.characters[character_id] = Character(character_id, name, is_agent, x, z)
+
+    def _nearby(self, character: Character) -> Tuple[List[str], List[str], List[str]]:
+        """Ids of the nearby players and agents, and the nearby locations."""
+        radius2 = self.nearby_radius**2
+        players, agents = [], []
+        for other in self.characters.values():
+            if other.id == character.id:
+                continue
+            if (other.x - character.x) ** 2 + (other.z - character.z) ** 2 <= radius2:
+                (agents if other.is_agent else players).append(other.id)
+        locations = [
+            name
+            for name, (x, z) in self.locations.items()
+            if (x - character.x) ** 2 + (z - character.z) ** 2 <= radius2
+        ]
+        return players, agents, locations
+
+    def step(self, dt: float) -> List[dict]:
+        """Move the characters by `dt` seconds, returns the events to send."""
+        events = []
+        for character in self.characters.values():
+            if character.target is None:
+                if not character.is_agent and self.locations:
+                    # players wander between locations
+                    character.destination = self._random.choice(list(self.locations))
+                    character.target = self.location_position(character.destination)
+                continue
+            dx, dz = character.target[0] - character.x, character.target[1] - character.z
+            distance = math.hypot(dx, dz)
+            if distance > self.speed * dt:
+                character.x += dx / distance * self.speed * dt
+                character.z += dz / distance * self.speed * dt
+                character.heading = math.degrees(math.atan2(dx, dz)) % 360
+                continue
+            character.x, character.z = character.target
+            character.target = None
+            if character.is_agent:
+                _, _, locations = self._nearby(character)
+                events.append(
+                    self._for_agent(
+                        character.id,
+                        {
+                            "messageType": SEND_IN_AGENT_MOVE_ENDED,
+                            "agentId": character.id,
+                            "arrivalDestination": character.destination,
+                            "locations": locations,
+                        },
+                    )
+                )
+        return events
+
+    def proximity(self) -> dict:
+        players, agents = [], []
+        for character in self.characters.values():
+            nearby_players, nearby_agents, locations = self._nearby(character)
+            entry = {
+                "transform": _transform(character),
+                "nearBy": {
+                    "players": nearby_players,
+                    "agents": nearby_agents,
+                    "locations": locations,
+                },
+            }
+            if character.is_agent:
+                entry["agentId"] = character.id
+                entry["visibility"] = {"players": nearby_players, "agents": nearby_agents}
+                agents.append(entry)
+            else:
+                entry["playerId"] = character.id
+                players.append(entry)
+        return {
+            "messageType": SEND_IN_CHARACTER_PROXIMITY,
+            "players": players,
+            "agents": agents,
+        }
+
+    def player_chats(self, dt: float) -> List[dict]:
+        events = []
+        for character in list(self.characters.values()):
+            if character.is_agent or self._random.random() >= dt / self.player_chat_interval:
+                continue
+            _, agents, locations = self._nearby(character)
+            if not agents:
+                continue
+            events.append(
+                self._for_agents(
+                    agents,
+                    {
+                        "messageType": SEND_IN_PLAYER_CHAT_MESSAGE,
+                        "playerId": character.id,
+                        "message": self._random.choice(PLAYER_LINES),
+                        "receiverAgentIds": agents,
+                        "locations": locations,
+                    },
+                )
+            )
+        return events
+
+    def _for_agent(self, agent_id: str, message: dict) -> dict:
+        self._pending_since.setdefault(agent_id, time.perf_counter())
+        return message
+
+    def _for_agents(self, agent_ids: List[str], message: dict) -> dict:
+        for agent_id in agent_ids:
+            self._for_agent(agent_id, message)
+        return message
+
+    # --- commands from Python ---
+
+    def handle(self, message: dict) -> List[dict]:
+        """Apply a SendOut command, returns the events to send."""
+        message_type = message.get("messageType")
+        self.received[message_type] += 1
+
+        agent_id = message.get("agentId")
+        if agent_id is not None and agent_id in self._pending_since:
+            self.latencies.append(time.perf_counter() - self._pending_since.pop(agent_id))
+
+        if message_type == SEND_OUT_GAME_DATA:
+            return self._load_scene(message)
+        if message_type == SEND_OUT_AGENTS_SPAWN_LOCATION_MESSAGE:
+            for agent in message.get("agents", []):
+                self._spawn(
+                    agent["user"]["id"], agent["user"]["username"], True, agent.get("transform")
+                )
+            return []
+
+        character = self.characters.get(agent_id)
+        if message_type == SEND_OUT_AGENT_MOVE_DESTINATION_LOCATION and character:
+            character.destination = message["location"]
+            character.target = self.location_position(character.destination)
+        elif message_type == SEND_OUT_AGENT_CHAT_MESSAGE and character:
+            if message.get("final") is False:
+                return []  # partial messages of a stream are only rendered
+            if message.get("streamId") and not message.get("message"):
+                return []  # retraction of a stream, nothing was said
+            _, agents, locations = self._nearby(character)
+            return [
+                self._for_agents(
+                    agents,
+                    {
+                        "messageType": SEND_IN_AGENT_CHAT_MESSAGE,
+                        "agentId": agent_id,
+                        "message": message["message"],
+                        "receiverAgentIds": agents,
+                        "locations": locations,
+                    },
+                )
+            ]
+        elif message_type == SEND_OUT_AGENT_DIRECT_MESSAGE and character:
+            return [
+                self._for_agent(
+                    message["receiverId"],
+                    {
+                        "messageType": SEND_IN_AGENT_DIRECT_MESSAGE,
+                        "agentId": agent_id,
+                        "message": message["message"],
+                        "receiverId": message["receiverId"],
+                    },
+                )
+            ]
+        elif message_type == SEND_OUT_TASK:
+            for command in message.get("commands", []):
+                self.received[command.get("cmdType")] += 1
+                stopped = self.characters.get(command.get("agentId"))
+                if command.get("cmdType") == SEND_OUT_AGENT_MOVE_STOP_TASK and stopped:
+                    stopped.target = None
+        return []
+
+    def _load_scene(self, message: dict) -> List[dict]:
+        scene = message.get("scene", {})
+        for agent in scene.get("agents", []):
+            self._spawn(agent["user"]["id"], agent["user"]["username"], True, agent.get("transform"))
+        if not self.locations:
+            self.location_position("Spawn")
+
+        events = [
+            {
+                "messageType": SEND_IN_TASK_COMPLETED_MESSAGE,
+                "commandId": message.get("commandId"),
+                "cmd_type": UnityCommandType.LOAD_SCENE.value,
+                "metadata": {
+                    "name": scene.get("name", "headless"),
+                    "locations": [
+                        {
+                            "name": name,
+                            "transform": {
+                                "position": {"x": x, "y": 0.0, "z": z},
+                                "rotation": {"x": 0.0, "y": 0.0, "z": 0.0},
+                            },
+                            "shape": {"kind": "circle", "radius": self.nearby_radius},
+                        }
+                        for name, (x, z) in self.locations.items()
+                    ],
+                    "spawns": [],
+                },
+            }
+        ]
+        for i in range(self.num_players):
+            player_id = str(uuid.UUID(int=self._random.getrandbits(128)))
+            self._spawn(player_id, f"player{i}", False)
+            events.append(
+                {
+                    "messageType": SEND_IN_PLAYER_ADDED,
+                    "playerId": player_id,
+                    "username": f"player{i}",
+                    "nameFirst": "Player",
+                    "nameLast": str(i),
+                    "transform": _transform(self.characters[player_id]),
+                }
+            )
+        logger.info(
+            f"[HEADLESS] Scene {scene.get('name')} loaded with {len(scene.get('agents', []))} "
+            f"agents, {self.num_players} players and {len(self.locations)} locations"
+        )
+        if self.scene_loaded is not None:
+            self.scene_loaded.set()
+        return events
+
+    # --- connection ---
+
+    async def send(self, messages: List[dict]) -> None:
+        async with self._send_lock:
+            for message in messages:
+                if self.encoding == codec.MSGPACK:
+                    frame = codec.msgpack.packb(message)
+                else:
+                    frame = json.dumps(message)
+                await self._websocket.send(frame)
+                self.sent[message["messageType"]] += 1
+                self.bytes_sent += len(frame)
+
+    async def _receive(self) -> None:
+        async for frame in self._websocket:
+            self.bytes_received += len(frame)
+            events = self.handle(codec.loads(frame))
+            if events:
+                await self.send(events)
+
+    async def _simulate(self) -> None:
+        await self.scene_loaded.wait()
+        dt = 1.0 / self.tick_rate
+        last_proximity = 0.0
+        next_tick = time.perf_counter()
+        while True:
+            events = self.step(dt) + self.player_chats(dt)
+            if next_tick - last_proximity >= self.proximity_interval:
+                events.append(self.proximity())
+                last_proximity = next_tick
+            await self.send(events)
+            next_tick += dt
+            await asyncio.sleep(max(0.0, next_tick - time.perf_counter()))
+
+    async def _connect(self):
+        """Connect to the server, retrying with backoff while it is not listening yet."""
+        uri = f"ws://{self.url}:{self.port}"
+        wait = self.connect_backoff
+        for attempt in range(1, self.connect_retries + 1):
+            try:
+                return await websockets.connect(uri, max_size=None)
+            except (OSError, asyncio.TimeoutError) as e:
+                if attempt == self.connect_retries:
+                    raise
+                logger.info(f"[HEADLESS] Cannot connect to {uri} ({e}), retrying in {wait:.2f} s")
+                await asyncio.sleep(wait)
+                wait *= 2
+
+    async def run(self, duration: Optional[float] = None) -> dict:
+        """Play until the server disconnects or for `duration` seconds, returns the stats."""
+        self.scene_loaded = asyncio.Event()
+        self._send_lock = asyncio.Lock()
+        websocket = await self._connect()
+        self._websocket = websocket
+        self.start_time = time.perf_counter()
+        logger.info(f"[HEADLESS] Connected to ws://{self.url}:{self.port}")
+        tasks = [
+            asyncio.create_task(self._receive()),
+            asyncio.create_task(self._simulate()),
+        ]
+        try:
+            done, _ = await asyncio.wait(
+                tasks, timeout=duration, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                task.result()
+        except websockets.ConnectionClosed:
+            logger.info("[HEADLESS] Server closed the connection")
+        finally:
+            for task in tasks:
+                task.cancel()
+            await websocket.close()
+        return self.get_stats()
+
+    def get_stats(self) -> dict:
+        elapsed = time.perf_counter() - self.start_time if self.start_time else 0.0
+        latencies = sorted(self.latencies)
+
+        def percentile(q):
+            return latencies[min(len(latencies) - 1, int(q * len(latencies)))] if latencies else None
+
+        return {
+            "elapsed": elapsed,
+            "received": dict(self.received),
+            "sent": dict(self.sent),
+            "received_per_second": sum(self.received.values()) / elapsed if elapsed else 0.0,
+            "sent_per_second": sum(self.sent.values()) / elapsed if elapsed else 0.0,
+            "bytes_received": self.bytes_received,
+            "bytes_sent": self.bytes_sent,
+            "latency": {
+                "count": len(latencies),
+                "p50": percentile(0.5),
+                "p95": percentile(0.95),
+                "max": latencies[-1] if latencies else None,
+            },
+        }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="localhost")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--players", type=int, default=1, help="simulated players")
+    parser.add_argument("--locations", nargs="*", default=None, help="location names")
+    parser.add_argument("--duration", type=float, default=None, help="seconds to run, until disconnected if unset")
+    parser.add_argument("--proximity-interval", type=float, default=0.5)
+    parser.add_argument("--player-chat-interval", type=float, default=30.0)
+    parser.add_argument("--encoding", choices=[codec.JSON, codec.MSGPACK], default=codec.JSON)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+
+    client = HeadlessUnity(
+        url=args.url,
+        port=args.port,
+        num_players=args.players,
+        proximity_interval=args.proximity_interval,
+        player_chat_interval=args.player_chat_interval,
+        encoding=args.encoding,
+        seed=args.seed,
+    )
+    for name in args.locations or []:
+        client.location_position(name)
+    stats = asyncio.run(client.run(args.duration))
+    print(json.dumps(stats, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,269 @@
+"""Load generator for the communicator, the `--load` mode of `main.py`.
+
+Each of `num_agents` synthetic agents sends direct messages to another agent at
+`message_rate` messages per second (Poisson arrivals), padded to `payload_size`
+characters and tagged with a token. The game client relays them back as
+AGENT_DIRECT_MESSAGE, which gives two latencies:
+
+- send_to_ack: from `send_action` until the relayed message is received
+- event_to_observation: from receiving it until the receiving agent observes it
+
+Players are simulated by the game client, e.g. `headless.HeadlessUnity`, which
+`run_load` starts in-process with `headless=True`. Timings are recorded with
+`CodeTimer` callbacks, merged with the per-method timings of the wrapper, and
+summarized with percentiles by `LoadReport`.
+"""
+import asyncio
+import json
+import logging
+import random
+import re
+import threading
+import time
+from copy import deepcopy
+from typing import Dict, List, Optional
+
+from lyfe_python_env.datatype.send_out import SendOutAgentDirectMessage
+from lyfe_python_env.time_decorator import CodeTimer
+from lyfe_python_env.unity_websocket_wrapper import LyfeWebsocketWrapper
+
+logger = logging.getLogger(__name__)
+
+_TOKEN = re.compile(r"\[load (\d+)\]")
+
+
+def make_game_data(template: dict, num_agents: int, spacing: float = 2.0) -> dict:
+    """Game data with `num_agents` agents, copied from the first agent of `template`."""
+    game_data = deepcopy(template)
+    agent_template = template["world"]["agents"][0]
+    columns = max(1, int(num_agents**0.5))
+    agents = []
+    for i in range(num_agents):
+        agent = deepcopy(agent_template)
+        agent["hashId"] = f"load_agent_{i:04d}"
+        agent["user"] = {"hashId": f"load_{i:04d}", "username": f"LoadAgent {i}"}
+        agent["transform"] = {
+            "position": {"x": (i % columns) * spacing, "y": 0, "z": (i // columns) * spacing},
+            "rotation": {"x": 0, "y": 0, "z": 0},
+        }
+        agents.append(agent)
+    game_data["world"]["agents"] = agents
+    return game_data
+
+
+class LoadReport:
+    """Timings by name, summarized with percentiles."""
+
+    PERCENTILES = (50, 90, 99)
+
+    def __init__(self):
+        self.timings: Dict[str, List[float]] = {}
+        self.counters: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def record_timing(self, name: str, elapsed_time: float):
+        """Callback of `CodeTimer`, also called from the receiving thread."""
+        with self._lock:
+            self.timings.setdefault(name, []).append(elapsed_time)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        summary = {}
+        for name, values in self.timings.items():
+            values = sorted(values)
+            row = {"count": len(values), "mean": sum(values) / len(values)}
+            for q in self.PERCENTILES:
+                row[f"p{q}"] = values[min(len(values) - 1, len(values) * q // 100)]
+            row["max"] = values[-1]
+            summary[name] = row
+        return summary
+
+    def print(self):
+        columns = ["mean"] + [f"p{q}" for q in self.PERCENTILES] + ["max"]
+        print(f"\n{'timing (ms)':<48} {'count':>8}" + "".join(f"{column:>9}" for column in columns))
+        for name, row in sorted(self.summary().items()):
+            cells = "".join(f"{row[column] * 1000:>9.2f}" for column in columns)
+            print(f"{name:<48} {row['count']:>8d}" + cells)
+        for name, value in self.counters.items():
+            print(f"{name:<48} {value:>8.6g}")
+
+    def save(self, path: str):
+        with open(path, "w") as f:
+            json.dump({"timings": self.summary(), "counters": self.counters}, f, indent=2)
+
+
+class LoadGenerator:
+    """Drives the synthetic agents of a `LyfeWebsocketWrapper`, see the module docstring."""
+
+    def __init__(
+        self,
+        websocket_env: LyfeWebsocketWrapper,
+        report: LoadReport,
+        message_rate: float = 1.0,
+        payload_size: int = 128,
+        seed: int = 0,
+    ):
+        self.websocket_env = websocket_env
+        self.report = report
+        self.message_rate = message_rate
+        self.payload_size = payload_size
+        self._random = random.Random(seed)
+
+        self._lock = threading.Lock()
+        self._next_token = 0
+        self._sent_at: Dict[int, float] = {}  # token -> time sent
+        self._received_at: Dict[int, float] = {}  # token -> time received
+        self.sent_count = 0
+        self.observed_count = 0
+        websocket_env.add_message_listener(self._on_message)
+
+    def _on_message(self, message: dict):
+        match = _TOKEN.match(message.get("message") or "") if isinstance(message, dict) else None
+        if match is None:
+            return
+        now = time.perf_counter()
+        token = int(match.group(1))
+        with self._lock:
+            sent_at = self._sent_at.pop(token, None)
+            self._received_at[token] = now
+        if sent_at is not None:
+            self.report.record_timing("send_to_ack", now - sent_at)
+
+    def _payload(self, token: int) -> str:
+        text = f"[load {token}] "
+        return text + "x" * max(0, self.payload_size - len(text))
+
+    def send(self, agent_id: str, receiver_id: str):
+        with self._lock:
+            token = self._next_token
+            self._next_token += 1
+            self._sent_at[token] = time.perf_counter()
+        action = SendOutAgentDirectMessage(
+            agentId=agent_id, message=self._payload(token), receiverId=receiver_id
+        )
+        with CodeTimer(self.report.record_timing, "send_action"):
+            self.websocket_env.send_action(action)
+        self.sent_count += 1
+
+    def observe(self, agent_id: str):
+        with CodeTimer(self.report.record_timing, "get_observations"):
+            observations = self.websocket_env.get_observations(agent_id)
+        now = time.perf_counter()
+        for data in observations:
+            match = _TOKEN.match(getattr(data, "message", None) or "")
+            if match is None:
+                continue
+            with self._lock:
+                received_at = self._received_at.pop(int(match.group(1)), None)
+            if received_at is not None:
+                self.report.record_timing("event_to_observation", now - received_at)
+                self.observed_count += 1
+
+    def run(self, duration: float, poll_interval: float = 0.001):
+        agent_ids = self.websocket_env.get_agent_id_list()
+        assert len(agent_ids) > 1, "the load generator needs at least two agents"
+        start = time.perf_counter()
+        next_send = {
+            agent_id: start + self._random.expovariate(self.message_rate) for agent_id in agent_ids
+        }
+        logger.info(
+            f"[LOAD] {len(agent_ids)} agents sending {self.message_rate} messages/s each "
+            f"of {self.payload_size} characters for {duration} s"
+        )
+        while time.perf_counter() - start < duration:
+            for agent_id in agent_ids:
+                self.observe(agent_id)
+                now = time.perf_counter()
+                while next_send[agent_id] <= now:
+                    receiver_id = self._random.choice(agent_ids)
+                    while receiver_id == agent_id:
+                        receiver_id = self._random.choice(agent_ids)
+                    self.send(agent_id, receiver_id)
+                    next_send[agent_id] += self._random.expovariate(self.message_rate)
+            time.sleep(poll_interval)
+
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            unacknowledged = len(self._sent_at)
+        self.report.counters.update(
+            {
+                "elapsed (s)": elapsed,
+                "sent messages/s": self.sent_count / elapsed,
+                "observed messages/s": self.observed_count / elapsed,
+                "unacknowledged messages": unacknowledged,
+            }
+        )
+
+
+def _run_headless(client, duration: Optional[float]):
+    try:
+        asyncio.run(client.run(duration))
+    except Exception as e:
+        logger.error(f"[LOAD] Headless game client stopped: {e}")
+
+
+def run_load(
+    game_data: dict,
+    num_agents: int = 10,
+    message_rate: float = 1.0,
+    payload_size: int = 128,
+    duration: float = 60.0,
+    headless: bool = True,
+    num_players: int = 1,
+    player_chat_interval: float = 30.0,
+    external_websocket_server: bool = False,
+    wait_time_for_ack: float = 60.0,
+    report_path: Optional[str] = None,
+    seed: int = 0,
+) -> LoadReport:
+    """Run the load generator against a game client, returns the report."""
+    websocket_env_vars = {
+        "game_data": make_game_data(game_data, num_agents),
+        "enable_monitoring": True,
+        "external_websocket_server": external_websocket_server,
+    }
+    if external_websocket_server:
+        assert not headless, "the headless client only connects to the standalone server"
+        websocket_env_vars["simulation_id"] = "01234"
+    websocket_env = LyfeWebsocketWrapper(**websocket_env_vars)
+    report = LoadReport()
+    generator = LoadGenerator(websocket_env, report, message_rate, payload_size, seed)
+
+    client = None
+    if headless:
+        from lyfe_python_env.headless import HeadlessUnity
+
+        client = HeadlessUnity(
+            port=8765,
+            num_players=num_players,
+            player_chat_interval=player_chat_interval,
+            seed=seed,
+        )
+        threading.Thread(
+            target=_run_headless, args=(client, duration + wait_time_for_ack), daemon=True
+        ).start()
+
+    current_time = time.time()
+    while websocket_env.get_incoming_message_count() == 0:
+        if time.time() - current_time > wait_time_for_ack:
+            raise TimeoutError("No incoming messages received")
+        time.sleep(0.1)
+
+    try:
+        generator.run(duration)
+    except KeyboardInterrupt:
+        logger.info("[SYSTEM] Interrupted by user. Shutting down...")
+    finally:
+        for name, values in websocket_env.get_timings().items():
+            for value in values:
+                report.record_timing(name, value)
+        stats = websocket_env.websocket_wrapper.get_stats()
+        report.counters["incoming messages"] = stats["incoming_messages_count"]
+        if client is not None:
+            report.counters["client received messages/s"] = client.get_stats()["received_per_second"]
+        # report before closing, so that a slow shutdown does not lose it
+        report.print()
+        if report_path is not None:
+            report.save(report_path)
+            logger.info(f"[LOAD] Report saved to {report_path}")
+        websocket_env.close()
+    return report
@@ -9,6 +9,7 @@ import platform
 from enum import Enum
 import time
 from lyfe_python_env.datatype.unity_player import UnityPlayer
+from lyfe_python_env.load_generator import run_load
 
 from lyfe_python_env.time_decorator import CodeTimer, plot_timings
 from lyfe_python_env.unity_resources import UnityResources
@@ -170,11 +171,60 @@ if __name__ == "__main__":
         default=60.0,
         help="Wait time for acknowledgement from Game App",
     )
+    load_group = parser.add_argument_group("load generator, see load_generator.py")
+    load_group.add_argument(
+        "--load", action="store_true", default=False, help="Run the load generator"
+    )
+    load_group.add_argument("--agents", type=int, default=10, help="Synthetic agents")
+    load_group.add_argument(
+        "--rate", type=float, default=1.0, help="Messages per second of each agent"
+    )
+    load_group.add_argument(
+        "--payload", type=int, default=128, help="Characters per message"
+    )
+    load_group.add_argument(
+        "--duration", type=float, default=60.0, help="Seconds of load"
+    )
+    load_group.add_argument(
+        "--players", type=int, default=1, help="Players of the headless game client"
+    )
+    load_group.add_argument(
+        "--player_chat_interval",
+        type=float,
+        default=30.0,
+        help="Mean seconds between chat messages of a player",
+    )
+    load_group.add_argument(
+        "--unity",
+        action="store_true",
+        default=False,
+        help="Wait for a Unity build instead of starting the headless game client",
+    )
+    load_group.add_argument(
+        "--report", type=str, default=None, help="Save the report as JSON"
+    )
     args = parser.parse_args()
 
-    run_game(
-        mock_action=args.mock,
-        game_data_file_name=args.gamedata,
-        external_websocket_server=args.external_websocket_server,
-        wait_time_for_ack=args.wait_time_for_ack,
-    )
+    if args.load:
+        with open(GAMEDATAPATH / (args.gamedata + ".json"), "r") as f:
+            game_data = json.load(f)
+        run_load(
+            game_data,
+            num_agents=args.agents,
+            message_rate=args.rate,
+            payload_size=args.payload,
+            duration=args.duration,
+            headless=not args.unity,
+            num_players=args.players,
+            player_chat_interval=args.player_chat_interval,
+            external_websocket_server=args.external_websocket_server,
+            wait_time_for_ack=args.wait_time_for_ack,
+            report_path=args.report,
+        )
+    else:
+        run_game(
+            mock_action=args.mock,
+            game_data_file_name=args.gamedata,
+            external_websocket_server=args.external_websocket_server,
+            wait_time_for_ack=args.wait_time_for_ack,
+        )
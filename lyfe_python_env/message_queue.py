@@ -0,0 +1,208 @@
+"""Bounded message queues of the websocket wrappers.
+
+A full queue used to silently discard its oldest messages, which lost chat and
+movement events under load. `MessageQueue` makes the overflow policy explicit:
+
+- "block": the producer waits for space (up to `block_timeout`), then the new
+  message is dropped and counted
+- "drop_oldest" / "drop_newest": drop a message right away and count it
+
+Independently of the policy, messages with a key (see `key_func`) replace a queued
+message with the same key, keeping its place in the queue. This suits state-like
+messages where only the latest matters, e.g. proximity updates of a character.
+
+`congested` is True above the high-water mark, so that producers can throttle.
+"""
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Hashable, List, Optional, Union
+
+from lyfe_python_env.codec import loads
+
+logger = logging.getLogger(__name__)
+
+BLOCK = "block"
+DROP_OLDEST = "drop_oldest"
+DROP_NEWEST = "drop_newest"
+POLICIES = (BLOCK, DROP_OLDEST, DROP_NEWEST)
+
+
+class MessageQueue:
+    """Thread-safe bounded FIFO queue with an overflow policy.
+
+    Args:
+        maxlen: maximum number of queued messages
+        policy: what to do when full, one of POLICIES
+        key_func: returns a coalescing key for a message, or None to never coalesce it
+        high_water: fraction of maxlen above which the queue is congested
+        block_timeout: seconds a producer waits for space with the "block" policy
+        name: used in logs
+    """
+
+    def __init__(
+        self,
+        maxlen: int = 1000,
+        policy: str = DROP_OLDEST,
+        key_func: Optional[Callable[[Any], Optional[Hashable]]] = None,
+        high_water: float = 0.8,
+        block_timeout: float = 1.0,
+        name: str = "messages",
+    ):
+        assert policy in POLICIES, f"policy must be one of {POLICIES}"
+        self.maxlen = maxlen
+        self.policy = policy
+        self.key_func = key_func
+        self.high_water = int(maxlen * high_water)
+        self.block_timeout = block_timeout
+        self.name = name
+
+        # entries are [key, message], so that coalescing can replace a message in place
+        self._entries = deque()
+        self._keyed = {}  # key -> queued entry
+        self._condition = threading.Condition()
+        self._closed = False
+
+        # metrics
+        self.put_count = 0
+        self.dropped_count = 0
+        self.coalesced_count = 0
+        self.blocked_count = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def congested(self) -> bool:
+        return len(self._entries) >= self.high_water
+
+    def put(self, message, key: Optional[Hashable] = None) -> bool:
+        """Queue a message, returns False if it was dropped."""
+        if key is None and self.key_func is not None:
+            key = self.key_func(message)
+        with self._condition:
+            self.put_count += 1
+            if key is not None and key in self._keyed:
+                self._keyed[key][1] = message
+                self.coalesced_count += 1
+                return True
+
+            if len(self._entries) >= self.maxlen and not self._make_room():
+                return False
+
+            entry = [key, message]
+            self._entries.append(entry)
+            if key is not None:
+                self._keyed[key] = entry
+            self._condition.notify_all()
+            return True
+
+    def _make_room(self) -> bool:
+        """Apply the overflow policy to a full queue, the lock is held."""
+        if self.policy == BLOCK:
+            self.blocked_count += 1
+            deadline = time.monotonic() + self.block_timeout
+            while len(self._entries) >= self.maxlen and not self._closed:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+            if len(self._entries) < self.maxlen:
+                return True
+        elif self.policy == DROP_OLDEST:
+            self._pop_entry()
+            self._count_drop()
+            return True
+        self._count_drop()
+        return False
+
+    def _count_drop(self):
+        self.dropped_count += 1
+        # log the first drop and then every 100th, not every message
+        if self.dropped_count % 100 == 1:
+            logger.warning(
+                f"[QUEUE] {self.name} queue is full ({self.maxlen}), "
+                f"{self.dropped_count} messages dropped so far"
+            )
+
+    def _pop_entry(self):
+        entry = self._entries.popleft()
+        key = entry[0]
+        if key is not None and self._keyed.get(key) is entry:
+            del self._keyed[key]
+        return entry[1]
+
+    def snapshot(self) -> List:
+        """Queued messages, without taking them."""
+        with self._condition:
+            return [message for _, message in self._entries]
+
+    def appendleft_many(self, messages: List) -> None:
+        """Put messages back at the front, e.g. after a failed send. Never drops."""
+        with self._condition:
+            for message in reversed(messages):
+                self._entries.appendleft([None, message])
+            self._condition.notify_all()
+
+    def drain(self, timeout: Optional[float] = None) -> List:
+        """Take all queued messages, waiting up to `timeout` seconds for one.
+
+        Returns an empty list on timeout or once the queue is closed and empty.
+        """
+        with self._condition:
+            if timeout is None or timeout > 0:
+                self._condition.wait_for(
+                    lambda: self._entries or self._closed, timeout=timeout
+                )
+            messages = [message for _, message in self._entries]
+            self._entries.clear()
+            self._keyed.clear()
+            self._condition.notify_all()  # wakes blocked producers
+            return messages
+
+    def wait_below_high_water(self, timeout: Optional[float] = None) -> bool:
+        """Wait until the queue is not congested, returns False on timeout."""
+        with self._condition:
+            return self._condition.wait_for(
+                lambda: len(self._entries) < self.high_water or self._closed,
+                timeout=timeout,
+            )
+
+    def close(self):
+        """Wake all waiters, e.g. when the connection stops."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+    def get_stats(self) -> dict:
+        return {
+            "size": len(self._entries),
+            "put": self.put_count,
+            "dropped": self.dropped_count,
+            "coalesced": self.coalesced_count,
+            "blocked": self.blocked_count,
+        }
+
+
+def proximity_key(message: Union[str, bytes]) -> Optional[Hashable]:
+    """Coalescing key of raw proximity messages, None for all other messages.
+
+    A proximity message holds the latest state of the listed characters, so a newer
+    message about the same characters supersedes a queued one. Both JSON text and
+    MessagePack frames are supported.
+    """
+    marker = b"CHARACTER_PROXIMITY" if isinstance(message, bytes) else '"CHARACTER_PROXIMITY"'
+    if marker not in message:
+        return None
+    try:
+        data = loads(message)
+    except ValueError:
+        return None
+    if data.get("messageType") != "CHARACTER_PROXIMITY":
+        return None
+    return (
+        "CHARACTER_PROXIMITY",
+        tuple(agent.get("agentId") for agent in data.get("agents") or []),
+        tuple(player.get("playerId") for player in data.get("players") or []),
+    )
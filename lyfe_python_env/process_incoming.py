@@ -1,6 +1,4 @@
-from collections import defaultdict
 import logging
-from typing import Any, List
 
 from lyfe_python_env.datatype import UnityUser, UnityCharacter, UnityAgent
 from lyfe_python_env.datatype.send_in import (
@@ -29,6 +27,8 @@ from lyfe_python_env.datatype.send_in import (
     SendInTaskStartedMessage,
     SendInTaskCompletedMessage,
 )
+from lyfe_python_env.agent_messages import AgentMessages
+from lyfe_python_env.codec import construct
 from lyfe_python_env.datatype.unity_player import UnityPlayer
 from lyfe_python_env.unity_resources import UnityResources
 
@@ -60,69 +60,87 @@ def log_event(
 def process_incoming(
     msg_dict: dict,
     unity_resources: UnityResources,
-    agent_messages: defaultdict[str, List[Any]],
+    agent_messages: AgentMessages,
+    trusted: bool = False,
 ) -> None:
-    """Process incoming messages from Unity in TextSideChannel."""
+    """Process incoming messages from Unity in TextSideChannel.
+
+    trusted: build flat messages without validation, see `codec.construct`
+    """
     if msg_dict is None:
         return
 
     message_type = msg_dict.get("messageType", None)
 
     if message_type == SEND_IN_CHARACTER_PROXIMITY:
+        data: SendInCharacterProximity = construct(
+            SendInCharacterProximity, msg_dict, trusted
+        )
         __process_incoming_handler_character_proximity(
-            SendInCharacterProximity(**msg_dict),
+            data,
             unity_resources=unity_resources,
         )
-        data: SendInCharacterProximity = SendInCharacterProximity(**msg_dict)
         for agent in data.agents:
-            agent_messages[agent.agentId].append(agent)
+            agent_messages.append(agent.agentId, agent)
 
     elif message_type == SEND_IN_AGENT_CHAT_MESSAGE:
-        data: SendInAgentChatMessage = SendInAgentChatMessage(**msg_dict)
+        data: SendInAgentChatMessage = construct(
+            SendInAgentChatMessage, msg_dict, trusted
+        )
         for receiverId in data.receiverAgentIds:
-            agent_messages[receiverId].append(data)
+            agent_messages.append(receiverId, data)
 
     elif message_type == SEND_IN_AGENT_DIRECT_MESSAGE:
-        data: SendInAgentDirectMessage = SendInAgentDirectMessage(**msg_dict)
-        agent_messages[data.receiverId].append(data)
+        data: SendInAgentDirectMessage = construct(
+            SendInAgentDirectMessage, msg_dict, trusted
+        )
+        agent_messages.append(data.receiverId, data)
 
     elif message_type == SEND_IN_AGENT_MOVE_ENDED:
-        data: SendInAgentMovementEnded = SendInAgentMovementEnded(**msg_dict)
-        agent_messages[data.agentId].append(data)
+        data: SendInAgentMovementEnded = construct(
+            SendInAgentMovementEnded, msg_dict, trusted
+        )
+        agent_messages.append(data.agentId, data)
 
     elif message_type == SEND_IN_PLAYER_CHAT_MESSAGE:
-        data: SendInPlayerChatMessage = SendInPlayerChatMessage(**msg_dict)
+        data: SendInPlayerChatMessage = construct(
+            SendInPlayerChatMessage, msg_dict, trusted
+        )
         for receiverId in data.receiverAgentIds:
-            agent_messages[receiverId].append(data)
+            agent_messages.append(receiverId, data)
 
     elif message_type == SEND_IN_PLAYER_DIRECT_MESSAGE:
-        data: SendInPlayerDirectMessage = SendInPlayerDirectMessage(**msg_dict)
-        agent_messages[data.receiverId].append(data)
+        data: SendInPlayerDirectMessage = construct(
+            SendInPlayerDirectMessage, msg_dict, trusted
+        )
+        agent_messages.append(data.receiverId, data)
 
     elif message_type == SEND_IN_PLAYER_ADDED:
-        data: SendInPlayerAdded = SendInPlayerAdded(**msg_dict)
+        data: SendInPlayerAdded = construct(SendInPlayerAdded, msg_dict, trusted)
         __process_incoming_handler_player_added(data, unity_resources=unity_resources)
-        for q in agent_messages.values():
-            q.append(data)
+        agent_messages.broadcast(data)
     elif message_type == SEND_IN_PLAYER_UPDATED:
-        data: SendInPlayerUpdated = SendInPlayerUpdated(**msg_dict)
+        data: SendInPlayerUpdated = construct(SendInPlayerUpdated, msg_dict, trusted)
         __process_incoming_handler_player_updated(data, unity_resources=unity_resources)
     elif message_type == SEND_IN_PLAYER_REMOVED:
-        data: SendInPlayerRemoved = SendInPlayerRemoved(**msg_dict)
+        data: SendInPlayerRemoved = construct(SendInPlayerRemoved, msg_dict, trusted)
         __process_incoming_handler_player_removed(data, unity_resources=unity_resources)
-        for q in agent_messages.values():
-            q.append(data)
+        agent_messages.broadcast(data)
     elif message_type == SEND_IN_TASK_COMPLETED_MESSAGE:
-        data: SendInTaskCompletedMessage = SendInTaskCompletedMessage(**msg_dict)
+        data: SendInTaskCompletedMessage = construct(
+            SendInTaskCompletedMessage, msg_dict, trusted
+        )
         __process_task_completed_message(data)
 
     elif message_type == SEND_IN_TASK_STARTED_MESSAGE:
-        data: SendInTaskStartedMessage = SendInTaskStartedMessage(**msg_dict)
+        data: SendInTaskStartedMessage = construct(
+            SendInTaskStartedMessage, msg_dict, trusted
+        )
         __process_task_started_message(data)
 
     elif message_type == SEND_IN_AGENT_FEEDBACK:
-        data: SendInAgentFeedback = SendInAgentFeedback(**msg_dict)
-        agent_messages[data.agentId].append(data)
+        data: SendInAgentFeedback = construct(SendInAgentFeedback, msg_dict, trusted)
+        agent_messages.append(data.agentId, data)
 
     else:
         logger.warning(
@@ -48,6 +48,10 @@ setup(
         'websocket-client',
         'pydantic>=2.0.0',
     ],
+    extras_require={
+        # faster JSON parsing and the MessagePack encoding, see codec.py
+        'fast': ['orjson', 'msgpack'],
+    },
     python_requires='>=3.7, <4',  # Update this according to your needs
     cmdclass={
         'verify': VerifyVersionCommand,
@@ -80,10 +80,13 @@ def plot_timings(timings):
 
 
 class ProfilingMeta(type):
-    EXCLUDED_METHODS = set(['_record_timing', 'plot_timings'])
+    EXCLUDED_METHODS = set(['_record_timing', 'plot_timings', 'get_timings'])
 
     def __new__(cls, name, bases, attrs):
         for key, value in attrs.items():
+            # static and class methods are callable on Python 3.10+, but take no `self`
+            if isinstance(value, (staticmethod, classmethod)):
+                continue
             if callable(value) and not key.startswith("__") and key not in ProfilingMeta.EXCLUDED_METHODS:
                 attrs[key] = ProfilingMeta._wrap_with_timer(value, key)
         return super(ProfilingMeta, cls).__new__(cls, name, bases, attrs)
@@ -120,6 +123,10 @@ class BaseProfilingClass(metaclass=ProfilingMeta):
     def _record_timing(self, name, elapsed_time):
         self._timings_storage.setdefault(name, []).append(elapsed_time)
 
+    def get_timings(self):
+        """Recorded timings, method name -> list of elapsed times in seconds."""
+        return self._timings_storage
+
     def plot_timings(self):
         logger.info(
             f"Plotting timings for {self.__class__.__name__} {self._timings_storage.keys()}")
@@ -4,20 +4,43 @@ import logging
 import threading
 import websockets
 import websocket
-from collections import deque
+
+from lyfe_python_env.message_queue import BLOCK, DROP_OLDEST, MessageQueue, proximity_key
 
 logger = logging.getLogger(__name__)
 
 
 class WebsocketWrapper(ABC):
-    def __init__(self, websocket_url, websocket_port):
+    """
+    Args:
+        max_queue_size: capacity of the incoming and outgoing message queues
+        incoming_policy: overflow policy of the incoming queue, see MessageQueue
+        outgoing_policy: overflow policy of the outgoing queue, if any
+    """
+
+    def __init__(
+        self,
+        websocket_url,
+        websocket_port,
+        max_queue_size=1000,
+        incoming_policy=DROP_OLDEST,
+        outgoing_policy=BLOCK,
+    ):
         self._websocket_url = websocket_url
         self._websocket_port = websocket_port
+        self._max_queue_size = max_queue_size
+        self._outgoing_policy = outgoing_policy
 
         self._message_handler = None
-        self._incoming_message_process_task = None
         self._incoming_message_process_thread = None
-        self._incoming_messages = deque(maxlen=1000)  # Queue for incoming messages
+        # Queue for incoming messages, newer proximity updates replace queued ones.
+        # Receiving runs on the connection's thread, so it should not block by default.
+        self._incoming_messages = MessageQueue(
+            maxlen=max_queue_size,
+            policy=incoming_policy,
+            key_func=proximity_key,
+            name="Incoming",
+        )
         self._incoming_messages_count = 0
         self._processed_incoming_messages_count = 0
         self._running = False
@@ -32,8 +55,7 @@ class WebsocketWrapper(ABC):
 
     def stop(self):
         self._running = False
-        if self._incoming_message_process_task:
-            self._incoming_message_process_task.cancel()
+        self._incoming_messages.close()  # wakes the incoming message pump
         if self._incoming_message_process_thread:
             self._incoming_message_process_thread.join()
         self._stop_impl()
@@ -43,7 +65,7 @@ class WebsocketWrapper(ABC):
         pass
 
     @abstractmethod
-    def send_text_message(self, message):
+    def send_text_message(self, message, key=None):
         pass
 
     def get_stats(self):
@@ -51,6 +73,7 @@ class WebsocketWrapper(ABC):
             "running": self._running,
             "incoming_messages_count": self._incoming_messages_count,
             "processed_incoming_messages_count": self._processed_incoming_messages_count,
+            "incoming_queue": self._incoming_messages.get_stats(),
         }
         additional_stats = self._get_additional_stats()
         return {**basic_stats, **additional_stats}
@@ -65,52 +88,72 @@ class WebsocketWrapper(ABC):
             return
         self._message_handler = handler
 
-        def run_in_thread():
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            self._incoming_message_process_task = loop.create_task(
-                self._process_incoming_messages()
-            )
-            loop.run_forever()  # Run the loop until stop() is called
-
         if (
-            not self._incoming_message_process_task
-            or self._incoming_message_process_task.done()
+            not self._incoming_message_process_thread
+            or not self._incoming_message_process_thread.is_alive()
         ):
             self._incoming_message_process_thread = threading.Thread(
-                target=run_in_thread
+                target=self._process_incoming_messages,
+                name="incoming-messages",
+                daemon=True,
             )
             self._incoming_message_process_thread.start()
 
-    async def _process_incoming_messages(self):
+    def _process_incoming_messages(self):
+        """Pump incoming messages to the handler.
+
+        The thread sleeps until messages arrive, then hands all of them to the handler,
+        so that receiving is never blocked by message processing.
+        """
         logger.info("Starting to process incoming messages")
         while self._running:
-            if self._incoming_messages and self._message_handler:
-                message = self._incoming_messages.popleft()
+            messages = self._incoming_messages.drain()
+            for message in messages:
                 self._message_handler(message)
-                self._processed_incoming_messages_count += 1
+            self._processed_incoming_messages_count += len(messages)
         logger.info("Stopped processing incoming messages")
 
     def receive_message(self, message):
         self._incoming_messages_count += 1
-        self._incoming_messages.append(message)
-        if len(self._incoming_messages) >= 1000:
-            logger.warning("Incoming message queue is full, dropping messages")
+        self._incoming_messages.put(message)
+
+    def _queues(self):
+        """Queues whose congestion should throttle the producers of actions."""
+        return [self._incoming_messages]
+
+    def is_congested(self) -> bool:
+        """Whether a message queue is above its high-water mark."""
+        return any(queue.congested for queue in self._queues())
+
+    def wait_until_uncongested(self, timeout=None) -> bool:
+        """Wait until no message queue is above its high-water mark, False on timeout."""
+        return all(queue.wait_below_high_water(timeout) for queue in self._queues())
 
 
 class StandaloneWebsocketServerWrapper(WebsocketWrapper):
-    def __init__(self, websocket_url, websocket_port):
-        super().__init__(websocket_port=websocket_port, websocket_url=websocket_url)
-        self._outgoing_messages = deque(maxlen=1000)  # Queue for outgoing messages
+    def __init__(self, websocket_url, websocket_port, **kwargs):
+        super().__init__(websocket_port=websocket_port, websocket_url=websocket_url, **kwargs)
+        # Queue for outgoing messages, by default agents wait for space when it is full
+        self._outgoing_messages = MessageQueue(
+            maxlen=self._max_queue_size, policy=self._outgoing_policy, name="Outgoing"
+        )
         self._outgoing_messages_count = 0
         self._processed_outgoing_messages_count = 0
+        self._outgoing_flushes_count = 0
+        # set from any thread to wake the sender, see `_wake_sender`
+        self._outgoing_event = None
+        self._outgoing_lock = threading.Lock()
+        self._wake_pending = False
 
+        self._loop = None
         self._server_thread = None
         self._websocket_server = None
         self._websocket_client = None
 
     def run_server(self):
         asyncio.set_event_loop(asyncio.new_event_loop())
+        self._loop = asyncio.get_event_loop()
+        self._outgoing_event = asyncio.Event()
         start_server = websockets.serve(
             self.handler,
             self._websocket_url,
@@ -126,40 +169,81 @@ class StandaloneWebsocketServerWrapper(WebsocketWrapper):
         self._server_thread = threading.Thread(target=self.run_server)
         self._server_thread.start()
 
+    async def _close_server(self):
+        self._websocket_server.close()
+        await self._websocket_server.wait_closed()
+
     def _stop_impl(self):
-        if self._websocket_server:
-            self._websocket_server.close()
-            loop = asyncio.get_event_loop()
-            loop.run_until_complete(self._websocket_server.wait_closed())
-            loop.stop()
+        self._outgoing_messages.close()
+        self._wake_sender()  # lets the sender see that we are stopping
+        if self._websocket_server and self._loop is not None and self._loop.is_running():
+            # the server belongs to the loop of the server thread
+            closed = asyncio.run_coroutine_threadsafe(self._close_server(), self._loop)
+            try:
+                closed.result(timeout=10)
+            except Exception as e:
+                logger.warning(f"[SYSTEM] Websocket server did not close cleanly: {e}")
+            self._loop.call_soon_threadsafe(self._loop.stop)
         if self._server_thread:
             self._server_thread.join()  # Wait for the server thread to finish
 
-    def send_text_message(self, message):
+    def send_text_message(self, message, key=None):
+        """Queue a message, a `key` lets it replace a queued message with the same key."""
         logger.debug(f"Preparing to send message: {message}")
         self._outgoing_messages_count += 1
-        self._outgoing_messages.append(message)
-        if len(self._outgoing_messages) >= 1000:
-            logger.warning("Outgoing message queue is full, dropping messages")
+        # wake the sender first, with the "block" policy this may wait for it
+        self._wake_sender()
+        self._outgoing_messages.put(message, key=key)
         if len(self._outgoing_messages) > 5:
-            logger.info(
+            logger.debug(
                 f"Outgoing message queue size: {len(self._outgoing_messages)} last message: {message}"
             )
+        self._wake_sender()
+
+    def _wake_sender(self):
+        """Wake the sender from any thread, at most once per flush."""
+        if self._loop is None or self._outgoing_event is None:
+            return
+        with self._outgoing_lock:
+            if self._wake_pending:
+                return
+            self._wake_pending = True
+        try:
+            self._loop.call_soon_threadsafe(self._outgoing_event.set)
+        except RuntimeError:
+            pass  # the loop is closed
 
     def get_incoming_message_queue(self):
-        return list(self._incoming_messages)
+        return self._incoming_messages.snapshot()
+
+    def _queues(self):
+        return [self._incoming_messages, self._outgoing_messages]
 
     async def process_outgoing_messages(self, websocket):
+        """Send queued messages whenever the queue is woken, see `_wake_sender`.
+
+        Each wake-up drains the whole queue and sends the messages back to back, so
+        throughput is bounded by the connection rather than by a polling interval.
+        """
         while self._running:
-            if (
-                self._outgoing_messages
-                and self._websocket_client
-                and self._websocket_client.open
-            ):
-                message = self._outgoing_messages.popleft()
-                await websocket.send(message)
+            await self._outgoing_event.wait()
+            self._outgoing_event.clear()
+            with self._outgoing_lock:
+                self._wake_pending = False
+            if not websocket.open:
+                break
+
+            messages = self._outgoing_messages.drain(timeout=0)
+            for sent, message in enumerate(messages):
+                try:
+                    await websocket.send(message)
+                except Exception:
+                    # keep unsent messages for the next client
+                    self._outgoing_messages.appendleft_many(messages[sent:])
+                    raise
                 self._processed_outgoing_messages_count += 1
-            await asyncio.sleep(0.005)  # Allows handling of other tasks
+            if messages:
+                self._outgoing_flushes_count += 1
 
     async def handler(self, websocket, path):
         self._websocket_client = websocket
@@ -171,7 +255,16 @@ class StandaloneWebsocketServerWrapper(WebsocketWrapper):
                 self.process_outgoing_messages(websocket)
             )
             incoming_task = asyncio.create_task(self.process_incoming(websocket))
-            await asyncio.gather(outgoing_task, incoming_task)
+            # flush messages queued while no client was connected
+            self._outgoing_event.set()
+            # either task ends when the client disconnects
+            done, pending = await asyncio.wait(
+                [outgoing_task, incoming_task], return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in pending:
+                task.cancel()
+            for task in done:
+                task.result()
         finally:
             logger.info(f"Client disconnected: {client_address}")
             self._websocket_client = None
@@ -184,12 +277,14 @@ class StandaloneWebsocketServerWrapper(WebsocketWrapper):
         return {
             "outgoing_messages_count": self._outgoing_messages_count,
             "processed_outgoing_messages_count": self._processed_outgoing_messages_count,
+            "outgoing_flushes_count": self._outgoing_flushes_count,
+            "outgoing_queue": self._outgoing_messages.get_stats(),
         }
 
 
 class ExternalWebsocketServerWrapper(WebsocketWrapper):
-    def __init__(self, websocket_url, websocket_port, simulation_id="01234"):
-        super().__init__(websocket_port=websocket_port, websocket_url=websocket_url)
+    def __init__(self, websocket_url, websocket_port, simulation_id="01234", **kwargs):
+        super().__init__(websocket_port=websocket_port, websocket_url=websocket_url, **kwargs)
         self._simulation_id = simulation_id
         self._websocket_client = None
         self._incoming_message_accumulate_thread = None
@@ -229,9 +324,13 @@ class ExternalWebsocketServerWrapper(WebsocketWrapper):
             if self._websocket_client:
                 self._websocket_client.close()
 
-    def send_text_message(self, message):
+    def send_text_message(self, message, key=None):
+        # sent synchronously, so there is nothing to coalesce with
         if self._websocket_client:
-            self._websocket_client.send(message)
+            if isinstance(message, bytes):
+                self._websocket_client.send_binary(message)
+            else:
+                self._websocket_client.send(message)
             self._outgoing_messages_count += 1
         else:
             raise ConnectionError("Websocket connection is not established.")
@@ -1,11 +1,15 @@
-from collections import defaultdict
-import json
 import logging
 import traceback
-from typing import Any, List
 import uuid
 from lyfe_python_env import process_incoming
-from lyfe_python_env.datatype.send_out import OutDataGame, OutDataScene
+from lyfe_python_env.agent_messages import AgentMessages
+from lyfe_python_env.codec import Codec
+from lyfe_python_env.datatype.send_out import (
+    SEND_OUT_AGENT_CHAT_MESSAGE,
+    SEND_OUT_AGENT_MOVE_DESTINATION_LOCATION,
+    OutDataGame,
+    OutDataScene,
+)
 from lyfe_python_env.message_converters import convert_to_actions
 
 from lyfe_python_env.time_decorator import (
@@ -22,6 +26,26 @@ from lyfe_python_env.unity_resources import UnityResources
 logger = logging.getLogger(__name__)
 
 
+def coalescing_key(data):
+    """Key of actions that supersede a queued action with the same key.
+
+    Keyed on the message fields rather than the class, since lyfe_agent sends its
+    own copies of the SendOut models.
+    """
+    message_type = getattr(data, "messageType", None)
+    if message_type == SEND_OUT_AGENT_MOVE_DESTINATION_LOCATION:
+        # only the latest destination of an agent matters
+        return ("move", data.agentId)
+    if (
+        message_type == SEND_OUT_AGENT_CHAT_MESSAGE
+        and getattr(data, "final", None) is False
+        and getattr(data, "streamId", None) is not None
+    ):
+        # a partial message of a stream contains the previous ones
+        return ("partial", data.streamId)
+    return None
+
+
 class LyfeWebsocketWrapper(BaseProfilingClass):
     def __init__(
         self,
@@ -32,8 +56,18 @@ class LyfeWebsocketWrapper(BaseProfilingClass):
         simulation_id: str = None,
         enable_monitoring: bool = False,
         external_websocket_server: bool = False,
+        queue_config: dict = None,
+        encoding: str = "json",
+        trusted: bool = False,
         **kwargs,
     ):
+        """
+        queue_config: options of the message queues (max_queue_size, incoming_policy,
+            outgoing_policy), see WebsocketWrapper
+        encoding: "json", "msgpack", or "auto" to switch to MessagePack once the game
+            client sends it, see codec.Codec
+        trusted: build flat incoming messages without validation, see codec.construct
+        """
         BaseProfilingClass.__init__(self, enable_monitoring)
         self._unity_resource: UnityResources = UnityResources()
         if game_data is not None:
@@ -50,6 +84,10 @@ class LyfeWebsocketWrapper(BaseProfilingClass):
             scene=unity_scene,
         )
 
+        self._codec = Codec(encoding, trusted=trusted)
+        # called with each decoded incoming message, e.g. to measure latencies
+        self._message_listeners = []
+
         logger.info("[SYSTEM] Starting websocket connection...")
         if external_websocket_server:
             assert simulation_id is not None
@@ -57,23 +95,30 @@ class LyfeWebsocketWrapper(BaseProfilingClass):
                 websocket_url,
                 websocket_port,
                 simulation_id=simulation_id,
+                **(queue_config or {}),
             )
         else:
             self.websocket_wrapper: WebsocketWrapper = StandaloneWebsocketServerWrapper(
-                websocket_url, websocket_port
+                websocket_url, websocket_port, **(queue_config or {})
             )
 
         self.websocket_wrapper.start()
         logger.info("[SYSTEM] Websocket connection established.")
-        self.websocket_wrapper.send_text_message(self._to_json_dump(out_data_game))
+        self.websocket_wrapper.send_text_message(self._serialize(out_data_game))
 
-        self._raw_agent_messages: defaultdict[str, List[Any]] = defaultdict(list)
+        # proximity updates are coalesced per agent, events are kept in full
+        self._raw_agent_messages = AgentMessages(self._unity_resource.get_agent_id_list())
 
         def message_handler(msg):
             try:
-                observations = json.loads(msg)
+                observations = self._codec.loads(msg)
+                for listener in self._message_listeners:
+                    listener(observations)
                 process_incoming.process_incoming(
-                    observations, self._unity_resource, self._raw_agent_messages
+                    observations,
+                    self._unity_resource,
+                    self._raw_agent_messages,
+                    trusted=self._codec.trusted,
                 )
             except Exception as e:
                 stack_trace = traceback.format_exc()
@@ -83,22 +128,31 @@ class LyfeWebsocketWrapper(BaseProfilingClass):
 
         self.websocket_wrapper.set_message_handler(message_handler)
 
+    def add_message_listener(self, listener):
+        """Call `listener` with each decoded message from Unity, on the receiving thread."""
+        self._message_listeners.append(listener)
+
     # Test action sending, for `main.py`
     def send_test_action(self, agent_id, action):
         actions = convert_to_actions(action, agent_id)
         if actions is not None:
             for action in actions:
-                self.websocket_wrapper.send_text_message(self._to_json_dump(action))
+                self.websocket_wrapper.send_text_message(self._serialize(action))
 
     def send_action(self, data):
         if data is not None:
-            self.websocket_wrapper.send_text_message(self._to_json_dump(data))
+            self.websocket_wrapper.send_text_message(
+                self._serialize(data), key=coalescing_key(data)
+            )
 
-    def _to_json_dump(self, data):
-        text = data.model_dump_json(
-            exclude_none=True,
-        )
-        return text
+    def is_congested(self) -> bool:
+        return self.websocket_wrapper.is_congested()
+
+    def wait_until_uncongested(self, timeout=None) -> bool:
+        return self.websocket_wrapper.wait_until_uncongested(timeout)
+
+    def _serialize(self, data):
+        return self._codec.dumps(data)
 
     def get_unity_resources(self) -> UnityResources:
         return self._unity_resource
@@ -113,11 +167,7 @@ class LyfeWebsocketWrapper(BaseProfilingClass):
         :param agent_id: the current agent whose messages will be processed
         :param observation: the current observation who will be updated
         """
-        agent_list = self._raw_agent_messages[agent_id]
-        read_pointer = len(agent_list)
-        raw_data = agent_list[:read_pointer]
-        self._raw_agent_messages[agent_id] = agent_list[read_pointer:]
-        return raw_data
+        return self._raw_agent_messages.take(agent_id)
 
     def close(self):
         self.websocket_wrapper.stop()